@@ -0,0 +1,219 @@
+import json
+
+from pydantic import ValidationError
+
+from src.ai.schema import PLAN_TEXT_FIELDS, MaintenancePlan
+
+SYSTEM_PROMPT = "You are a robotics engineer. JSON output only."
+
+REPAIR_PROMPT = """The JSON below does not match the required schema.
+Errors:
+{errors}
+
+Return ONLY the corrected JSON object with the keys event_id (int), diagnosis,
+inspection_steps, maintenance_actions, safety_clearance, return_to_service
+(all strings). Do not add commentary.
+
+{content}
+"""
+# Validation errors quoted in the repair prompt, in characters (every
+# character is at most one token, which bounds what prompt_budget reserves)
+REPAIR_ERROR_CHARS = 300
+
+
+class JsonObjectScanner:
+    """
+    Incremental scanner for the first top-level JSON object in a token stream.
+
+    feed() takes chunks as they arrive and tracks string/escape state and
+    brace depth, so the end of the object is known the moment its closing
+    brace streams in (text before it, like ```json fences, is skipped).
+    partial() closes whatever is open so far into parseable JSON, which is
+    what lets fields be shown before the response is complete.
+    """
+
+    __slots__ = ("buf", "start", "end", "depth", "in_string", "escape", "stack")
+
+    def __init__(self):
+        self.buf: list[str] = []
+        self.start = -1
+        self.end = -1
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.stack: list[str] = []
+
+    @property
+    def complete(self) -> bool:
+        return self.end >= 0
+
+    def text(self) -> str:
+        return "".join(self.buf)
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume a chunk; True once the top-level object is complete.
+        """
+        if self.complete:
+            return True
+        pos = sum(len(c) for c in self.buf)
+        self.buf.append(chunk)
+        for i, ch in enumerate(chunk):
+            if self.start < 0:
+                if ch == "{":
+                    self.start = pos + i
+                    self.depth = 1
+                    self.stack.append("}")
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                self.stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                self.depth -= 1
+                if self.stack:
+                    self.stack.pop()
+                if self.depth == 0:
+                    self.end = pos + i + 1
+                    return True
+        return False
+
+    def object_text(self) -> str:
+        text = self.text()
+        if self.start < 0:
+            return text
+        return text[self.start : self.end] if self.complete else text[self.start :]
+
+    def partial(self) -> dict:
+        """
+        Best-effort dict of what has streamed so far ({} if not parseable yet).
+        """
+        if self.start < 0:
+            return {}
+        text = self.object_text()
+        if self.complete:
+            closers = ""
+        else:
+            text = text.rstrip()
+            if self.in_string:
+                text += "\\" if self.escape else ""
+                text += '"'
+            text = text.rstrip(",:")
+            closers = "".join(reversed(self.stack))
+        for candidate in (text, text[: text.rfind(",")]):
+            # A dangling key ('"diag') won't parse; retry without the last member
+            try:
+                value = json.loads(candidate + closers)
+            except ValueError:
+                continue
+            return value if isinstance(value, dict) else {}
+        return {}
+
+
+def _create(client, deployment, messages, stream, json_mode, max_tokens=None):
+    kwargs = {"model": deployment, "messages": messages}
+    if max_tokens:
+        kwargs["max_tokens"] = max_tokens
+    if stream:
+        kwargs["stream"] = True
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    return client.chat.completions.create(**kwargs)
+
+
+def _stream_object(response, on_partial=None) -> JsonObjectScanner:
+    """
+    Feed streamed deltas into a scanner, stopping as soon as the JSON object
+    is complete (anything the model adds afterwards is never waited for).
+    """
+    scanner = JsonObjectScanner()
+    for chunk in response:
+        if not chunk.choices:
+            continue  # e.g. Azure content-filter preamble
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        done = scanner.feed(delta)
+        if on_partial is not None:
+            on_partial(scanner.partial())
+        if done:
+            break
+    close = getattr(response, "close", None)
+    if close is not None:
+        close()
+    return scanner
+
+
+def _validate(content: str, event_id: int) -> MaintenancePlan:
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data.setdefault("event_id", event_id)
+    return MaintenancePlan.model_validate(data)
+
+
+def request_plan(
+    client,
+    deployment: str,
+    prompt: str,
+    event_id: int,
+    on_partial=None,
+    max_tokens: int | None = None,
+    on_repair=None,
+) -> MaintenancePlan:
+    """
+    Ask for a maintenance plan in JSON mode, consuming the response as a
+    stream and validating it against MaintenancePlan. If the output is
+    malformed, one short repair request (only the bad JSON + the validation
+    errors, not the event context) is made before giving up. max_tokens caps
+    both completions (a plan cut off by it is closed like a truncated stream);
+    on_repair() is called before the repair request goes out.
+    Raises on failure; callers decide what an error row looks like.
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    json_mode = True
+    try:
+        response = _create(client, deployment, messages, stream=True, json_mode=True, max_tokens=max_tokens)
+    except Exception as e:
+        # Deployments without JSON mode reject response_format; the prompt asks for JSON anyway
+        if "response_format" not in str(e):
+            raise
+        json_mode = False
+        response = _create(client, deployment, messages, stream=True, json_mode=False, max_tokens=max_tokens)
+
+    scanner = _stream_object(response, on_partial)
+    content = scanner.object_text()
+    try:
+        return _validate(content, event_id)
+    except (ValueError, ValidationError) as e:
+        error = e
+
+    partial = scanner.partial()
+    if not scanner.complete and all(k in partial for k in PLAN_TEXT_FIELDS):
+        # Cut off in the last field: closing the open string/braces is enough
+        try:
+            return MaintenancePlan.model_validate({"event_id": event_id, **partial})
+        except ValidationError:
+            pass
+
+    repair = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": REPAIR_PROMPT.format(errors=str(error)[:REPAIR_ERROR_CHARS], content=content[:4000])},
+    ]
+    if on_repair is not None:
+        on_repair()
+    resp = _create(client, deployment, repair, stream=False, json_mode=json_mode, max_tokens=max_tokens)
+    fixed = JsonObjectScanner()
+    fixed.feed(resp.choices[0].message.content or "")
+    return _validate(fixed.object_text(), event_id)
@@ -0,0 +1,272 @@
+import math
+import re
+from collections import Counter
+
+import pandas as pd
+
+from src.ai.schema import MaintenancePlan
+from src.config import LOCAL_RETRIEVAL_MIN_SCORE, LOCAL_REPEAT_ESCALATION
+
+# collision_type -> (diagnosis, inspection steps, maintenance actions)
+TEMPLATES = {
+    "hard_impact": (
+        "Hard impact on {joint}: the arm or tool struck an obstacle, loading the {joint} reducer and motor abruptly.",
+        ["Inspect {joint} housing, tool and fixtures for cracks or deformation",
+         "Check {joint} reducer backlash and listen for abnormal noise while jogging slowly",
+         "Review the torque profile around the impact"],
+        ["Replace damaged tooling or fixtures",
+         "Re-teach or verify TCP and the programmed path near the impact point",
+         "Re-check {joint} mastering/calibration"],
+    ),
+    "torque_limit": (
+        "{joint} reached its torque limit: payload, friction or the programmed motion exceeds what the axis can deliver.",
+        ["Verify payload and tool data against the actual tool",
+         "Check {joint} for binding, cable drag or lubrication starvation",
+         "Compare torque of recent cycles against the baseline"],
+        ["Correct payload settings or reduce speed/acceleration on the affected segment",
+         "Lubricate {joint} reducer if due"],
+    ),
+    "overtravel": (
+        "Overtravel on {joint}: the axis went past its software or hardware limit.",
+        ["Check {joint} limit switch and stroke limit settings",
+         "Verify mastering data for {joint}"],
+        ["Release overtravel per controller procedure and jog the axis back into range",
+         "Adjust the program so the path stays inside the stroke limits"],
+    ),
+    "path_singularity": (
+        "Path singularity near {joint}: wrist axes aligned and the planned motion cannot be executed.",
+        ["Identify the program line where the singularity occurs",
+         "Check wrist configuration (J4/J6 alignment) at that point"],
+        ["Add an intermediate point or change wrist configuration",
+         "Use joint motion instead of linear motion across the singular region"],
+    ),
+    "safety_fence": (
+        "Safety fence opened during operation; the robot stopped on the safety circuit.",
+        ["Confirm why the cell was entered and that nobody remains inside",
+         "Check fence interlock switch and wiring"],
+        ["Repair or re-align the interlock if it tripped without entry",
+         "Review cell entry procedure with operators"],
+    ),
+    "emergency_stop": (
+        "Emergency stop triggered; the robot halted on the E-stop chain.",
+        ["Find which E-stop was pressed and why",
+         "Check E-stop chain wiring and relays if no button was pressed"],
+        ["Reset the E-stop and confirm the safety circuit recovers",
+         "Inspect {joint} brakes if the stop happened at high speed"],
+    ),
+    "servo_fault": (
+        "Servo fault on {joint}: amplifier or motor feedback reported an error.",
+        ["Check {joint} amplifier alarms and motor/encoder cables",
+         "Measure motor insulation if the fault repeats"],
+        ["Reseat or replace the {joint} feedback cable",
+         "Replace the amplifier or motor if the fault persists"],
+    ),
+    "motion_fault": (
+        "Motion fault: the controller rejected or aborted the planned motion.",
+        ["Review the program line and motion parameters at the fault"],
+        ["Correct the taught points or motion parameters"],
+    ),
+}
+_GENERIC = (
+    "Fault on {joint} of type {collision_type}; no specific rule, general checks apply.",
+    ["Review the controller alarm history around the event",
+     "Inspect {joint} mechanically and electrically"],
+    ["Correct the root cause found during inspection"],
+)
+
+_SAFETY = {
+    "critical": "- Lock out / tag out the cell before entry\n- Support the arm if brakes are suspect\n- Two-person verification before release",
+    "high": "- Lock out / tag out the cell before entry\n- Verify brakes hold on the affected axis",
+}
+_SAFETY_DEFAULT = "- Put the controller in T1 / reduced speed before inspection"
+
+_RETURN = {
+    "critical": "- Run the program at 10% speed, then 50%, then full speed\n- Monitor torque on the affected axis for the first cycles\n- Supervisor sign-off before production",
+    "high": "- Dry run at reduced speed\n- Monitor torque on the affected axis for the first cycles",
+}
+_RETURN_DEFAULT = "- Reset alarms and resume production"
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+
+def _tokens(text: str) -> list[str]:
+    words = _TOKEN.findall(text.lower())
+    # Words plus adjacent-word bigrams so "torque limit" != "limit ... torque"
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfIndex:
+    """
+    Small in-memory TF-IDF index (sparse dict vectors, cosine similarity)
+    over past recommendation texts.
+    """
+
+    __slots__ = ("idf", "vectors")
+
+    def __init__(self, docs: list[str]):
+        counts = [Counter(_tokens(d)) for d in docs]
+        df = Counter(t for c in counts for t in c)
+        n = len(docs)
+        self.idf = {t: math.log((1 + n) / (1 + k)) + 1.0 for t, k in df.items()}
+        self.vectors = [self._normalize(c) for c in counts]
+
+    def _normalize(self, counts: Counter) -> dict[str, float]:
+        vec = {t: (1 + math.log(k)) * self.idf.get(t, 0.0) for t, k in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items() if v}
+
+    def search(self, text: str, k: int = 1) -> list[tuple[int, float]]:
+        """
+        [(doc index, cosine score)], best first.
+        """
+        q = self._normalize(Counter(_tokens(text)))
+        scores = []
+        for i, vec in enumerate(self.vectors):
+            if len(vec) < len(q):
+                s = sum(v * q.get(t, 0.0) for t, v in vec.items())
+            else:
+                s = sum(v * vec.get(t, 0.0) for t, v in q.items())
+            if s > 0:
+                scores.append((i, s))
+        scores.sort(key=lambda x: -x[1])
+        return scores[:k]
+
+
+def _signature(row) -> str:
+    """
+    Structured fields as text; history rows and new events share these.
+    """
+    axis = _int(row.get("axis"))
+    return " ".join(
+        [str(row.get(c, "") or "") for c in ("collision_type", "severity", "error_code", "alert_type")]
+        + [f"J{axis}", str(row.get("message_raw", "") or "")]
+    )
+
+
+class LocalDiagnosisEngine:
+    """
+    Deterministic, offline maintenance plans: rule templates keyed on
+    collision_type, adjusted for severity, axis, repeats_24h and the last
+    maintenance task, plus the closest past LLM plan from
+    ai_plan_history.jsonl (TF-IDF retrieval) when one is similar enough.
+    """
+
+    def __init__(self, history: pd.DataFrame | None = None):
+        if history is None:
+            history = load_history()
+        self.history = history.reset_index(drop=True)
+        docs = [
+            f"{_signature(r)} {r.get('diagnosis', '')}" for _, r in self.history.iterrows()
+        ]
+        self.index = TfidfIndex(docs)
+
+    def plan(self, row) -> MaintenancePlan:
+        ctype = str(row.get("collision_type", "") or "other")
+        severity = str(row.get("severity", "") or "low").lower()
+        axis = _int(row.get("axis"))
+        joint = f"J{axis}" if axis > 0 else "the affected axis"
+        repeats = _int(row.get("repeats_24h"))
+        last_task = str(row.get("last_maintenance_task", "") or "")
+        if last_task == "nan":
+            last_task = ""
+
+        diagnosis, inspect, actions = TEMPLATES.get(ctype, _GENERIC)
+        fmt = {"joint": joint, "collision_type": ctype}
+        diagnosis = diagnosis.format(**fmt)
+        inspect = [s.format(**fmt) for s in inspect]
+        actions = [s.format(**fmt) for s in actions]
+
+        peak = row.get("peak_torque_pct")
+        if peak is not None and not pd.isna(peak):
+            diagnosis += f" Peak torque {float(peak):.0f}% of rated."
+        if repeats >= LOCAL_REPEAT_ESCALATION:
+            diagnosis += f" Recurring: {repeats} similar events in the last 24 h."
+            inspect.append("Treat as a recurring fault: look for a common root cause, not a one-off")
+        if last_task:
+            days = _int(row.get("days_since_last_maintenance"), default=-1)
+            when = f" {days} days ago" if days >= 0 else ""
+            inspect.append(f"Verify the last maintenance ({last_task}{when}) was completed correctly")
+            if last_task in ("replace_motor", "calibrate_joints") and ctype in ("hard_impact", "torque_limit", "overtravel"):
+                inspect.append(f"Re-check {joint} mastering after the recent {last_task}")
+
+        # Query with the rule diagnosis too: it shares vocabulary with LLM plans
+        past = None
+        if len(self.history):
+            for i, score in self.index.search(f"{_signature(row)} {diagnosis}", k=5):
+                candidate = self.history.iloc[i]
+                if score >= LOCAL_RETRIEVAL_MIN_SCORE and str(candidate.get("collision_type")) == ctype:
+                    past = candidate
+                    break
+        if past is not None:
+            diagnosis += f" Similar past case (event {past.get('event_id')}): {past.get('diagnosis')}"
+            for line in str(past.get("maintenance_actions", "") or "").splitlines():
+                line = line.strip().lstrip("-").strip()
+                if line and line not in actions:
+                    actions.append(line)
+
+        return MaintenancePlan(
+            event_id=_int(row.get("event_id"), default=-1),
+            diagnosis=diagnosis,
+            inspection_steps=inspect,
+            maintenance_actions=actions,
+            safety_clearance=_SAFETY.get(severity, _SAFETY_DEFAULT),
+            return_to_service=_RETURN.get(severity, _RETURN_DEFAULT),
+        )
+
+
+def _int(v, default: int = 0) -> int:
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return default
+
+
+def load_history() -> pd.DataFrame:
+    """
+    Past LLM plans with the event fields they were made for, from the
+    append-only AI_PLAN_HISTORY_FILE. ai_recommendations.csv is not read
+    back: it is rewritten by every run, offline runs included.
+    """
+    from src.ai.similarity import PlanHistory, signature_fields
+
+    rows = []
+    for rec in PlanHistory.load().records:
+        event = rec.get("event") or signature_fields(rec.get("signature", ()))
+        rows.append({**event, **rec["plan"], "source": "llm"})
+    return pd.DataFrame(rows)
+
+
+def local_plans(events: pd.DataFrame, engine: LocalDiagnosisEngine | None = None) -> pd.DataFrame:
+    """
+    ai_recommendations-shaped rows for every event, computed locally.
+    """
+    engine = engine or LocalDiagnosisEngine()
+    rows = []
+    for _, row in events.iterrows():
+        plan = engine.plan(row).model_dump()
+        rows.append(
+            {
+                "event_id": plan["event_id"],
+                "robot_id": row.get("robot_id"),
+                "axis": row.get("axis"),
+                "severity": row.get("severity"),
+                "collision_type": row.get("collision_type"),
+                **{k: v for k, v in plan.items() if k != "event_id"},
+                "source": "local",
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import time
+
+    from src.config import EVENTS_FILE
+
+    events = pd.read_csv(EVENTS_FILE)
+    engine = LocalDiagnosisEngine()
+    started = time.perf_counter()
+    df = local_plans(events, engine)
+    elapsed = time.perf_counter() - started
+    print(f"{len(df)} local plans in {elapsed * 1000:.1f} ms ({elapsed / max(len(df), 1) * 1000:.3f} ms/event)")
+    print(df[["event_id", "collision_type", "diagnosis"]].head(5).to_string())
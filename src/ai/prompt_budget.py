@@ -0,0 +1,335 @@
+import math
+import re
+from typing import Callable, NamedTuple
+
+import pandas as pd
+
+from src.config import (
+    ALERT_FEATURE_WINDOWS,
+    ALERT_RECENCY_TYPES,
+    AI_MAX_PROMPT_TOKENS,
+    AI_MAX_COMPLETION_TOKENS,
+    AI_EXPECTED_COMPLETION_TOKENS,
+    AI_RUN_TOKEN_BUDGET,
+    AI_PRICE_PER_1K_INPUT,
+    AI_PRICE_PER_1K_OUTPUT,
+    AI_SECONDS_PER_CALL,
+    AI_OUTPUT_TOKENS_PER_SECOND,
+)
+from src.ai.llm_plans import REPAIR_ERROR_CHARS, REPAIR_PROMPT, SYSTEM_PROMPT
+from src.data_pipeline.detect_overloads import OVERLOAD_ERROR_CODE
+
+PROMPT_TEMPLATE = """
+You are a senior robotics reliability engineer.
+Analyze this collision event and provide a maintenance plan in JSON ONLY.
+
+Context:
+- ID: {event_id}
+- Time: {timestamp}
+- Robot: {robot_id} (Cell: {cell_id})
+- Joint: {axis} ({location})
+- Type: {collision_type} (Severity: {severity})
+- Peak Torque: {peak_torque}% of rated
+- Alert: {alert_msg}
+- Alerts before event: {alert_history}
+- Causal chain: {chain}
+- Last Maintenance: {last_maint}
+- Raw Log: {raw_msg}
+
+Response Format (JSON):
+{{
+    "event_id": {event_id},
+    "diagnosis": "brief technical explanation",
+    "inspection_steps": "bullet points with line breaks",
+    "maintenance_actions": "bullet points with line breaks",
+    "safety_clearance": "bullet points",
+    "return_to_service": "steps to restart"
+}}
+Keep it concise: {words} words at most in total.
+"""
+
+# Free-text fields in the order they are given up when a prompt is over
+# AI_MAX_PROMPT_TOKENS: first shortened to TRIM_CHARS, then omitted
+TRIM_ORDER = ("last_maint", "alert_history", "alert_msg", "chain", "raw_msg")
+TRIM_CHARS = 80
+OMITTED = "(omitted)"
+
+_SEVERITY_RANK = {"critical": 3, "high": 2, "medium": 1, "low": 0}
+# Chat message framing per request (role markers, separators)
+_MESSAGE_OVERHEAD = 8
+_TOKEN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token count estimate for GPT-style BPE vocabularies: words cost
+    one token per ~4 letters, digit runs one per 3 digits, every symbol one.
+    No tokenizer download needed; it errs high on plain English (common
+    words are one token whatever their length), which is the safe side
+    for a budget.
+    """
+    n = 0
+    for tok in _TOKEN.findall(text):
+        if tok[0].isalpha():
+            n += math.ceil(len(tok) / 4)
+        elif tok[0].isdigit():
+            n += math.ceil(len(tok) / 3)
+        else:
+            n += 1
+    return n
+
+
+def alert_history(row) -> str:
+    """
+    One line from the windowed alert features, e.g.
+    "30s: 1, 5min: 4, 1h: 9 (max CRITICAL); last vibration alert 42s before".
+    """
+    counts = []
+    max_level = None
+    for label in ALERT_FEATURE_WINDOWS:
+        n = row.get(f"alerts_{label}")
+        if n is None or pd.isna(n):
+            return "n/a"
+        counts.append(f"{label}: {int(n)}")
+        level = row.get(f"alert_max_level_{label}")
+        if isinstance(level, str):
+            max_level = level
+    text = ", ".join(counts) + (f" (max {max_level})" if max_level else "")
+    for t in ALERT_RECENCY_TYPES:
+        secs = row.get(f"secs_since_{t}_alert")
+        if secs is not None and not pd.isna(secs):
+            text += f"; last {t} alert {secs:.0f}s before"
+    return text
+
+
+def chain_text(chain) -> str:
+    # chain: the event's row of event_chains.csv, or None
+    if chain is None:
+        return "none (isolated event)"
+    text = f"{chain['summary']} (root cause: {chain['root_cause']}, {int(chain['n_events'])} events)"
+    if isinstance(chain.get("prior_maintenance"), str):
+        text += f"; after {chain['prior_maintenance']}"
+    return text
+
+
+def _text(value) -> str:
+    # Missing values as "n/a" rather than "nan"/"None"
+    return "n/a" if value is None or pd.isna(value) or str(value).strip() == "" else str(value)
+
+
+def prompt_fields(row, chain=None) -> dict:
+    return {
+        "event_id": int(row.get("event_id", -1)),
+        "timestamp": str(row.get("timestamp", "")),
+        "robot_id": str(row.get("robot_id", "")),
+        "cell_id": _text(row.get("cell_id")),
+        "axis": int(row.get("axis", 0)),
+        "location": str(row.get("location", "")),
+        "collision_type": str(row.get("collision_type", "")),
+        "severity": str(row.get("severity", "")),
+        "peak_torque": float(row.get("peak_torque_pct", 0.0)),
+        "alert_msg": _text(row.get("alert_message")),
+        "alert_history": alert_history(row),
+        "chain": chain_text(chain),
+        "last_maint": _text(row.get("last_maintenance_task")),
+        "raw_msg": _text(row.get("message_raw")),
+    }
+
+
+def _render(fields: dict) -> str:
+    # ~0.75 words per token, with headroom for the JSON keys
+    words = int(AI_MAX_COMPLETION_TOKENS * 0.6)
+    return PROMPT_TEMPLATE.format(**fields, words=words)
+
+
+def _shorten(text: str, chars: int) -> str:
+    return text if len(text) <= chars else text[: chars - 1].rstrip() + "…"
+
+
+def fit_prompt(fields: dict, max_tokens: int = AI_MAX_PROMPT_TOKENS) -> tuple[str, int, list[str]]:
+    """
+    (prompt, estimated tokens, trimmed field names). Fields in TRIM_ORDER are
+    shortened, then omitted, one at a time until the prompt fits; the
+    structured fields (ids, axis, severity, torque) are always kept.
+    """
+    fields = dict(fields)
+    prompt = _render(fields)
+    tokens = estimate_tokens(prompt)
+    trimmed = []
+    steps = [(name, TRIM_CHARS) for name in TRIM_ORDER] + [(name, 0) for name in TRIM_ORDER]
+    for name, chars in steps:
+        if tokens <= max_tokens:
+            break
+        value = _shorten(fields[name], chars) if chars else OMITTED
+        if fields[name] in ("n/a", OMITTED) or value == fields[name]:
+            continue
+        fields[name] = value
+        if name not in trimmed:
+            trimmed.append(name)
+        prompt = _render(fields)
+        tokens = estimate_tokens(prompt)
+    return prompt, tokens, trimmed
+
+
+def repair_tokens(system_tokens: int) -> int:
+    """
+    Worst case of the one repair request request_plan may add to a call:
+    the template, REPAIR_ERROR_CHARS of errors and the bad plan (itself a
+    completion of at most AI_MAX_COMPLETION_TOKENS) in, a capped completion out.
+    """
+    template = estimate_tokens(REPAIR_PROMPT.format(errors="", content=""))
+    return system_tokens + template + REPAIR_ERROR_CHARS + 2 * AI_MAX_COMPLETION_TOKENS
+
+
+def event_priority(row) -> tuple:
+    """
+    Sort key, most urgent first: severity, then logged errors before
+    synthetic torque overloads, then repeats within 24 h, then peak torque,
+    then the most recent.
+    """
+
+    def num(name):
+        v = pd.to_numeric(row.get(name), errors="coerce")
+        return 0.0 if pd.isna(v) else float(v)
+
+    severity = _SEVERITY_RANK.get(str(row.get("severity", "")).lower(), 0)
+    ts = pd.to_datetime(row.get("timestamp"), errors="coerce", utc=True)
+    synthetic = row.get("error_code") == OVERLOAD_ERROR_CODE
+    return (-severity, synthetic, -num("repeats_24h"), -num("peak_torque_pct"), -(ts.value if not pd.isna(ts) else 0))
+
+
+class PlannedCall(NamedTuple):
+    row: pd.Series
+    prompt: str
+    prompt_tokens: int
+    trimmed: list[str]
+    reused: bool
+    reserved_tokens: int  # prompt + system prompt + worst-case completion, 0 if reused
+
+
+class RunPlan(NamedTuple):
+    calls: list[PlannedCall]  # in priority order
+    skipped: list[pd.Series]  # over the budget, in priority order
+    prompt_tokens: int
+    completion_tokens: int  # expected, not the worst case
+    reserved_tokens: int  # worst-case calls plus one repair reserve, <= budget
+    repair_tokens: int  # the repair reserve (see RunLedger)
+    budget: int
+    cost_usd: float
+    seconds: float
+
+    def summary(self) -> str:
+        remote = sum(not c.reused for c in self.calls)
+        reused = len(self.calls) - remote
+        trimmed = sum(bool(c.trimmed) for c in self.calls if not c.reused)
+        text = (
+            f"{remote} LLM calls, ~{self.prompt_tokens:,} prompt + ~{self.completion_tokens:,} completion tokens, "
+            f"~${self.cost_usd:.3f}, ~{self.seconds:.0f}s"
+        )
+        if reused:
+            text += f"; {reused} reused past plans"
+        if trimmed:
+            text += f"; {trimmed} prompts trimmed"
+        if self.skipped:
+            text += f"; {len(self.skipped)} events over the {self.budget:,}-token budget get offline plans"
+        return text
+
+
+def plan_run(
+    events: pd.DataFrame,
+    fields_fn: Callable = prompt_fields,
+    is_reused: Callable | None = None,
+    run_budget: int = AI_RUN_TOKEN_BUDGET,
+) -> RunPlan:
+    """
+    Order events by event_priority, fit each prompt into AI_MAX_PROMPT_TOKENS
+    and admit calls while their prompt + system prompt + AI_MAX_COMPLETION_TOKENS,
+    plus one worst-case repair request (repair_tokens), stay within
+    run_budget. Repairs that do happen are charged by RunLedger as the run
+    goes. Events is_reused(row) says have a past plan cost nothing. Cost and
+    latency are projected for sequential calls of the expected length,
+    without repairs.
+    """
+    rows = [row for _, row in events.iterrows()]
+    rows.sort(key=event_priority)
+    system_tokens = estimate_tokens(SYSTEM_PROMPT) + 2 * _MESSAGE_OVERHEAD
+    repair = repair_tokens(system_tokens)
+
+    calls, skipped = [], []
+    reserved = prompt_total = 0
+    for row in rows:
+        if is_reused is not None and is_reused(row):
+            calls.append(PlannedCall(row, "", 0, [], True, 0))
+            continue
+        prompt, tokens, trimmed = fit_prompt(fields_fn(row))
+        cost = tokens + system_tokens + AI_MAX_COMPLETION_TOKENS
+        if reserved + cost + repair > run_budget:
+            skipped.append(row)
+            continue
+        reserved += cost
+        prompt_total += tokens + system_tokens
+        calls.append(PlannedCall(row, prompt, tokens, trimmed, False, cost))
+
+    remote = sum(not c.reused for c in calls)
+    completion = remote * min(AI_EXPECTED_COMPLETION_TOKENS, AI_MAX_COMPLETION_TOKENS)
+    return RunPlan(
+        calls=calls,
+        skipped=skipped,
+        prompt_tokens=prompt_total,
+        completion_tokens=completion,
+        reserved_tokens=reserved + (repair if remote else 0),
+        repair_tokens=repair,
+        budget=run_budget,
+        cost_usd=prompt_total / 1000 * AI_PRICE_PER_1K_INPUT + completion / 1000 * AI_PRICE_PER_1K_OUTPUT,
+        seconds=remote * AI_SECONDS_PER_CALL + completion / AI_OUTPUT_TOKENS_PER_SECOND,
+    )
+
+
+class RunLedger:
+    """
+    Worst-case tokens an LLM run has committed so far. Calls run one after
+    another, so a single repair reserve covers them all: a call starts only
+    while its worst case plus the reserve still fits the budget, and a
+    repair that actually happens is charged when it does.
+    """
+
+    def __init__(self, plan: RunPlan):
+        self.plan = plan
+        self.spent = 0
+
+    def admit(self, call: PlannedCall) -> bool:
+        return self.spent + call.reserved_tokens + self.plan.repair_tokens <= self.plan.budget
+
+    def charge(self, call: PlannedCall, repaired: bool = False) -> None:
+        self.spent += call.reserved_tokens + (self.plan.repair_tokens if repaired else 0)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.config import EVENTS_FILE, EVENT_CHAINS_FILE
+    from src.data_pipeline.storage import published_path
+
+    ap = argparse.ArgumentParser(description="Project the token spend of an LLM plan run.")
+    ap.add_argument("--budget", type=int, default=AI_RUN_TOKEN_BUDGET, help="run token budget")
+    ap.add_argument("--all", action="store_true", help="plan every event, not just high/critical")
+    args = ap.parse_args()
+
+    events = pd.read_csv(published_path(EVENTS_FILE))
+    if not args.all and "severity" in events.columns:
+        events = events[events["severity"].str.lower().isin(["high", "critical"])]
+    try:
+        chains = pd.read_csv(published_path(EVENT_CHAINS_FILE))
+        chains = {int(r["chain_id"]): r for _, r in chains.iterrows()}
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        chains = {}
+
+    def fields(row):
+        cid = row.get("chain_id")
+        return prompt_fields(row, None if cid is None or pd.isna(cid) else chains.get(int(cid)))
+
+    plan = plan_run(events, fields, run_budget=args.budget)
+    print(plan.summary())
+    for c in plan.calls[:10]:
+        note = f" (trimmed: {', '.join(c.trimmed)})" if c.trimmed else ""
+        print(f"  event {int(c.row['event_id'])}: {c.row.get('severity')}, ~{c.prompt_tokens} tokens{note}")
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, field_validator
+
+PLAN_TEXT_FIELDS = (
+    "diagnosis",
+    "inspection_steps",
+    "maintenance_actions",
+    "safety_clearance",
+    "return_to_service",
+)
+
+
+class MaintenancePlan(BaseModel):
+    """
+    One maintenance plan as stored in ai_recommendations.csv.
+    """
+
+    event_id: int
+    diagnosis: str
+    inspection_steps: str = ""
+    maintenance_actions: str = ""
+    safety_clearance: str = ""
+    return_to_service: str = ""
+
+    @field_validator(*PLAN_TEXT_FIELDS, mode="before")
+    @classmethod
+    def _join_lists(cls, v):
+        # Models often answer "bullet points" with a JSON array; keep it as lines
+        if isinstance(v, list):
+            return "\n".join(f"- {item}" if not str(item).startswith("-") else str(item) for item in v)
+        return v
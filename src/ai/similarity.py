@@ -0,0 +1,232 @@
+import hashlib
+import json
+import re
+
+import numpy as np
+
+from src.config import (
+    AI_PLAN_HISTORY_FILE,
+    AI_REUSE_MIN_SIMILARITY,
+    MINHASH_PERMUTATIONS,
+    MINHASH_BANDS,
+    ensure_dirs,
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _field(row, name: str) -> str:
+    v = row.get(name)
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return ""
+    return str(v).strip().lower()
+
+
+# Event fields stored with each plan, so the history doubles as the offline
+# engine's retrieval corpus (see local_engine.load_history)
+EVENT_FIELDS = ("robot_id", "axis", "collision_type", "severity", "error_code", "alert_type", "message_raw")
+
+
+def event_fields(row) -> dict:
+    out = {}
+    for name in EVENT_FIELDS:
+        v = row.get(name)
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            out[name] = None
+        elif name == "axis":
+            try:
+                out[name] = int(float(v))
+            except (TypeError, ValueError):
+                out[name] = None
+        else:
+            out[name] = str(v).strip()
+    return out
+
+
+def signature_fields(tokens) -> dict:
+    """
+    Best-effort event fields from a signature, for records written before
+    the event fields were stored.
+    """
+    tags = {"ct": "collision_type", "code": "error_code", "sev": "severity", "alert": "alert_type", "axis": "axis"}
+    out = dict.fromkeys(EVENT_FIELDS)
+    words = []
+    for t in sorted(tokens):
+        tag, _, value = t.partition(":")
+        if tag in tags:
+            out[tags[tag]] = int(value) if tag == "axis" else value
+        elif tag == "msg":
+            words.extend(w for w in value.split("_") if w not in words)
+    out["message_raw"] = " ".join(words) or None
+    return out
+
+
+# Fields a reused plan must share with the event exactly
+REUSE_KEY = ("robot_id", "axis", "collision_type")
+
+
+def reuse_key(fields: dict) -> tuple:
+    # fields: event_fields()/signature_fields() output
+    return tuple(str(fields.get(name) or "").lower() for name in REUSE_KEY)
+
+
+def event_signature(row) -> set[str]:
+    """
+    Feature set of an event: structured fields as tagged tokens (collision
+    type, error code, severity, axis, 10%-torque bucket, alert type) plus
+    word bigrams of the raw message. Severity is included so a plan is never
+    reused across severities (safety steps differ).
+    """
+    tokens = set()
+    fields = (("ct", "collision_type"), ("code", "error_code"), ("sev", "severity"), ("alert", "alert_type"))
+    for tag, name in fields:
+        value = _field(row, name)
+        if value:
+            tokens.add(f"{tag}:{value}")
+    try:
+        tokens.add(f"axis:{int(float(row.get('axis')))}")
+    except (TypeError, ValueError):
+        pass
+    try:
+        pct = float(row.get("peak_torque_pct"))
+        if not np.isnan(pct):
+            tokens.add(f"torque:{int(pct // 10) * 10}")
+    except (TypeError, ValueError):
+        pass
+    words = _WORD.findall(_field(row, "message_raw"))
+    tokens.update(f"msg:{a}_{b}" for a, b in zip(words, words[1:]))
+    if len(words) == 1:
+        tokens.add(f"msg:{words[0]}")
+    return tokens
+
+
+def _token_hashes(tokens: set[str]) -> np.ndarray:
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "little") for t in sorted(tokens)],
+        dtype=np.uint64,
+    )
+
+
+class MinHashIndex:
+    """
+    MinHash signatures with LSH banding for near-duplicate lookup.
+
+    Each token set becomes MINHASH_PERMUTATIONS min-hashes (xor-multiply
+    hashing, vectorized with NumPy). Signatures are cut into MINHASH_BANDS
+    bands; sets sharing any band are candidates, and candidates are then
+    checked with their exact Jaccard similarity.
+    """
+
+    def __init__(self, permutations: int = MINHASH_PERMUTATIONS, bands: int = MINHASH_BANDS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.xor = rng.integers(0, np.iinfo(np.uint64).max, size=permutations, dtype=np.uint64)
+        self.mult = rng.integers(0, np.iinfo(np.uint64).max, size=permutations, dtype=np.uint64) | np.uint64(1)
+        self.bands = bands
+        self.rows = permutations // bands
+        self.buckets: dict[tuple, list[int]] = {}
+        self.sets: list[frozenset] = []
+
+    def signature(self, tokens: set[str]) -> np.ndarray:
+        h = _token_hashes(tokens)
+        if h.size == 0:
+            return np.full(self.xor.shape, np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            mixed = (h[:, None] ^ self.xor[None, :]) * self.mult[None, :]
+        return mixed.min(axis=0)
+
+    def _band_keys(self, sig: np.ndarray):
+        for b in range(self.bands):
+            yield (b, sig[b * self.rows : (b + 1) * self.rows].tobytes())
+
+    def add(self, tokens: set[str]) -> int:
+        idx = len(self.sets)
+        self.sets.append(frozenset(tokens))
+        for key in self._band_keys(self.signature(tokens)):
+            self.buckets.setdefault(key, []).append(idx)
+        return idx
+
+    def query(self, tokens: set[str], threshold: float) -> list[tuple[int, float]]:
+        """
+        [(item index, Jaccard similarity)] at or above threshold, best first.
+        """
+        candidates = set()
+        for key in self._band_keys(self.signature(tokens)):
+            candidates.update(self.buckets.get(key, ()))
+        tokens = frozenset(tokens)
+        hits = []
+        for idx in candidates:
+            other = self.sets[idx]
+            union = len(tokens | other)
+            sim = len(tokens & other) / union if union else 0.0
+            if sim >= threshold:
+                hits.append((idx, sim))
+        hits.sort(key=lambda x: (-x[1], -x[0]))  # most similar, then most recent
+        return hits
+
+
+class PlanHistory:
+    """
+    Past LLM plans with their event signatures (AI_PLAN_HISTORY_FILE, one
+    JSON object per line) behind a MinHash index, so run_ai_analysis can
+    reuse a plan for an event it has effectively diagnosed before.
+
+    Robot, axis and collision type must match exactly (REUSE_KEY): the index
+    is bucketed by them and MinHash only ranks plans within a bucket, since
+    a plan for J3 is wrong for J4 however similar the rest of the text is.
+    """
+
+    def __init__(self):
+        # reuse key -> (MinHash index, record positions in index order)
+        self.indexes: dict[tuple, tuple[MinHashIndex, list[int]]] = {}
+        self.records: list[dict] = []
+
+    @classmethod
+    def load(cls) -> "PlanHistory":
+        history = cls()
+        try:
+            with AI_PLAN_HISTORY_FILE.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        rec = json.loads(line)
+                        history._index(rec)
+        except FileNotFoundError:
+            pass
+        return history
+
+    def _index(self, rec: dict) -> None:
+        event = rec.get("event") or signature_fields(rec["signature"])
+        index, positions = self.indexes.setdefault(reuse_key(event), (MinHashIndex(), []))
+        index.add(set(rec["signature"]))
+        positions.append(len(self.records))
+        self.records.append(rec)
+
+    def add(self, row, plan: dict) -> None:
+        rec = {
+            "event_id": plan.get("event_id"),
+            "signature": sorted(event_signature(row)),
+            "event": event_fields(row),
+            "plan": plan,
+        }
+        self._index(rec)
+        ensure_dirs()
+        with AI_PLAN_HISTORY_FILE.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+
+    def lookup(self, row, threshold: float = AI_REUSE_MIN_SIMILARITY) -> dict | None:
+        """
+        The closest past plan adapted to this event (event_id swapped, note on
+        where it came from), or None when nothing is similar enough.
+        """
+        bucket = self.indexes.get(reuse_key(event_fields(row)))
+        if bucket is None:
+            return None
+        index, positions = bucket
+        hits = index.query(event_signature(row), threshold)
+        if not hits:
+            return None
+        idx, sim = hits[0]
+        rec = self.records[positions[idx]]
+        plan = dict(rec["plan"])
+        plan["event_id"] = int(row.get("event_id", plan.get("event_id", -1)))
+        plan["diagnosis"] = f"[Reused from event {rec['event_id']}, similarity {sim:.2f}] {plan.get('diagnosis', '')}"
+        return plan
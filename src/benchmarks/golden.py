@@ -0,0 +1,233 @@
+"""
+Golden-output regression harness: run the pipeline of a reference revision
+(default HEAD) and of the working tree on the same raw inputs, each in its
+own scratch copy, then diff every staged/structured/validation output column
+by column (floats within --rtol/--atol) and print per-stage timings side by
+side. Exits 1 if any output differs, so a speed-up ships with its proof of
+equivalence.
+
+    python -m src.benchmarks.golden                          # HEAD vs working tree, sample data
+    python -m src.benchmarks.golden --days 7 --robots 8      # plus a generated large dataset
+    python -m src.benchmarks.golden --ref HEAD --set MAINT_NOTES_FAST_PATH=False
+
+--set NAME=VALUE is appended to the candidate's config.py, which compares
+the two sides of a feature flag on a single revision.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import BASE_DIR, RAW_DIR
+from src.benchmarks.synthetic_raw import write_synthetic_raw
+
+OUTPUT_DIRS = ("data_stage", "data_structured", "validation")
+# JSON keys that differ on every run (wall-clock stamps)
+VOLATILE_KEYS = {"run_at", "finished_at", "acquired_at", "expires_at"}
+
+
+def _ref_tree(rev: str, root: Path) -> None:
+    """
+    src/ of a git revision, exported with git archive (no checkout needed).
+    """
+    tar = subprocess.run(
+        ["git", "archive", "--format=tar", rev, "src"], cwd=BASE_DIR, check=True, capture_output=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(tar)) as tf:
+        tf.extractall(root, filter="data")
+
+
+def _work_tree(root: Path, overrides: list[str]) -> None:
+    shutil.copytree(BASE_DIR / "src", root / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    if overrides:
+        with (root / "src" / "config.py").open("a", encoding="utf-8") as f:
+            f.write("\n# golden harness overrides\n" + "\n".join(overrides) + "\n")
+
+
+def _run(root: Path, raw: Path, args: list[str]) -> tuple[float, dict[str, float]]:
+    """
+    Run the pipeline in `root` on a copy of `raw`. (total seconds, seconds
+    per stage), stages being the progress lines run_pipeline prints.
+    """
+    shutil.copytree(raw, root / "data_raw")
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.run_pipeline", *args],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(root)},
+    )
+    stages: dict[str, float] = {}
+    stage, mark = "startup (imports, lock)", started
+    log = []
+    for line in proc.stdout:
+        log.append(line)
+        line = line.strip()
+        if line.endswith("...") or line == "Pipeline complete.":
+            now = time.perf_counter()
+            stages[stage] = now - mark
+            stage, mark = line.rstrip("."), now
+    if proc.wait() != 0:
+        sys.stdout.write("".join(log[-30:]))
+        raise SystemExit(f"Pipeline failed in {root}")
+    return time.perf_counter() - started, stages
+
+
+def _outputs(root: Path) -> set[str]:
+    return {
+        str(p.relative_to(root))
+        for d in OUTPUT_DIRS
+        if (root / d).exists()
+        for p in (root / d).rglob("*")
+        if p.suffix in (".csv", ".json") and p.name != "_manifest.json"
+    }
+
+
+def _short(value, width: int = 60) -> str:
+    text = repr(value)
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+def _diff_json(a, b, rtol: float, atol: float, path: str = "") -> list[str]:
+    if isinstance(a, dict) and isinstance(b, dict):
+        out = []
+        for k in sorted(a.keys() | b.keys()):
+            if k in VOLATILE_KEYS:
+                continue
+            if k not in a or k not in b:
+                out.append(f"{path}/{k}: only in {'candidate' if k in b else 'reference'}")
+            else:
+                out += _diff_json(a[k], b[k], rtol, atol, f"{path}/{k}")
+        return out
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return [f"{path}: length {len(a)} vs {len(b)}"]
+        return [d for x, y, i in zip(a, b, range(len(a))) for d in _diff_json(x, y, rtol, atol, f"{path}[{i}]")]
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+        return [] if math.isclose(a, b, rel_tol=rtol, abs_tol=atol) else [f"{path}: {a} vs {b}"]
+    return [] if a == b else [f"{path}: {_short(a)} vs {_short(b)}"]
+
+
+def _diff_csv(a: Path, b: Path, rtol: float, atol: float) -> list[str]:
+    try:
+        ra, rb = pd.read_csv(a, low_memory=False), pd.read_csv(b, low_memory=False)
+    except pd.errors.EmptyDataError:
+        return [] if a.stat().st_size == b.stat().st_size else ["one side is empty"]
+    out = []
+    only_a = [c for c in ra.columns if c not in rb.columns]
+    only_b = [c for c in rb.columns if c not in ra.columns]
+    if only_a:
+        out.append(f"columns only in reference: {only_a}")
+    if only_b:
+        out.append(f"columns only in candidate: {only_b}")
+    if len(ra) != len(rb):
+        return out + [f"rows {len(ra)} vs {len(rb)}"]
+    for col in [c for c in ra.columns if c in rb.columns]:
+        x, y = ra[col], rb[col]
+        if pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y):
+            bad = ~np.isclose(x.to_numpy(float), y.to_numpy(float), rtol=rtol, atol=atol, equal_nan=True)
+        else:
+            bad = (x.astype(str).where(x.notna(), "") != y.astype(str).where(y.notna(), "")).to_numpy()
+        if bad.any():
+            i = int(np.argmax(bad))
+            out.append(f"{col}: {int(bad.sum())} rows differ, first at row {i}: {_short(x.iloc[i])} vs {_short(y.iloc[i])}")
+    return out
+
+
+def compare(ref_root: Path, cand_root: Path, rtol: float, atol: float) -> dict[str, list[str]]:
+    """
+    Output file -> list of differences (empty lists omitted).
+    """
+    ref, cand = _outputs(ref_root), _outputs(cand_root)
+    diffs = {}
+    for rel in sorted(ref | cand):
+        if rel not in cand or rel not in ref:
+            diffs[rel] = [f"only in {'reference' if rel in ref else 'candidate'}"]
+            continue
+        a, b = ref_root / rel, cand_root / rel
+        if rel.endswith(".json"):
+            d = _diff_json(json.loads(a.read_text()), json.loads(b.read_text()), rtol, atol)
+        else:
+            d = _diff_csv(a, b, rtol, atol)
+        if d:
+            diffs[rel] = d
+    return diffs
+
+
+def _report(name: str, raw_bytes: int, ref: tuple, cand: tuple, n_events: int, diffs: dict) -> None:
+    (ref_s, ref_stages), (cand_s, cand_stages) = ref, cand
+    print(f"\n== {name}: {raw_bytes / 1e6:.1f} MB raw, {n_events} events")
+    print(f"{'stage':40s} {'reference':>10s} {'candidate':>10s} {'speedup':>8s}")
+    for stage in list(dict.fromkeys([*ref_stages, *cand_stages])):
+        r, c = ref_stages.get(stage, math.nan), cand_stages.get(stage, math.nan)
+        print(f"{stage:40s} {r:9.2f}s {c:9.2f}s {r / c if c else math.nan:7.2f}x")
+    print(f"{'total (incl. interpreter start)':40s} {ref_s:9.2f}s {cand_s:9.2f}s {ref_s / cand_s:7.2f}x")
+    print(f"{'throughput':40s} {raw_bytes / 1e6 / ref_s:6.2f}MB/s {raw_bytes / 1e6 / cand_s:6.2f}MB/s")
+    if not diffs:
+        print("outputs: IDENTICAL (within tolerance)")
+        return
+    print(f"outputs: {len(diffs)} file(s) DIFFER")
+    for rel, lines in diffs.items():
+        print(f"  {rel}")
+        for line in lines[:10]:
+            print(f"    {line}")
+
+
+def main(ref_rev: str, days: int, robots: int, overrides: list[str], rtol: float, atol: float,
+         keep: bool, pipeline_args: list[str]) -> int:
+    tmp = Path(tempfile.mkdtemp(prefix="golden-"))
+    try:
+        datasets = [("sample data_raw", RAW_DIR)]
+        if days > 1 or robots > 1:
+            big = tmp / "synthetic_raw"
+            write_synthetic_raw(big, days, robots, source_dir=RAW_DIR)
+            datasets.append((f"synthetic {days} days x {robots} robots", big))
+
+        failed = False
+        for i, (name, raw) in enumerate(datasets):
+            ref_root, cand_root = tmp / f"ref{i}", tmp / f"cand{i}"
+            _ref_tree(ref_rev, ref_root)
+            _work_tree(cand_root, overrides)
+            ref = _run(ref_root, raw, pipeline_args)
+            cand = _run(cand_root, raw, pipeline_args)
+            diffs = compare(ref_root, cand_root, rtol, atol)
+            events = cand_root / "data_structured" / "events.csv"
+            n_events = sum(1 for _ in events.open(encoding="utf-8")) - 1 if events.exists() else 0
+            raw_bytes = sum(p.stat().st_size for p in Path(raw).rglob("*") if p.is_file())
+            _report(name, raw_bytes, ref, cand, n_events, diffs)
+            failed |= bool(diffs)
+    finally:
+        if keep:
+            print(f"\nScratch trees kept in {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ref", default="HEAD", help="git revision of the reference implementation")
+    ap.add_argument("--days", type=int, default=1, help="days of generated data (>1 adds a synthetic dataset)")
+    ap.add_argument("--robots", type=int, default=1, help="robots of generated data")
+    ap.add_argument("--set", dest="overrides", action="append", default=[], metavar="NAME=VALUE",
+                    help="config override for the candidate, e.g. MAINT_NOTES_FAST_PATH=False")
+    ap.add_argument("--rtol", type=float, default=1e-9)
+    ap.add_argument("--atol", type=float, default=1e-9)
+    ap.add_argument("--keep", action="store_true", help="keep the scratch trees for inspection")
+    ap.add_argument("pipeline_args", nargs="*", help="passed to run_pipeline (after --)")
+    args = ap.parse_args()
+    sys.exit(main(args.ref, args.days, args.robots, args.overrides, args.rtol, args.atol,
+                  args.keep, args.pipeline_args))
@@ -0,0 +1,110 @@
+"""
+Memory benchmark for the parse layer: list-of-dicts + object columns (the old
+approach) vs. RecordBuilder (interned categorical codes + int64 timestamps).
+
+    python -m src.benchmarks.parse_memory --lines 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import DEFAULT_LOG_DATE
+from src.data_pipeline import parse_error_logs as error_logs
+from src.data_pipeline.partitions import SourceFile
+from src.data_pipeline.records import RecordBuilder
+from src.data_pipeline.timestamps import reset_timestamp_cache
+
+CODES = ["SRVO-160", "SRVO-324", "SRVO-005", "MOTN-019", "TEMP-100", "INTP-105", "PROG-048"]
+MESSAGES = [
+    "Collision detected",
+    "Torque limit reached",
+    "Singularity condition",
+    "Fence open",
+    "E-stop pressed",
+    "Overtravel",
+    "Battery Zero Alarm",
+    "Run request failed",
+]
+
+
+def write_synthetic_error_log(path: Path, n_lines: int, seed: int = 7) -> None:
+    rnd = random.Random(seed)
+    with path.open("w", encoding="utf-8") as f:
+        for _ in range(n_lines):
+            h, m, s = rnd.randrange(24), rnd.randrange(60), rnd.randrange(60)
+            code, msg = rnd.choice(CODES), rnd.choice(MESSAGES)
+            style = rnd.randrange(3)
+            if style == 0:
+                f.write(f"[{h:02d}:{m:02d}:{s:02d}] {code} {msg}\n")
+            elif style == 1:
+                f.write(f"{DEFAULT_LOG_DATE.isoformat()} {h:02d}:{m:02d}:{s:02d} - {code}: {msg}\n")
+            else:
+                f.write(f"{code} - {msg}\n")
+
+
+def _dict_rows(sf: SourceFile) -> pd.DataFrame:
+    ctx = error_logs._file_context(sf, DEFAULT_LOG_DATE)
+    rows = []
+    with sf.path.open("r", encoding="utf-8") as f:
+        for line in f:
+            raw = line.strip()
+            if raw:
+                rows.append(error_logs._parse_line(raw, *ctx))
+    df = pd.DataFrame(rows)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+    return df
+
+
+def _builder_rows(sf: SourceFile) -> pd.DataFrame:
+    builder = RecordBuilder(error_logs.SCHEMA)
+    error_logs._parse_file(sf, DEFAULT_LOG_DATE, builder)
+    return builder.to_frame()
+
+
+def _measure(fn, sf: SourceFile) -> dict:
+    # Both paths share the parse_timestamp_ns cache: start each one cold
+    reset_timestamp_cache()
+    tracemalloc.start()
+    started = time.perf_counter()
+    df = fn(sf)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "peak_mb": peak / 1e6,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def main(n_lines: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "error_logs.txt"
+        write_synthetic_error_log(path, n_lines)
+        sf = SourceFile(path, None, None)
+
+        results = {
+            "dict rows + object columns": _measure(_dict_rows, sf),
+            "RecordBuilder (category/int64)": _measure(_builder_rows, sf),
+        }
+
+    print(f"{n_lines:,} error log lines")
+    for name, r in results.items():
+        print(
+            f"  {name:32s} peak {r['peak_mb']:8.1f} MB   frame {r['frame_mb']:8.1f} MB"
+            f"   {r['seconds']:6.2f} s"
+        )
+    old, new = results.values()
+    print(f"  peak reduction: {old['peak_mb'] / new['peak_mb']:.1f}x,"
+          f" frame reduction: {old['frame_mb'] / new['frame_mb']:.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200_000)
+    main(ap.parse_args().lines)
@@ -0,0 +1,89 @@
+"""
+Compressed raw input benchmark: bytes read from disk for gzip'd logs vs. the
+plain text, and read time of open_raw streaming each file in turn vs. the
+raw_io.decompressed worker pool (per file, and per member for one large
+multi-member gzip).
+
+    python -m src.benchmarks.raw_decompress --files 16 --mb 8 --workers 4
+"""
+import argparse
+import gzip
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.config import ERROR_LOGS_FILE
+from src.data_pipeline.raw_io import decompressed, open_raw
+
+
+def _log_text(mb: int, seed: int = 5) -> bytes:
+    """
+    Roughly mb MB of error-log lines: messages and codes drawn from the
+    sample log, with timestamps and robot numbers varying per line so it
+    compresses like a real controller log rather than a repeated block.
+    """
+    rnd = random.Random(seed)
+    messages = [ln.split(" ", 1)[-1] for ln in ERROR_LOGS_FILE.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    lines = []
+    size = 0
+    sec = 0
+    while size < mb << 20:
+        sec += rnd.randrange(30)
+        h, rem = divmod(sec % 86400, 3600)
+        line = f"2025-11-17 {h:02d}:{rem // 60:02d}:{rem % 60:02d} - R{rnd.randrange(40):02d} {rnd.choice(messages)}\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines).encode()
+
+
+def _read(path) -> str:
+    with open_raw(path) as f:
+        return f.read()
+
+
+def _read_all(paths, pool: bool, workers: int) -> tuple[list[str], float]:
+    started = time.perf_counter()
+    if pool:
+        with decompressed(paths, workers):
+            texts = [_read(p) for p in paths]
+    else:
+        texts = [_read(p) for p in paths]
+    return texts, time.perf_counter() - started
+
+
+def main(files: int, mb: int, workers: int) -> None:
+    text = _log_text(mb)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        rotated = []
+        for i in range(files):
+            p = tmp / f"error_logs.{i}.txt.gz"
+            p.write_bytes(gzip.compress(text, compresslevel=6))
+            rotated.append(p)
+        # One archive of rotated logs concatenated member by member
+        bundle = tmp / "error_logs.bundle.gz"
+        with bundle.open("wb") as f:
+            for p in rotated:
+                f.write(p.read_bytes())
+
+        plain = len(text) * files
+        packed = sum(p.stat().st_size for p in rotated)
+        print(f"{files} files x {len(text) / 1e6:.1f} MB: {plain / 1e6:.1f} MB text, "
+              f"{packed / 1e6:.1f} MB on disk ({plain / packed:.1f}x less I/O)")
+
+        for label, paths in ((f"{files} rotated files", rotated), ("1 multi-member bundle", [bundle])):
+            serial, serial_s = _read_all(paths, pool=False, workers=workers)
+            pooled, pooled_s = _read_all(paths, pool=True, workers=workers)
+            assert "".join(serial) == "".join(pooled)
+            print(f"{label:22s} streaming {serial_s:6.2f} s   pool({workers}) {pooled_s:6.2f} s   "
+                  f"speedup {serial_s / pooled_s:4.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=16)
+    ap.add_argument("--mb", type=int, default=8, help="decompressed size per file")
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+    main(args.files, args.mb, args.workers)
@@ -0,0 +1,95 @@
+"""
+Cold-start import benchmark based on `python -X importtime`.
+
+Each target module is imported in a fresh interpreter and its cumulative
+import time is checked against a budget. Exit status is 1 if any target is
+over budget, so this can gate CI.
+
+    python -m src.benchmarks.startup_time
+    python -m src.benchmarks.startup_time --runs 5 --top 15
+"""
+import argparse
+import re
+import subprocess
+import sys
+from statistics import median
+
+from src.config import BASE_DIR
+
+# Cumulative import budget per entry point, in milliseconds. The app budget
+# covers streamlit + pandas themselves; what must not show up is openai,
+# dotenv or the pipeline stages.
+STARTUP_BUDGET_MS = {
+    "src.config": 30,
+    "src.run_pipeline": 60,
+    "src.web.app_streamlit": 1500,
+}
+
+# Modules that must not be imported at startup by any target
+LAZY_MODULES = ("openai", "dotenv", "src.data_pipeline.build_events")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _importtime(module: str) -> list[tuple[str, int, int]]:
+    """
+    [(module, self_us, cumulative_us)] for a cold import of `module`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def measure(module: str, runs: int) -> tuple[float, list[tuple[str, int, int]]]:
+    """
+    Median cumulative import time (ms) over `runs` cold starts, plus the
+    per-module breakdown of the last run.
+    """
+    totals = []
+    rows: list[tuple[str, int, int]] = []
+    for _ in range(runs):
+        rows = _importtime(module)
+        total = next((cum for name, _, cum in rows if name == module), 0)
+        totals.append(total / 1000.0)
+    return median(totals), rows
+
+
+def main(runs: int, top: int) -> int:
+    failed = False
+    for module, budget in STARTUP_BUDGET_MS.items():
+        try:
+            ms, rows = measure(module, runs)
+        except RuntimeError as e:
+            print(f"{module:24s} SKIP ({e})")
+            continue
+
+        eager = [name for name, _, _ in rows if name.startswith(LAZY_MODULES)]
+        ok = ms <= budget and not eager
+        failed |= not ok
+        print(f"{module:24s} {ms:8.1f} ms  (budget {budget} ms)  {'OK' if ok else 'OVER'}")
+        if eager:
+            print(f"  eagerly imported: {', '.join(sorted(set(eager)))}")
+        for name, self_us, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+            print(f"    {self_us / 1000:7.1f} ms  {name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=5, help="slowest modules to list per target")
+    args = ap.parse_args()
+    sys.exit(main(args.runs, args.top))
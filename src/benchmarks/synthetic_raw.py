@@ -0,0 +1,82 @@
+"""
+Synthetic raw data at scale, built from the sample inputs in data_raw/: each
+sample file is copied into the partitioned layout for `days` x `robots`
+(data_raw/<source>/date=.../controller=R../<file>), with every date moved to
+the partition's day and float CSV columns jittered per robot, so the copies
+exercise the real parsers without being identical.
+
+    python -m src.benchmarks.synthetic_raw /tmp/big_raw --days 7 --robots 8
+"""
+import argparse
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import RAW_SOURCES, DEFAULT_LOG_DATE
+from src.data_pipeline.partitions import partition_dir
+
+_DATE = re.compile(r"(\d{4})([-/])(\d{2})\2(\d{2})")
+
+
+def _shift_dates(text: str, days: int) -> str:
+    if not days:
+        return text
+
+    def shift(m: re.Match) -> str:
+        d = date(int(m[1]), int(m[3]), int(m[4])) + timedelta(days=days)
+        return d.strftime(f"%Y{m[2]}%m{m[2]}%d")
+
+    return _DATE.sub(shift, text)
+
+
+def _jitter_csv(path: Path, text: str, rng: np.random.Generator, scale: float) -> str:
+    df = pd.read_csv(path)
+    for col in df.select_dtypes(include="float").columns:
+        df[col] = (df[col] * rng.lognormal(0.0, scale, len(df))).round(3)
+    return df.to_csv(index=False)
+
+
+def write_synthetic_raw(
+    out_dir: Path,
+    days: int,
+    robots: int,
+    source_dir: Path | None = None,
+    jitter: float = 0.05,
+    seed: int = 13,
+) -> int:
+    """
+    Fill out_dir with days x robots partitions of every sample source found
+    in source_dir (default: the configured RAW_SOURCES). Returns bytes written.
+    """
+    rng = np.random.default_rng(seed)
+    written = 0
+    for source, sample in RAW_SOURCES.items():
+        if source_dir is not None:
+            sample = Path(source_dir) / sample.name
+        if not sample.exists():
+            continue
+        text = sample.read_text(encoding="utf-8")
+        for r in range(1, robots + 1):
+            body = text
+            if sample.suffix == ".csv" and r > 1:
+                body = _jitter_csv(sample, text, rng, jitter)
+            for d in range(days):
+                day = DEFAULT_LOG_DATE + timedelta(days=d)
+                target = partition_dir(Path(out_dir), source, day, f"R{r:02d}") / sample.name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                written += target.write_text(_shift_dates(body, d), encoding="utf-8")
+    return written
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("out_dir", type=Path)
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--robots", type=int, default=8)
+    ap.add_argument("--jitter", type=float, default=0.05, help="lognormal sigma for float CSV columns")
+    args = ap.parse_args()
+    n = write_synthetic_raw(args.out_dir, args.days, args.robots, jitter=args.jitter)
+    print(f"Wrote {n / 1e6:.1f} MB of raw inputs -> {args.out_dir}")
@@ -0,0 +1,78 @@
+"""
+Timestamp parsing benchmark: dateutil on every line (the old parse path) vs.
+timestamps.parse_timestamp_ns (LRU cache + strict fixed-format path).
+
+    python -m src.benchmarks.timestamps --lines 1000000
+"""
+import argparse
+import random
+import time
+
+from src.config import DEFAULT_LOG_DATE
+from src.data_pipeline.records import datetime_to_ns
+from src.data_pipeline.timestamps import (
+    parse_datetime,
+    parse_timestamp_ns,
+    reset_timestamp_cache,
+    timestamp_cache_stats,
+)
+
+
+def synthetic_timestamps(n: int, hours: int, seed: int = 3) -> list[str]:
+    """
+    Second-resolution controller timestamps within `hours` of one day, with
+    bursts of repeated seconds and a few slash-dated lines.
+    """
+    rnd = random.Random(seed)
+    day = DEFAULT_LOG_DATE.isoformat()
+    out = []
+    sec = 0
+    for _ in range(n):
+        if rnd.random() < 0.3:
+            sec = (sec + rnd.randrange(5)) % (hours * 3600)
+        h, rem = divmod(sec, 3600)
+        text = f"{day} {h:02d}:{rem // 60:02d}:{rem % 60:02d}"
+        if rnd.random() < 0.01:
+            text = text.replace("-", "/", 2)
+        out.append(text)
+    return out
+
+
+def _old(texts: list[str]) -> list[int]:
+    return [datetime_to_ns(parse_datetime(t)) for t in texts]
+
+
+def _new(texts: list[str]) -> list[int]:
+    return [parse_timestamp_ns(t) for t in texts]
+
+
+def _time(fn, texts):
+    started = time.perf_counter()
+    out = fn(texts)
+    return out, time.perf_counter() - started
+
+
+def main(n: int, hours: int) -> None:
+    texts = synthetic_timestamps(n, hours)
+    reset_timestamp_cache()
+    old, old_s = _time(_old, texts)
+    new, new_s = _time(_new, texts)
+    assert old == new
+
+    stats = timestamp_cache_stats()
+    print(f"{n:,} timestamps over {hours} h, results identical")
+    print(f"  dateutil per line         {old_s:6.2f} s")
+    print(f"  cached + strict fast path {new_s:6.2f} s")
+    print(f"  speedup: {old_s / new_s:.1f}x")
+    print(
+        f"  cache hit rate {stats['cache_hit_rate']:.1%}, strict {stats['strict_parses']:,},"
+        f" dateutil {stats['dateutil_parses']:,}"
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--hours", type=int, default=8, help="span of the synthetic log")
+    args = ap.parse_args()
+    main(args.lines, args.hours)
@@ -7,9 +7,17 @@ RAW_DIR = BASE_DIR / "data_raw"
 STAGE_DIR = BASE_DIR / "data_stage"
 STRUCTURED_DIR = BASE_DIR / "data_structured"
 VALIDATION_DIR = BASE_DIR / "validation"
+RUNS_DIR = BASE_DIR / "runs"  # versioned snapshots of published pipeline outputs
+
+
+def ensure_dirs() -> None:
+    """
+    Create the data directories. Called by the stages that write output rather
+    than at import time, so importing config stays free of filesystem work.
+    """
+    for d in (RAW_DIR, STAGE_DIR, STRUCTURED_DIR, VALIDATION_DIR, RUNS_DIR):
+        d.mkdir(parents=True, exist_ok=True)
 
-for d in (RAW_DIR, STAGE_DIR, STRUCTURED_DIR, VALIDATION_DIR):
-    d.mkdir(parents=True, exist_ok=True)
 
 # Severity thresholds (tweak as needed)
 TORQUE_MEDIUM_THRESHOLD = 60.0  # percent of rated, example
@@ -18,6 +26,42 @@ TORQUE_CRITICAL_THRESHOLD = 80.0
 # How far back to look when counting repeat events (hours)
 REPEAT_WINDOW_HOURS = 24
 
+# Maintenance note task classification: first rule whose keyword groups all
+# match the lower-cased note wins (any keyword within a group may match).
+MAINT_TASK_RULES = [
+    ("replace_motor", (("replace",), ("motor",))),
+    ("lubricate_axis", (("lubricat",),)),
+    ("check_belts", (("belt",),)),
+    ("clean_sensors", (("sensor",), ("clean",))),
+    ("inspect_wiring", (("wiring", "cable"),)),
+    ("calibrate_joints", (("calibrat", "zero"),)),
+]
+MAINT_NOTES_FAST_PATH = True  # vectorized whole-file parse instead of line by line
+
+# Distinct timestamp strings memoized by timestamps.parse_timestamp_ns
+TIMESTAMP_CACHE_SIZE = 131_072
+
+# Message keyword table (lower-case substring -> label) for the shared
+# Aho-Corasick matcher used by the error-log filter, severity, collision type
+# and alert type classification.
+MESSAGE_KEYWORDS = {
+    "collision": "collision",
+    "torque limit": "torque_limit",
+    "overtravel": "overtravel",
+    "singularity": "singularity",
+    "fence open": "fence_open",
+    "e-stop": "e_stop",
+    "estop": "estop",
+    "temperature": "temperature",
+    "temp": "temperature",
+    "vibration": "vibration",
+    "network": "network",
+    "servo": "servo",
+    "battery": "battery",
+}
+# Error log messages carrying any of these labels become events
+INTERESTING_LABELS = ("collision", "torque_limit", "overtravel", "singularity", "e_stop", "fence_open")
+
 # Default date for logs/alerts that only contain a time (no date in the line)
 # This should match the date used in the sample robot logs / torque cycles.
 DEFAULT_LOG_DATE = date(2025, 11, 17)
@@ -31,6 +75,136 @@ TORQUE_TIMESERIES_FILE = RAW_DIR / "Torque Timeseries.csv"
 TORQUE_CYCLES_FILE = RAW_DIR / "Torque Events by Cycle.csv"
 PERF_METRICS_FILE = RAW_DIR / "performance_metrics.csv"
 
+# Partitioned raw layout (production): RAW_DIR/<source>/date=YYYY-MM-DD/controller=X/<files>
+# When a source directory exists it takes precedence over the legacy single file above.
+RAW_SOURCES = {
+    "error_logs": ERROR_LOGS_FILE,
+    "system_alerts": SYSTEM_ALERTS_FILE,
+    "maintenance_notes": MAINT_NOTES_FILE,
+    "sensor_readings": SENSOR_READINGS_FILE,
+    "torque_timeseries": TORQUE_TIMESERIES_FILE,
+    "torque_cycles": TORQUE_CYCLES_FILE,
+    "performance_metrics": PERF_METRICS_FILE,
+}
+PARTITION_MANIFEST_NAME = "_manifest.json"
+
+# Dashboard uploads (see ingest.py): streamed in chunks, sniffed by content,
+# skipped when the same bytes were already ingested into the same file
+UPLOAD_REGISTRY_FILE = RAW_DIR / "_ingested.json"  # raw file name -> sha256, size, upload name
+UPLOAD_CHUNK_BYTES = 1 << 20
+UPLOAD_SNIFF_BYTES = 64 * 1024  # decompressed bytes inspected to detect the format
+
+# Robot / cell identity. Partitioned inputs take robot_id from controller=X;
+# the legacy single-file layout is treated as one robot.
+DEFAULT_ROBOT_ID = "robot-1"
+DEFAULT_CELL_ID = "cell-1"
+ROBOT_CELLS: dict[str, str] = {}  # robot_id -> cell_id, e.g. {"R17": "cell-3"}
+
+# Worker processes for build_events robot shards (None = os.cpu_count())
+BUILD_WORKERS = None
+# Implementation of the build_events joins and classification: "pandas" (the
+# row-by-row reference) or "arrow" (vectorized pyarrow.compute, same output)
+EVENT_BACKEND = "pandas"
+
+# Compressed raw inputs (.gz/.bz2/.zst, see raw_io.py): worker processes used
+# to decompress several files at once (None = os.cpu_count()), and the size
+# from which a multi-member gzip is split into members decompressed in parallel
+RAW_DECOMPRESS_WORKERS = None
+RAW_GZIP_SPLIT_MIN_BYTES = 8 << 20
+
+# Sensor anomaly detection (EWMA z-score per channel, see detect_anomalies.py)
+ANOMALY_EWMA_ALPHA = 0.1  # weight of the newest sample in the running mean/variance
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_WARMUP_SAMPLES = 10  # samples per channel before scoring starts
+ANOMALY_MERGE_SECONDS = 60  # flagged samples closer than this form one interval
+ANOMALY_LOOKBACK_MINUTES = 15  # how far before an event an anomaly is still attached
+# Channels scored per stream (case-insensitive column names): health signals
+# only; commanded joint angles (Axis*_deg) move with normal motion
+ANOMALY_CHANNELS = {
+    "sensor_readings": ("Temperature_C", "Vibration_g"),
+    "performance_metrics": ("Metric1", "Metric2", "Metric3", "Metric4"),
+}
+
+# Torque-cycle overload events (detect_overloads.py). A cycle peak with no
+# related error code becomes a synthetic event when it reaches
+# TORQUE_CRITICAL_THRESHOLD, or when it reaches TORQUE_MEDIUM_THRESHOLD and
+# exceeds its axis' own baseline: the OVERLOAD_BASELINE_QUANTILE of the
+# previous OVERLOAD_BASELINE_CYCLES cycles on that robot/axis (none until an
+# axis has OVERLOAD_MIN_HISTORY cycles). Severity follows the threshold crossed.
+OVERLOAD_EVENTS = True
+OVERLOAD_BASELINE_CYCLES = 50
+OVERLOAD_BASELINE_QUANTILE = 0.95
+OVERLOAD_MIN_HISTORY = 10
+OVERLOAD_EPISODE_MINUTES = 10  # overloads on an axis closer than this are one event
+
+# Alert correlation (build_events._attach_alerts). The single best alert
+# within ±ALERT_MATCH_SECONDS fills alert_level/alert_type/alert_message; each
+# trailing window below adds counts by type and level, and the max level seen.
+ALERT_LEVELS = ("INFO", "NOTICE", "WARN", "ALERT", "CRITICAL")  # lowest to highest
+ALERT_MATCH_SECONDS = 30
+ALERT_FEATURE_WINDOWS = {"30s": 30, "5min": 300, "1h": 3600}  # column label -> seconds before the event
+ALERT_FEATURE_TYPES = ("temperature", "vibration", "network", "servo", "battery")
+ALERT_RECENCY_TYPES = ("temperature", "vibration")  # secs_since_<type>_alert columns
+
+# Root-cause chains (build_chains.py). Error events, alerts and torque-cycle
+# overloads are linked to the latest earlier node of each kind on the same
+# robot within that kind's window; errors and overloads only link along the
+# same axis, alerts are robot-wide and only precede errors on a single axis.
+# Linked nodes containing an error form a chain; maintenance on the chain's
+# axis shortly before it is added as context.
+CHAIN_LINK_SECONDS = {"alert": 300, "overload": 60, "error": 120}  # by kind of the earlier node
+CHAIN_ALERT_MIN_LEVEL = "WARN"  # lowest ALERT_LEVELS entry that can start a chain
+CHAIN_OVERLOAD_PCT = TORQUE_CRITICAL_THRESHOLD  # cycle peak torque that counts as an overload
+CHAIN_MAINT_LOOKBACK_DAYS = 7
+
+# Per-axis forecasts (forecast.py). Each robot/axis keeps an exponentially
+# decayed rate of FORECAST_SEVERITIES events and an exponentially weighted
+# linear trend of cycle peak torque. A pipeline run refits them from its
+# inputs; follow mode updates them from the new data only, using the state
+# saved in FORECAST_STATE_FILE.
+FORECAST_SEVERITIES = ("high", "critical")
+FORECAST_RATE_HALF_LIFE_HOURS = 12.0
+FORECAST_TREND_HALF_LIFE_HOURS = 4.0
+FORECAST_HORIZON_HOURS = 1.0  # window for p_high_severity and the torque crossing
+
+# Per-event context windows for the dashboard deep dive (build_event_context.py)
+EVENT_CONTEXT_SECONDS = 60  # ± window around each event
+EVENT_CONTEXT_POINTS = 300  # max points per series after min/max decimation
+
+# Torque chart pyramid: level name -> bucket size in seconds, finest first
+TORQUE_PYRAMID_LEVELS = {"1s": 1, "10s": 10, "1min": 60, "10min": 600}
+
+# Offline diagnosis engine (src/ai/local_engine.py)
+LOCAL_RETRIEVAL_MIN_SCORE = 0.25  # cosine similarity (same collision_type) to cite a past LLM plan
+LOCAL_REPEAT_ESCALATION = 3  # repeats_24h at which a fault is treated as recurring
+
+# Reuse of past LLM plans for near-duplicate events (src/ai/similarity.py)
+AI_REUSE_MIN_SIMILARITY = 0.8  # Jaccard similarity of event signatures
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16  # 4 rows per band: pairs at 0.8 similarity collide with ~99.9% probability
+
+# Token budget for LLM plan runs (src/ai/prompt_budget.py); token counts are
+# local estimates (~4 characters per token), prices in USD per 1k tokens
+AI_MAX_PROMPT_TOKENS = 400  # per event: low-value fields are trimmed to fit
+AI_MAX_COMPLETION_TOKENS = 450  # per event: max_tokens of the request
+AI_EXPECTED_COMPLETION_TOKENS = 250  # typical plan length, for the projection
+AI_RUN_TOKEN_BUDGET = 25_000  # per run, prompts + worst-case completions + repairs; the rest get offline plans
+AI_PRICE_PER_1K_INPUT = 0.0025
+AI_PRICE_PER_1K_OUTPUT = 0.01
+AI_SECONDS_PER_CALL = 1.5  # request overhead + time to first token
+AI_OUTPUT_TOKENS_PER_SECOND = 60.0
+
+# Pipeline runs: one at a time under a lease lock, outputs published to
+# RUNS_DIR/<run_id>/ with CURRENT pointing at the latest (see storage.py)
+PIPELINE_LEASE_SECONDS = 900  # renewed every third of this while held; unrenewed = holder dead
+PIPELINE_LOCK_WAIT_SECONDS = 1800  # how long a second run waits for the first
+RUNS_KEEP = 5  # published run directories kept on disk
+
+# Live follow mode (python -m src.data_pipeline.follow)
+FOLLOW_POLL_SECONDS = 0.5  # how often raw logs are checked for new lines
+FOLLOW_RESCAN_SECONDS = 30.0  # how often new partitions/files are discovered
+DASHBOARD_REFRESH_SECONDS = 1.0  # Streamlit auto-refresh interval in live mode
+
 # Outputs (staged / structured)
 ERROR_LOGS_PARSED = STAGE_DIR / "error_logs_parsed.csv"
 SYSTEM_ALERTS_PARSED = STAGE_DIR / "system_alerts_parsed.csv"
@@ -39,8 +213,30 @@ SENSOR_READINGS_CLEAN = STAGE_DIR / "sensor_readings_clean.csv"
 TORQUE_TIMESERIES_CLEAN = STAGE_DIR / "torque_timeseries_clean.csv"
 TORQUE_CYCLES_CLEAN = STAGE_DIR / "torque_cycles_clean.csv"
 PERF_METRICS_CLEAN = STAGE_DIR / "performance_metrics_clean.csv"
+SENSOR_ANOMALIES_FILE = STAGE_DIR / "sensor_anomalies.csv"
+TORQUE_PYRAMID_DIR = STAGE_DIR / "torque_pyramid"  # level=<name>.csv per TORQUE_PYRAMID_LEVELS
+FORECAST_STATE_FILE = STAGE_DIR / "forecast_state.json"  # per-axis model state + watermarks
 
 EVENTS_FILE = STRUCTURED_DIR / "events.csv"
 AI_RECOMMENDATIONS_FILE = STRUCTURED_DIR / "ai_recommendations.csv"
+AI_PLAN_HISTORY_FILE = STRUCTURED_DIR / "ai_plan_history.jsonl"  # event signature + LLM plan per line
+EVENT_CHAINS_FILE = STRUCTURED_DIR / "event_chains.csv"  # one row per root-cause chain
+AXIS_FORECAST_FILE = STRUCTURED_DIR / "axis_forecast.csv"  # robot/axis ranked by risk
+EVENT_CONTEXT_FILE = STRUCTURED_DIR / "event_context.csv"  # long format: event_id, series, timestamp, value
 VALIDATION_REPORT_FILE = VALIDATION_DIR / "events_quality_report.json"
-VALIDATION_SUMMARY_FILE = VALIDATION_DIR / "events_quality_summary.txt"
\ No newline at end of file
+VALIDATION_SUMMARY_FILE = VALIDATION_DIR / "events_quality_summary.txt"
+VALIDATION_STATE_FILE = VALIDATION_DIR / "events_quality_state.json"  # running aggregates
+VALIDATION_DELTA_FILE = VALIDATION_DIR / "events_quality_delta.json"  # last run's batch only
+VALIDATION_HISTORY_FILE = VALIDATION_DIR / "events_quality_history.jsonl"  # one line per run
+
+CURRENT_RUN_FILE = RUNS_DIR / "CURRENT"  # JSON: run_id, finished_at, input fingerprint
+PIPELINE_LOCK_FILE = RUNS_DIR / ".pipeline.lock"
+# Outputs readers load together; snapshotted per run so they always match
+PUBLISHED_FILES = (
+    EVENTS_FILE,
+    EVENT_CHAINS_FILE,
+    AXIS_FORECAST_FILE,
+    EVENT_CONTEXT_FILE,
+    VALIDATION_REPORT_FILE,
+    VALIDATION_SUMMARY_FILE,
+)
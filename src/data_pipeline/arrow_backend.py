@@ -0,0 +1,248 @@
+"""
+Vectorized event backend (EVENT_BACKEND = "arrow"): the build_events joins
+and classification as pyarrow.compute kernels plus NumPy binary search, with
+the output of the pandas reference (PandasEventBackend) value for value.
+
+- torque cycles: an interval join; cycles are sorted by start once, and
+  every event binary-searches the cycles that can contain it (those that
+  started within the longest cycle before it), so overlapping cycles, e.g.
+  all axes running at once, stay vectorized;
+- maintenance: an as-of join, i.e. sort the notes once and binary-search
+  every event into them, instead of filtering all notes per event;
+- repeats: one sort by (axis, error_code), then a binary search per group;
+- severity / collision type: messages and codes are dictionary-encoded and
+  keyword-matched once per distinct value.
+
+Tie-breaking follows the reference exactly (first containing cycle in file
+order, last same-day maintenance note in file order), which an Acero as-of
+join does not promise, hence the explicit sort keys. Everything runs as
+single-threaded NumPy/pyarrow.compute kernels rather than an Acero or Polars
+plan: the joins are dominated by the sorts, and both would need their own
+ordering pass to reproduce the reference's tie-breaking.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.config import REPEAT_WINDOW_HOURS, TORQUE_CRITICAL_THRESHOLD, TORQUE_MEDIUM_THRESHOLD
+from src.data_pipeline.build_events import (
+    _COLLISION_TYPES,
+    _STOP_LABELS,
+    _attach_torque_cycles,
+    _attach_last_maintenance,
+    _epoch_ns,
+)
+from src.data_pipeline.keyword_matcher import MESSAGE_MATCHER
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+_NAT = np.iinfo(np.int64).min
+# (event, candidate cycle) pairs materialized at once by _containing_cycle
+_PAIR_CHUNK = 1 << 22
+
+
+def _encode(values: pd.Series) -> tuple[np.ndarray, list]:
+    """
+    Dictionary-encode a column: (codes, distinct values), code -1 for nulls.
+    """
+    arr = pc.dictionary_encode(pa.array(values.astype(object), from_pandas=True))
+    codes = arr.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+    return codes, arr.dictionary.to_pylist()
+
+
+def _per_value(values: pd.Series, fn, null) -> np.ndarray:
+    # fn applied once per distinct value (null -> `null`), broadcast back
+    codes, uniques = _encode(values)
+    table = np.array([fn(u) for u in uniques] + [null], dtype=object)
+    return table[codes]
+
+
+def _sort_keys(*keys: np.ndarray) -> np.ndarray:
+    # Row order by keys[0], then keys[1], ...; ties keep frame order
+    table = pa.table({f"k{i}": k for i, k in enumerate(keys)} | {"row": np.arange(len(keys[0]))})
+    order = [(f"k{i}", "ascending") for i in range(len(keys))] + [("row", "ascending")]
+    return pc.sort_indices(table, sort_keys=order).to_numpy()
+
+
+def _set(events: pd.DataFrame, col: str, rows: np.ndarray, values) -> None:
+    """
+    events[col][rows] = values, re-inferring the dtype the way the reference
+    infers it when it rebuilds the frame from row Series.
+    """
+    if col in events.columns:
+        out = events[col].to_numpy(dtype=object, copy=True)
+    else:
+        out = np.full(len(events), np.nan, dtype=object)
+    out[rows] = values
+    events[col] = pd.Series(out, index=events.index).infer_objects()
+
+
+def _containing_cycle(ts: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Per event time: index of the first cycle (in frame order) with
+    start <= t <= end, -1 if none. Cycles may overlap: the candidates of an
+    event are the cycles sorted by start between t - (longest cycle) and t,
+    expanded into (event, cycle) pairs in chunks of _PAIR_CHUNK.
+    """
+    out = np.full(len(ts), -1)
+    valid = np.flatnonzero((starts != _NAT) & (ends != _NAT))
+    if len(valid) == 0:
+        return out
+    order = valid[_sort_keys(starts[valid])]
+    s, e = starts[order], ends[order]
+    longest = max(int((e - s).max()), 0)
+
+    ok = ts != _NAT
+    hi = np.where(ok, np.searchsorted(s, ts, side="right"), 0)
+    lo = np.where(ok, np.searchsorted(s, ts - longest, side="left"), 0)
+    counts = np.maximum(hi - lo, 0)
+    csum = np.cumsum(counts)
+    first = 0
+    while first < len(ts):
+        done = csum[first] - counts[first]
+        last = max(first + 1, int(np.searchsorted(csum, done + _PAIR_CHUNK, side="right")))
+        n = counts[first:last]
+        ev = np.repeat(np.arange(first, last), n)
+        pos = np.repeat(lo[first:last], n) + np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        hit = e[pos] >= ts[ev]
+        best = np.full(last - first, len(starts))
+        np.minimum.at(best, ev[hit] - first, order[pos[hit]])
+        out[first:last] = np.where(best < len(starts), best, -1)
+        first = last
+    return out
+
+
+class ArrowEventBackend:
+    """
+    Same interface and output as PandasEventBackend.
+    """
+
+    name = "arrow"
+
+    @staticmethod
+    def attach_torque_cycles(events: pd.DataFrame, cycles: pd.DataFrame) -> pd.DataFrame:
+        if events.empty or cycles.empty:
+            return _attach_torque_cycles(events, cycles)
+
+        for col in ("cycle_start", "cycle_end"):
+            cycles[col] = pd.to_datetime(cycles[col], errors="coerce", utc=True)
+        if "peak_torque_pct" not in events.columns:
+            events["peak_torque_pct"] = pd.NA
+
+        ts = _epoch_ns(events["timestamp"])
+        match = _containing_cycle(ts, _epoch_ns(cycles["cycle_start"]), _epoch_ns(cycles["cycle_end"]))
+
+        # Overload events come with their own cycle already
+        todo = np.flatnonzero((match >= 0) & events["peak_torque_pct"].isna().to_numpy())
+        if len(todo) == 0:
+            return events
+        m = match[todo]
+        _set(events, "cycle_id", todo, cycles["cycle_id"].to_numpy(dtype=object)[m])
+        _set(events, "peak_torque_pct", todo, cycles["peak_torque_pct"].to_numpy(dtype=object)[m])
+
+        # If axis was unknown (0) but cycle axis exists, infer it
+        cycle_axis = pd.to_numeric(cycles["axis"], errors="coerce").to_numpy(dtype=float)[m]
+        infer = (events["axis"].to_numpy()[todo] == 0) & ~np.isnan(cycle_axis)
+        if infer.any():
+            rows = todo[infer]
+            events.iloc[rows, events.columns.get_loc("axis")] = cycle_axis[infer].astype(int)
+            events.iloc[rows, events.columns.get_loc("axis_source")] = "from_torque_cycle"
+        return events
+
+    @staticmethod
+    def attach_last_maintenance(events: pd.DataFrame, maint: pd.DataFrame) -> pd.DataFrame:
+        if events.empty or maint.empty:
+            return _attach_last_maintenance(events, maint)
+        if not pd.api.types.is_numeric_dtype(maint["axis"]):
+            print("arrow backend: non-numeric maintenance axis, using the pandas reference join")
+            return _attach_last_maintenance(events, maint)
+
+        dates = pd.to_datetime(maint["date"], errors="coerce")
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        m_day = dates.dt.normalize().to_numpy("datetime64[ns]").view("int64")
+        m_axis = maint["axis"].to_numpy(dtype=float)
+        valid = np.flatnonzero(~dates.isna().to_numpy() & ~np.isnan(m_axis))
+        order = valid[_sort_keys(m_axis[valid], m_day[valid])]
+
+        ts = _epoch_ns(events["timestamp"])
+        ev_day = (ts // _NS_PER_DAY) * _NS_PER_DAY
+        ev_axis = events["axis"].to_numpy(dtype=float)
+        ok = ts != _NAT
+        last = np.full(len(events), -1)
+        for axis in np.unique(m_axis[order]):
+            # Notes of this axis by date, then file order: the last entry on
+            # or before the event day is the latest, the last in file order on ties
+            notes = order[m_axis[order] == axis]
+            rows = np.flatnonzero(ok & (ev_axis == axis))
+            pos = np.searchsorted(m_day[notes], ev_day[rows], side="right") - 1
+            last[rows[pos >= 0]] = notes[pos[pos >= 0]]
+        rows = np.flatnonzero(last >= 0)
+        if len(rows) == 0:
+            return events
+
+        last = last[rows]
+        last_date = dates.dt.date.to_numpy(dtype=object)[last]
+        _set(events, "last_maintenance_date", rows, last_date)
+        _set(events, "last_maintenance_task", rows, maint["task_type"].to_numpy(dtype=object)[last])
+        _set(events, "days_since_last_maintenance", rows, (ev_day[rows] - m_day[last]) // _NS_PER_DAY)
+        return events
+
+    @staticmethod
+    def repeats(events: pd.DataFrame) -> list[int]:
+        n = len(events)
+        if n == 0:
+            return []
+        ts = _epoch_ns(events["timestamp"])
+        code, _ = _encode(events["error_code"])
+        axis = events["axis"].to_numpy()
+        # NaN codes and missing timestamps never match anything
+        valid = np.flatnonzero((code >= 0) & (ts != _NAT))
+        order = valid[_sort_keys(axis[valid], code[valid])]
+        out = np.zeros(n, dtype=np.int64)
+        if len(order) == 0:
+            return out.tolist()
+
+        # Frame is in timestamp order, so each group is too: the count is
+        # the position in the group minus the first position in the window
+        key_a, key_c, t = axis[order], code[order], ts[order]
+        bounds = np.flatnonzero(np.concatenate(([True], (key_a[1:] != key_a[:-1]) | (key_c[1:] != key_c[:-1]), [True])))
+        window = int(REPEAT_WINDOW_HOURS * 3600 * 1_000_000_000)
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            g = t[lo:hi]
+            out[order[lo:hi]] = np.arange(hi - lo) - np.searchsorted(g, g - window, side="left")
+        return out.tolist()
+
+    @staticmethod
+    def severity(events: pd.DataFrame) -> pd.Series:
+        def stop(msg: str) -> bool:
+            return not MESSAGE_MATCHER.match(msg.lower()).isdisjoint(_STOP_LABELS)
+
+        # Null messages/levels behave like "" ("nan" matches no keyword either)
+        is_stop = _per_value(events["message_raw"], stop, False).astype(bool)
+        p = pd.to_numeric(events["peak_torque_pct"], errors="coerce").to_numpy(dtype=float)
+        level = pa.array(events["alert_level"].astype(object), from_pandas=True, type=pa.string())
+        level = pc.utf8_upper(level).fill_null("").to_numpy(zero_copy_only=False)
+
+        crit, med = p >= TORQUE_CRITICAL_THRESHOLD, p >= TORQUE_MEDIUM_THRESHOLD
+        out = np.select(
+            [is_stop & crit, is_stop, crit, med, level == "CRITICAL", np.isin(level, ["ALERT", "WARN"])],
+            ["critical", "high", "critical", "medium", "critical", "medium"],
+            "low",
+        )
+        return pd.Series(out.astype(object), index=events.index)
+
+    @staticmethod
+    def collision_types(events: pd.DataFrame) -> pd.Series:
+        kind = _per_value(events["message_raw"], lambda m: MESSAGE_MATCHER.first(m.lower(), _COLLISION_TYPES), None)
+
+        code = pa.array(events["error_code"].astype(object), from_pandas=True, type=pa.string())
+        fallback = np.select(
+            [
+                pc.starts_with(code, "SRVO").fill_null(False).to_numpy(zero_copy_only=False),
+                pc.starts_with(code, "MOTN").fill_null(False).to_numpy(zero_copy_only=False),
+            ],
+            ["servo_fault", "motion_fault"],
+            "other",
+        )
+        return pd.Series(np.where(pd.isna(kind), fallback, kind), index=events.index, dtype=object)
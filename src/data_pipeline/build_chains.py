@@ -0,0 +1,332 @@
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    EVENTS_FILE,
+    SYSTEM_ALERTS_PARSED,
+    TORQUE_CYCLES_CLEAN,
+    MAINT_NOTES_PARSED,
+    EVENT_CHAINS_FILE,
+    CHAIN_LINK_SECONDS,
+    CHAIN_OVERLOAD_PCT,
+    CHAIN_MAINT_LOOKBACK_DAYS,
+    CHAIN_ALERT_MIN_LEVEL,
+    ALERT_LEVELS,
+    DEFAULT_ROBOT_ID,
+    ensure_dirs,
+)
+from src.data_pipeline.detect_overloads import OVERLOAD_ERROR_CODE
+from src.data_pipeline.storage import write_csv
+
+CHAIN_COLUMNS = [
+    "chain_id",
+    "robot_id",
+    "axis",
+    "start",
+    "end",
+    "duration_s",
+    "n_nodes",
+    "n_events",
+    "event_ids",
+    "root_cause",
+    "prior_maintenance",
+    "summary",
+]
+
+# Longest summary, in collapsed steps, before the middle is elided
+_SUMMARY_STEPS = 12
+
+
+def _read(path, **kwargs) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path, **kwargs)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame()
+
+
+def _robot(df: pd.DataFrame) -> pd.Series:
+    if "robot_id" in df.columns:
+        return df["robot_id"].astype(object).fillna(DEFAULT_ROBOT_ID).astype(str)
+    return pd.Series(DEFAULT_ROBOT_ID, index=df.index)
+
+
+def _axis(df: pd.DataFrame) -> pd.Series:
+    if "axis" not in df.columns:
+        return pd.Series(0, index=df.index)
+    return pd.to_numeric(df["axis"], errors="coerce").fillna(0).astype(int)
+
+
+def _text(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[col].astype(object).fillna("").astype(str)
+
+
+def _nodes(events: pd.DataFrame, alerts: pd.DataFrame, cycles: pd.DataFrame) -> pd.DataFrame:
+    """
+    Graph nodes, one per error event, alert and overloaded torque cycle:
+    kind, robot_id, axis (0 = unknown / robot-wide), t_ns, label, event_id.
+    """
+    frames = []
+    if not events.empty:
+        axis = _axis(events)
+        what = _text(events, "collision_type").where(lambda s: s != "", _text(events, "error_code"))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "kind": "error",
+                    "robot_id": _robot(events),
+                    "axis": axis,
+                    "t": events["timestamp"],
+                    "label": what + np.where(axis > 0, " J" + axis.astype(str), ""),
+                    "event_id": events["event_id"],
+                }
+            )
+        )
+    if not alerts.empty:
+        # Alerts below CHAIN_ALERT_MIN_LEVEL (routine INFO/NOTICE) never link
+        level = _text(alerts, "alert_level").str.upper()
+        alerts = alerts[level.isin(ALERT_LEVELS[ALERT_LEVELS.index(CHAIN_ALERT_MIN_LEVEL) :])]
+        what = _text(alerts, "alert_type").where(lambda s: s != "", _text(alerts, "alert_message"))
+        level = _text(alerts, "alert_level")
+        frames.append(
+            pd.DataFrame(
+                {
+                    "kind": "alert",
+                    "robot_id": _robot(alerts),
+                    "axis": 0,
+                    "t": alerts["timestamp"],
+                    "label": what + " alert" + np.where(level != "", " (" + level + ")", ""),
+                    "event_id": pd.NA,
+                }
+            )
+        )
+    if not cycles.empty:
+        pct = pd.to_numeric(cycles["peak_torque_pct"], errors="coerce")
+        over = cycles[pct >= CHAIN_OVERLOAD_PCT]
+        if not events.empty and "cycle_id" in events.columns:
+            # Cycles already turned into overload events are nodes once, as events
+            synthetic = events[_text(events, "error_code") == OVERLOAD_ERROR_CODE]
+            seen = set(zip(_robot(synthetic), _axis(synthetic), synthetic["cycle_id"].astype(float)))
+            own = pd.Series(
+                [k in seen for k in zip(_robot(over), _axis(over), over["cycle_id"].astype(float))],
+                index=over.index,
+                dtype=bool,
+            )
+            over = over[~own]
+        axis = _axis(over)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "kind": "overload",
+                    "robot_id": _robot(over),
+                    "axis": axis,
+                    "t": over["cycle_start"],
+                    "label": "J" + axis.astype(str) + " overload " + pct[over.index].round().astype(int).astype(str) + "%",
+                    "event_id": pd.NA,
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=["kind", "robot_id", "axis", "t", "t_ns", "label", "event_id"])
+
+    nodes = pd.concat(frames, ignore_index=True)
+    nodes["t"] = pd.to_datetime(nodes["t"], errors="coerce", utc=True)
+    nodes = nodes.dropna(subset=["t"]).sort_values(["robot_id", "t"], kind="stable").reset_index(drop=True)
+    nodes["t_ns"] = nodes["t"].dt.tz_convert(None).to_numpy("datetime64[ns]").view("int64")
+    return nodes
+
+
+def _links(nodes: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Edges (earlier node, later node). Each error/overload node links to the
+    latest earlier node of every kind within CHAIN_LINK_SECONDS[kind], found
+    by binary search in that kind's time-sorted array for the same robot
+    (and axis, for errors and overloads). Alerts are chain roots and only
+    link into errors, so neither an alert burst nor an alert followed by
+    overloads on unrelated axes chains by itself; and an alert only links
+    into errors on one axis (see _alert_axis), so it cannot bridge axes.
+    """
+    src, dst = [], []
+    queries = nodes[nodes["kind"] != "alert"]
+    for kind, seconds in CHAIN_LINK_SECONDS.items():
+        window = int(seconds * 1_000_000_000)
+        keys = ["robot_id"] if kind == "alert" else ["robot_id", "axis"]
+        q = queries[queries["kind"] == "error"] if kind == "alert" else queries[queries["axis"] > 0]
+        q_groups = dict(list(q.groupby(keys, sort=False)))
+        for key, cand in nodes[nodes["kind"] == kind].groupby(keys, sort=False):
+            qk = q_groups.get(key)
+            if qk is None:
+                continue
+            ct = cand["t_ns"].to_numpy()
+            qt = qk["t_ns"].to_numpy()
+            # Same-kind predecessors must be strictly earlier (never the node itself)
+            pos = np.where(
+                qk["kind"].to_numpy() == kind,
+                np.searchsorted(ct, qt, side="left"),
+                np.searchsorted(ct, qt, side="right"),
+            ) - 1
+            ok = pos >= 0
+            ok[ok] = qt[ok] - ct[pos[ok]] <= window
+            s, d = cand.index.to_numpy()[pos[ok]], qk.index.to_numpy()[ok]
+            if kind == "alert":
+                s, d = _alert_axis(s, d, nodes["axis"].to_numpy())
+            src.append(s)
+            dst.append(d)
+    if not src:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    return np.concatenate(src), np.concatenate(dst)
+
+
+def _alert_axis(src: np.ndarray, dst: np.ndarray, axis: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Alert edges restricted to one axis per alert: that of the first error
+    with a known axis it precedes. Errors of unknown axis (0) keep their link.
+    """
+    links = pd.DataFrame({"src": src, "dst": dst, "axis": axis[dst]}).sort_values(["src", "dst"])
+    known = links[links["axis"] > 0].groupby("src")["axis"].first()
+    links = links[(links["axis"] == 0) | (links["axis"] == links["src"].map(known))]
+    return links["src"].to_numpy(), links["dst"].to_numpy()
+
+
+def _components(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    Connected component root per node (union-find with path halving).
+    """
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in zip(src.tolist(), dst.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.array([find(i) for i in range(n)], dtype=int)
+
+
+def _summary(labels: list[str]) -> str:
+    # Collapse repeats ("torque_limit J3 ×4") and elide the middle of long chains
+    steps: list[list] = []
+    for label in labels:
+        if steps and steps[-1][0] == label:
+            steps[-1][1] += 1
+        else:
+            steps.append([label, 1])
+    parts = [f"{label} ×{n}" if n > 1 else label for label, n in steps]
+    if len(parts) > _SUMMARY_STEPS:
+        half = _SUMMARY_STEPS // 2
+        parts = parts[:half] + [f"… {len(parts) - 2 * half} more …"] + parts[-half:]
+    return " → ".join(parts)
+
+
+def _prior_maintenance(maint: pd.DataFrame, robot_id: str, axis: int, start: pd.Timestamp) -> str:
+    if maint.empty or axis <= 0:
+        return ""
+    day = start.date()
+    rows = maint[
+        (maint["robot_id"] == robot_id)
+        & (maint["axis"] == axis)
+        & (maint["date"] <= day)
+        & (maint["date"] >= day - pd.Timedelta(days=CHAIN_MAINT_LOOKBACK_DAYS))
+    ]
+    if rows.empty:
+        return ""
+    last = rows.sort_values("date").iloc[-1]
+    days = (day - last["date"]).days
+    return f"{last['task_type']} J{axis} ({days} d before)"
+
+
+def link_chains(
+    events: pd.DataFrame,
+    alerts: pd.DataFrame,
+    cycles: pd.DataFrame,
+    maint: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (events with a chain_id column, one summary row per chain). A chain is a
+    connected group of at least two linked nodes containing an error event;
+    chain ids follow chain start time.
+    """
+    events = events.copy()
+    events["chain_id"] = pd.array([pd.NA] * len(events), dtype="Int64")
+    nodes = _nodes(events, alerts, cycles)
+    if nodes.empty:
+        return events, pd.DataFrame(columns=CHAIN_COLUMNS)
+
+    src, dst = _links(nodes)
+    nodes["component"] = _components(len(nodes), src, dst)
+    sizes = nodes.groupby("component")["kind"].agg(["size", lambda k: (k == "error").sum()])
+    sizes.columns = ["n_nodes", "n_events"]
+    keep = sizes[(sizes["n_nodes"] >= 2) & (sizes["n_events"] >= 1)].index
+    chained = nodes[nodes["component"].isin(keep)]
+
+    if not maint.empty:
+        maint = maint.assign(
+            robot_id=_robot(maint),
+            axis=_axis(maint),
+            date=pd.to_datetime(maint["date"], errors="coerce").dt.date,
+        ).dropna(subset=["date"])
+
+    rows = []
+    for _, g in chained.groupby("component", sort=False):
+        errors = g[g["kind"] == "error"]
+        axes = errors.loc[errors["axis"] > 0, "axis"]
+        axis = int(axes.mode().iloc[0]) if not axes.empty else 0
+        robot_id = g["robot_id"].iloc[0]
+        start, end = g["t"].iloc[0], g["t"].iloc[-1]
+        rows.append(
+            {
+                "robot_id": robot_id,
+                "axis": axis,
+                "start": start,
+                "end": end,
+                "duration_s": (end - start).total_seconds(),
+                "n_nodes": len(g),
+                "n_events": len(errors),
+                "event_ids": ";".join(str(int(e)) for e in errors["event_id"]),
+                "root_cause": g["label"].iloc[0],
+                "prior_maintenance": _prior_maintenance(maint, robot_id, axis, start),
+                "summary": _summary(g["label"].tolist()),
+                "_event_ids": errors["event_id"].astype(int).tolist(),
+            }
+        )
+    if not rows:
+        return events, pd.DataFrame(columns=CHAIN_COLUMNS)
+
+    chains = pd.DataFrame(rows).sort_values(["start", "robot_id"], kind="stable").reset_index(drop=True)
+    chains.insert(0, "chain_id", chains.index + 1)
+    chain_of = {e: cid for cid, ids in zip(chains["chain_id"], chains["_event_ids"]) for e in ids}
+    events["chain_id"] = events["event_id"].map(chain_of).astype("Int64")
+    return events, chains[CHAIN_COLUMNS]
+
+
+def build_chains() -> pd.DataFrame:
+    """
+    Link events.csv with the staged alerts, torque cycles and maintenance
+    notes; write EVENT_CHAINS_FILE and add chain_id to EVENTS_FILE.
+    """
+    ensure_dirs()
+    events = _read(EVENTS_FILE)
+    if events.empty:
+        raise SystemExit(f"{EVENTS_FILE} not found or empty. Run build_events.py first.")
+
+    events, chains = link_chains(
+        events,
+        _read(SYSTEM_ALERTS_PARSED),
+        _read(TORQUE_CYCLES_CLEAN),
+        _read(MAINT_NOTES_PARSED),
+    )
+    write_csv(chains, EVENT_CHAINS_FILE)
+    write_csv(events, EVENTS_FILE)
+    return chains
+
+
+if __name__ == "__main__":
+    chains = build_chains()
+    print(f"{len(chains)} chains -> {EVENT_CHAINS_FILE}")
+    if not chains.empty:
+        print(chains[["chain_id", "robot_id", "axis", "n_events", "summary"]].head(10).to_string(index=False))
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    EVENTS_FILE,
+    TORQUE_TIMESERIES_CLEAN,
+    SENSOR_READINGS_CLEAN,
+    EVENT_CONTEXT_FILE,
+    EVENT_CONTEXT_SECONDS,
+    EVENT_CONTEXT_POINTS,
+    DEFAULT_ROBOT_ID,
+    ensure_dirs,
+)
+from src.data_pipeline.storage import write_csv
+
+CONTEXT_COLUMNS = ["event_id", "series", "timestamp", "value"]
+
+_NOT_SENSOR_CHANNELS = ("robot_id", "cell_id")
+
+
+def minmax_decimate(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of a min/max decimation of `values` to at most `max_points`:
+    the samples are cut into max_points // 2 equal buckets and each bucket
+    keeps its minimum and maximum, in time order. Peaks survive, unlike with
+    plain striding.
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((values, bucket))  # by bucket, then by value
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.union1d(order[starts], order[ends])  # sorted -> time order
+    return keep
+
+
+def _series_table(df: pd.DataFrame) -> dict[tuple[str, str], tuple[np.ndarray, np.ndarray]]:
+    """
+    (robot_id, series) -> (sorted epoch-ns timestamps, values) with NaNs dropped.
+    """
+    out = {}
+    if df.empty or "timestamp" not in df.columns:
+        return out
+
+    df = df[df["timestamp"].notna()]
+    robots = df["robot_id"].astype(str) if "robot_id" in df.columns else pd.Series(DEFAULT_ROBOT_ID, index=df.index)
+    for robot_id, g in df.groupby(robots, sort=False):
+        g = g.sort_values("timestamp", kind="stable")
+        ts = g["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+        if "Torque_pct_of_rated" in g.columns and "Axis" in g.columns:
+            for axis, a in g.groupby("Axis", sort=True):
+                a_ts = a["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+                vals = a["Torque_pct_of_rated"].to_numpy(dtype=float)
+                ok = ~np.isnan(vals)
+                out[(robot_id, f"torque_J{int(axis)}_pct")] = (a_ts[ok], vals[ok])
+            continue
+        for col in g.select_dtypes(include="number").columns:
+            if col.lower() in _NOT_SENSOR_CHANNELS:
+                continue
+            vals = g[col].to_numpy(dtype=float)
+            ok = ~np.isnan(vals)
+            out[(robot_id, col)] = (ts[ok], vals[ok])
+    return out
+
+
+def _read_stream(path) -> pd.DataFrame:
+    try:
+        df = pd.read_csv(path)
+    except FileNotFoundError:
+        return pd.DataFrame()
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True).dt.tz_localize(None)
+    return df
+
+
+def build_event_context(
+    seconds: float = EVENT_CONTEXT_SECONDS,
+    max_points: int = EVENT_CONTEXT_POINTS,
+) -> pd.DataFrame:
+    """
+    For every event, a ±`seconds` slice of torque per axis and of each sensor
+    channel, min/max-decimated to at most `max_points` per series, so the
+    dashboard's deep dive can chart it without touching the full time series.
+    Slices are found by binary search on the time-sorted series.
+    """
+    ensure_dirs()
+    try:
+        events = pd.read_csv(EVENTS_FILE)
+    except FileNotFoundError:
+        raise SystemExit(f"{EVENTS_FILE} not found. Run build_events.py first.")
+
+    series = _series_table(_read_stream(TORQUE_TIMESERIES_CLEAN))
+    series.update(_series_table(_read_stream(SENSOR_READINGS_CLEAN)))
+
+    by_robot: dict[str, list[tuple[str, np.ndarray, np.ndarray]]] = {}
+    for (robot_id, name), (ts, vals) in series.items():
+        by_robot.setdefault(robot_id, []).append((name, ts, vals))
+
+    ev_ts = pd.to_datetime(events["timestamp"], errors="coerce", utc=True).dt.tz_localize(None)
+    ev_ns = ev_ts.to_numpy(dtype="datetime64[ns]").view("int64")
+    ev_robot = (
+        events["robot_id"].astype(str).to_numpy()
+        if "robot_id" in events.columns
+        else np.full(len(events), DEFAULT_ROBOT_ID)
+    )
+    half = int(seconds * 1_000_000_000)
+
+    frames = []
+    for event_id, t, robot_id, missing in zip(events["event_id"], ev_ns, ev_robot, ev_ts.isna()):
+        if missing:
+            continue
+        for name, ts, vals in by_robot.get(robot_id, []):
+            lo = np.searchsorted(ts, t - half, side="left")
+            hi = np.searchsorted(ts, t + half, side="right")
+            if hi <= lo:
+                continue
+            keep = minmax_decimate(vals[lo:hi], max_points) + lo
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "event_id": event_id,
+                        "series": name,
+                        "timestamp": pd.to_datetime(ts[keep], utc=True),
+                        "value": vals[keep],
+                    }
+                )
+            )
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CONTEXT_COLUMNS)
+    write_csv(df, EVENT_CONTEXT_FILE)
+    return df
+
+
+if __name__ == "__main__":
+    df = build_event_context()
+    print(f"Wrote {len(df)} context points for {df['event_id'].nunique()} events -> {EVENT_CONTEXT_FILE}")
@@ -1,8 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
 import json
 import os
 from typing import Union  # Added this import
 
+import numpy as np
 import pandas as pd
 
 from src.config import (
@@ -10,12 +12,30 @@ from src.config import (
     SYSTEM_ALERTS_PARSED,
     MAINT_NOTES_PARSED,
     TORQUE_CYCLES_CLEAN,
+    SENSOR_ANOMALIES_FILE,
     EVENTS_FILE,
     TORQUE_MEDIUM_THRESHOLD,
     TORQUE_CRITICAL_THRESHOLD,
     REPEAT_WINDOW_HOURS,
+    ANOMALY_LOOKBACK_MINUTES,
+    ALERT_LEVELS,
+    ALERT_MATCH_SECONDS,
+    ALERT_FEATURE_WINDOWS,
+    ALERT_FEATURE_TYPES,
+    ALERT_RECENCY_TYPES,
     VALIDATION_DIR,
+    DEFAULT_ROBOT_ID,
+    DEFAULT_CELL_ID,
+    ROBOT_CELLS,
+    BUILD_WORKERS,
+    EVENT_BACKEND,
+    INTERESTING_LABELS,
+    OVERLOAD_EVENTS,
+    ensure_dirs,
 )
+from src.data_pipeline.detect_overloads import OVERLOAD_ERROR_CODE, overload_events, overload_severity
+from src.data_pipeline.keyword_matcher import MESSAGE_MATCHER
+from src.data_pipeline.storage import write_csv, write_text
 
 # Simple mapping from torque % to Newtons for scoring (document this in your write-up)
 MAX_FORCE_N = 10_000.0  # acceptable range per spec; used as rated equivalent
@@ -43,10 +63,14 @@ def _attach_torque_cycles(events: pd.DataFrame, cycles: pd.DataFrame) -> pd.Data
         if col in cycles.columns:
             cycles[col] = pd.to_datetime(cycles[col], errors="coerce", utc=True)
 
+    if "peak_torque_pct" not in events.columns:
+        events["peak_torque_pct"] = pd.NA
+
     out_rows = []
     for _, ev in events.iterrows():
         ts = ev["timestamp"]
-        if pd.isna(ts):
+        # Overload events come with their own cycle already
+        if pd.isna(ts) or not pd.isna(ev["peak_torque_pct"]):
             out_rows.append(ev)
             continue
 
@@ -72,51 +96,113 @@ def _attach_torque_cycles(events: pd.DataFrame, cycles: pd.DataFrame) -> pd.Data
     return pd.DataFrame(out_rows)
 
 
-def _attach_nearest_alert(events: pd.DataFrame, alerts: pd.DataFrame) -> pd.DataFrame:
-    if events.empty or alerts.empty:
-        for col in ("alert_level", "alert_type", "alert_message"):
-            if col not in events.columns:
-                events[col] = pd.NA
-        return events
+def alert_feature_columns() -> list[str]:
+    """
+    Names of the per-window alert feature columns, in output order.
+    """
+    cols = []
+    for label in ALERT_FEATURE_WINDOWS:
+        cols.append(f"alerts_{label}")
+        cols += [f"alerts_{label}_{t}" for t in ALERT_FEATURE_TYPES]
+        cols += [f"alerts_{label}_{lvl.lower()}" for lvl in ALERT_LEVELS]
+        cols.append(f"alert_max_level_{label}")
+    cols += [f"secs_since_{t}_alert" for t in ALERT_RECENCY_TYPES]
+    return cols
 
-    alerts = alerts.copy()
-    alerts["timestamp"] = pd.to_datetime(alerts["timestamp"], errors="coerce", utc=True)
 
-    severity_order = {"CRITICAL": 4, "ALERT": 3, "WARN": 2, "NOTICE": 1, "INFO": 0}
+def _epoch_ns(ts: pd.Series) -> np.ndarray:
+    ts = pd.to_datetime(ts, errors="coerce", utc=True)
+    return ts.dt.tz_convert(None).to_numpy("datetime64[ns]").view("int64")
 
-    out_rows = []
-    window = timedelta(seconds=30)
 
-    for _, ev in events.iterrows():
-        ts = ev["timestamp"]
-        if pd.isna(ts):
-            out_rows.append(ev)
-            continue
+def _prefix_counts(mask: np.ndarray) -> np.ndarray:
+    # counts[hi] - counts[lo] = matches among alerts[lo:hi]
+    return np.concatenate(([0], np.cumsum(mask)))
 
-        window_mask = (alerts["timestamp"] >= ts - window) & (
-            alerts["timestamp"] <= ts + window
-        )
-        nearby = alerts[window_mask]
-        if nearby.empty:
-            out_rows.append(ev)
-            continue
 
-        nearby = nearby.assign(
-            _sev_score=nearby["alert_level"]
-            .fillna("")
-            .str.upper()
-            .map(severity_order)
-            .fillna(-1)
-        ).sort_values(["_sev_score", "timestamp"], ascending=[False, True])
+def _attach_alerts(events: pd.DataFrame, alerts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Alert context for each event from one timestamp sort of the alerts:
 
-        best = nearby.iloc[0]
-        ev = ev.copy()
-        ev["alert_level"] = best.get("alert_level")
-        ev["alert_type"] = best.get("alert_type")
-        ev["alert_message"] = best.get("alert_message")
-        out_rows.append(ev)
+    - alert_level/alert_type/alert_message: the highest-level alert within
+      ±ALERT_MATCH_SECONDS (earliest on ties);
+    - per ALERT_FEATURE_WINDOWS window before the event: alert counts in
+      total, by ALERT_FEATURE_TYPES and by level, and the max level seen;
+    - secs_since_<type>_alert for ALERT_RECENCY_TYPES.
 
-    return pd.DataFrame(out_rows)
+    Every window is a pair of searchsorted bounds and every count a
+    difference of prefix sums, so adding windows costs O(events log alerts).
+    """
+    events = events.copy()
+    feature_cols = alert_feature_columns()
+    for col in ("alert_level", "alert_type", "alert_message"):
+        if col not in events.columns:
+            events[col] = np.nan
+    for col in feature_cols:
+        if col not in events.columns:
+            events[col] = pd.NA
+    if events.empty or alerts.empty:
+        return events
+
+    alerts = alerts.assign(timestamp=pd.to_datetime(alerts["timestamp"], errors="coerce", utc=True))
+    alerts = alerts.dropna(subset=["timestamp"]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+    if alerts.empty:
+        return events
+
+    a_ns = _epoch_ns(alerts["timestamp"])
+    ev_ns = _epoch_ns(events["timestamp"])
+    valid = events["timestamp"].notna().to_numpy()
+    levels = alerts["alert_level"].astype(object).fillna("").str.upper().to_numpy()
+    score = np.array([ALERT_LEVELS.index(lvl) if lvl in ALERT_LEVELS else -1 for lvl in levels])
+    types = alerts["alert_type"].astype(object).fillna("").to_numpy()
+
+    def bounds(before_s: int, after_s: int) -> tuple[np.ndarray, np.ndarray]:
+        lo = np.searchsorted(a_ns, ev_ns - before_s * 1_000_000_000, "left")
+        hi = np.searchsorted(a_ns, ev_ns + after_s * 1_000_000_000, "right")
+        return lo, hi
+
+    # Best nearby alert: for each level from the top, the first alert of that
+    # level at or after lo is the earliest one, if it is still before hi
+    lo, hi = bounds(ALERT_MATCH_SECONDS, ALERT_MATCH_SECONDS)
+    best = np.full(len(events), -1)
+    for s in sorted(set(score), reverse=True):
+        pos = np.flatnonzero(score == s)
+        k = np.searchsorted(pos, lo)
+        cand = pos[np.minimum(k, len(pos) - 1)]
+        hit = (best < 0) & valid & (k < len(pos)) & (cand < hi)
+        best[hit] = cand[hit]
+    found = best >= 0
+    for col in ("alert_level", "alert_type", "alert_message"):
+        values = alerts[col].astype(object).to_numpy()[np.maximum(best, 0)]
+        events[col] = np.where(found, values, np.nan)
+
+    type_counts = {t: _prefix_counts(types == t) for t in ALERT_FEATURE_TYPES}
+    level_counts = {lvl: _prefix_counts(levels == lvl) for lvl in ALERT_LEVELS}
+    features = {}
+    for label, seconds in ALERT_FEATURE_WINDOWS.items():
+        lo, hi = bounds(seconds, 0)
+        features[f"alerts_{label}"] = hi - lo
+        for t, counts in type_counts.items():
+            features[f"alerts_{label}_{t}"] = counts[hi] - counts[lo]
+        max_level = np.full(len(events), None, dtype=object)
+        for lvl in ALERT_LEVELS:  # lowest first, so higher levels overwrite
+            n = level_counts[lvl][hi] - level_counts[lvl][lo]
+            features[f"alerts_{label}_{lvl.lower()}"] = n
+            max_level[n > 0] = lvl
+        features[f"alert_max_level_{label}"] = max_level
+
+    for t in ALERT_RECENCY_TYPES:
+        t_ns = a_ns[types == t]
+        idx = np.searchsorted(t_ns, ev_ns, "right") - 1
+        since = (ev_ns - t_ns[np.maximum(idx, 0)]) / 1e9 if len(t_ns) else np.zeros(len(events))
+        features[f"secs_since_{t}_alert"] = np.where(idx >= 0, since, np.nan)
+
+    for col, values in features.items():
+        series = pd.Series(values, index=events.index)
+        if series.dtype.kind == "i":
+            series = series.astype("Int64")
+        events[col] = series.where(valid, pd.NA)
+    return events
 
 
 def _attach_last_maintenance(events: pd.DataFrame, maint: pd.DataFrame) -> pd.DataFrame:
@@ -145,7 +231,8 @@ def _attach_last_maintenance(events: pd.DataFrame, maint: pd.DataFrame) -> pd.Da
             out_rows.append(ev)
             continue
 
-        last = subset.sort_values("date").iloc[-1]
+        # Same-day notes: the last one in file order wins
+        last = subset.sort_values("date", kind="stable").iloc[-1]
         ev = ev.copy()
         ev["last_maintenance_date"] = last["date"]
         ev["last_maintenance_task"] = last["task_type"]
@@ -155,13 +242,69 @@ def _attach_last_maintenance(events: pd.DataFrame, maint: pd.DataFrame) -> pd.Da
     return pd.DataFrame(out_rows)
 
 
+def _attach_recent_anomaly(events: pd.DataFrame, anomalies: pd.DataFrame) -> pd.DataFrame:
+    """
+    Strongest sensor anomaly interval that was active within
+    ANOMALY_LOOKBACK_MINUTES before the event (e.g. a vibration build-up
+    ahead of a collision).
+    """
+    cols = ("anomaly_channel", "anomaly_direction", "anomaly_peak_z", "anomaly_start")
+    for col in cols:
+        if col not in events.columns:
+            events[col] = pd.NA
+    if events.empty or anomalies.empty:
+        return events
+
+    anomalies = anomalies.copy()
+    for col in ("timestamp", "end_timestamp"):
+        anomalies[col] = pd.to_datetime(anomalies[col], errors="coerce", utc=True)
+
+    out_rows = []
+    lookback = timedelta(minutes=ANOMALY_LOOKBACK_MINUTES)
+
+    for _, ev in events.iterrows():
+        ts = ev["timestamp"]
+        if pd.isna(ts):
+            out_rows.append(ev)
+            continue
+
+        recent = anomalies[
+            (anomalies["timestamp"] <= ts) & (anomalies["end_timestamp"] >= ts - lookback)
+        ]
+        if recent.empty:
+            out_rows.append(ev)
+            continue
+
+        best = recent.loc[recent["peak_z"].abs().idxmax()]
+        ev = ev.copy()
+        ev["anomaly_channel"] = best["channel"]
+        ev["anomaly_direction"] = best["direction"]
+        ev["anomaly_peak_z"] = best["peak_z"]
+        ev["anomaly_start"] = best["timestamp"]
+        out_rows.append(ev)
+
+    return pd.DataFrame(out_rows)
+
+
+# Keyword labels (see MESSAGE_KEYWORDS) -> collision_type, in priority order
+_COLLISION_TYPES = [
+    (("collision",), "hard_impact"),
+    (("torque_limit",), "torque_limit"),
+    (("overtravel",), "overtravel"),
+    (("singularity",), "path_singularity"),
+    (("fence_open",), "safety_fence"),
+    (("e_stop", "estop"), "emergency_stop"),
+]
+_STOP_LABELS = frozenset(("collision", "e_stop", "estop"))
+
+
 def _compute_severity(row: pd.Series) -> str:
     msg = str(row.get("message_raw", "") or "").lower()
     p = row.get("peak_torque_pct", None)
     alert_level = str(row.get("alert_level", "") or "").upper()
 
     # Direct collision / e-stop take priority
-    if "collision" in msg or "e-stop" in msg or "estop" in msg:
+    if not MESSAGE_MATCHER.match(msg).isdisjoint(_STOP_LABELS):
         if p is not None and not pd.isna(p) and p >= TORQUE_CRITICAL_THRESHOLD:
             return "critical"
         return "high"
@@ -188,18 +331,9 @@ def _classify_collision_type(row: pd.Series) -> str:
     msg = str(row.get("message_raw", "") or "").lower()
     code = str(row.get("error_code", "") or "")
 
-    if "collision" in msg:
-        return "hard_impact"
-    if "torque limit" in msg:
-        return "torque_limit"
-    if "overtravel" in msg:
-        return "overtravel"
-    if "singularity" in msg:
-        return "path_singularity"
-    if "fence open" in msg:
-        return "safety_fence"
-    if "e-stop" in msg or "estop" in msg:
-        return "emergency_stop"
+    collision_type = MESSAGE_MATCHER.first(msg, _COLLISION_TYPES)
+    if collision_type:
+        return collision_type
     if code.startswith("SRVO"):
         return "servo_fault"
     if code.startswith("MOTN"):
@@ -230,6 +364,9 @@ def _compute_confidence_and_notes(row: pd.Series) -> tuple[str, str]:
     if ts_source == "time_only_default_date":
         reasons.append("Timestamp date inferred from DEFAULT_LOG_DATE")
         flag = "medium"
+    elif ts_source == "time_only_partition_date":
+        reasons.append("Timestamp date inferred from partition path")
+        flag = "medium"
     elif ts_source == "missing":
         reasons.append("Timestamp missing in source logs")
         flag = "low"
@@ -254,70 +391,24 @@ def _compute_confidence_and_notes(row: pd.Series) -> tuple[str, str]:
     return flag, "; ".join(reasons)
 
 
-def build_events() -> pd.DataFrame:
-    # 1) Load all inputs
-    errors = pd.read_csv(ERROR_LOGS_PARSED, parse_dates=["timestamp"])
-    alerts = pd.read_csv(SYSTEM_ALERTS_PARSED, parse_dates=["timestamp"])
-    maint = pd.read_csv(MAINT_NOTES_PARSED)
-    cycles = pd.read_csv(TORQUE_CYCLES_CLEAN)
-
-    # Ensure timestamp column exists in errors (for older parsed files)
-    if "timestamp" not in errors.columns:
-        raise SystemExit("ERROR_LOGS_PARSED must contain a 'timestamp' column.")
-
-    # 2) Filter "interesting" error events
-    interesting_mask = errors["message_raw"].str.contains(
-        "collision|torque limit|overtravel|singularity|e-stop|fence open",
-        case=False,
-        na=False,
-    )
-    events = errors[interesting_mask].copy()
-
-    total_interesting = len(events)
-    missing_ts_mask = events["timestamp"].isna()
-    dropped_missing_ts = int(missing_ts_mask.sum())
-
-    # Track discard stats for documentation
-    stats = {
-        "total_error_rows": int(len(errors)),
-        "interesting_error_rows": int(total_interesting),
-        "dropped_missing_timestamp": dropped_missing_ts,
-    }
-    
-    # Ensure directory exists before writing stats
-    if not VALIDATION_DIR.exists():
-        VALIDATION_DIR.mkdir(parents=True, exist_ok=True)
-        
-    (VALIDATION_DIR / "event_build_stats.json").write_text(
-        json.dumps(stats, indent=2), encoding="utf-8"
-    )
-
-    # 3) Drop rows without timestamps (but we just logged how many)
-    events = events[~missing_ts_mask].reset_index(drop=True)
-
-    # 4) Axis handling – always have an axis column, default 0 for unknown
-    if "axis" not in events.columns:
-        events["axis"] = 0
-
-    events["axis"] = pd.to_numeric(events["axis"], errors="coerce").fillna(0).astype(int)
-    events["axis_source"] = "log"
-    events.loc[events["axis"] <= 0, "axis_source"] = "unknown"
-
-    # 5) Attach torque cycle context (cycle_id, peak_torque_pct, axis inference)
-    events = _attach_torque_cycles(events, cycles)
-
-    # 6) Attach nearest system alert within 30 seconds
-    events = _attach_nearest_alert(events, alerts)
-
-    # 7) Attach last maintenance for that axis
-    events = _attach_last_maintenance(events, maint)
-
-    # 8) Compute severity
-    events["severity"] = events.apply(_compute_severity, axis=1)
+def _ensure_robot_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Staged files written before robot_id existed belong to the default robot.
+    """
+    if "robot_id" in df.columns:
+        df["robot_id"] = df["robot_id"].astype(object).fillna(DEFAULT_ROBOT_ID).astype(str)
+    else:
+        df["robot_id"] = DEFAULT_ROBOT_ID
+    cells = df["robot_id"].map(ROBOT_CELLS).fillna(DEFAULT_CELL_ID)
+    df["cell_id"] = df["cell_id"].fillna(cells) if "cell_id" in df.columns else cells
+    return df
 
-    # 9) Compute repeats within REPEAT_WINDOW_HOURS
-    events = events.sort_values("timestamp").reset_index(drop=True)
 
+def _count_repeats(events: pd.DataFrame) -> list[int]:
+    """
+    Per event (sorted by timestamp): earlier events with the same axis and
+    error code within REPEAT_WINDOW_HOURS.
+    """
     repeats: list[int] = []
     window = timedelta(hours=REPEAT_WINDOW_HOURS)
     for i, ev in events.iterrows():
@@ -338,11 +429,92 @@ def build_events() -> pd.DataFrame:
             & (prior["error_code"] == code)
         )
         repeats.append(int(mask.sum()))
+    return repeats
+
+
+class PandasEventBackend:
+    """
+    Reference implementation of the event joins and classification: plain
+    pandas, one event at a time. Other backends (see event_backend) must
+    produce the same events.csv.
+    """
+
+    name = "pandas"
+    attach_torque_cycles = staticmethod(_attach_torque_cycles)
+    attach_last_maintenance = staticmethod(_attach_last_maintenance)
+    repeats = staticmethod(_count_repeats)
+
+    @staticmethod
+    def severity(events: pd.DataFrame) -> pd.Series:
+        return events.apply(_compute_severity, axis=1)
+
+    @staticmethod
+    def collision_types(events: pd.DataFrame) -> pd.Series:
+        return events.apply(_classify_collision_type, axis=1)
+
+
+def event_backend(name: str = EVENT_BACKEND):
+    """
+    The configured backend: "pandas" (reference) or "arrow" (vectorized
+    pyarrow.compute, src/data_pipeline/arrow_backend.py).
+    """
+    if name == "pandas":
+        return PandasEventBackend()
+    if name == "arrow":
+        try:
+            from src.data_pipeline.arrow_backend import ArrowEventBackend
+        except ImportError:
+            raise RuntimeError("EVENT_BACKEND = 'arrow' needs the pyarrow package (pip install pyarrow)")
+        return ArrowEventBackend()
+    raise ValueError(f"Unknown EVENT_BACKEND {name!r} (expected 'pandas' or 'arrow')")
+
+
+def _build_robot_events(
+    events: pd.DataFrame,
+    alerts: pd.DataFrame,
+    maint: pd.DataFrame,
+    cycles: pd.DataFrame,
+    anomalies: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Enrich the interesting error events of a single robot. All inputs are
+    already restricted to that robot, so axis is the only entity key needed.
+    Runs in a worker process when build_events shards across robots.
+    """
+    # 4) Axis handling – always have an axis column, default 0 for unknown
+    if "axis" not in events.columns:
+        events["axis"] = 0
+
+    events["axis"] = pd.to_numeric(events["axis"], errors="coerce").fillna(0).astype(int)
+    events["axis_source"] = "log"
+    events.loc[events["axis"] <= 0, "axis_source"] = "unknown"
+
+    backend = event_backend()
+
+    # 5) Attach torque cycle context (cycle_id, peak_torque_pct, axis inference)
+    events = backend.attach_torque_cycles(events, cycles)
 
-    events["repeats_24h"] = repeats
+    # 6) Attach nearest system alert and multi-window alert features
+    events = _attach_alerts(events, alerts)
+
+    # 6b) Attach the strongest recent sensor anomaly
+    events = _attach_recent_anomaly(events, anomalies)
+
+    # 7) Attach last maintenance for that axis
+    events = backend.attach_last_maintenance(events, maint)
+
+    # 8) Compute severity; synthetic overloads by the torque threshold they crossed
+    events["severity"] = backend.severity(events)
+    synthetic = events["error_code"] == OVERLOAD_ERROR_CODE
+    if synthetic.any():
+        events.loc[synthetic, "severity"] = overload_severity(events.loc[synthetic, "peak_torque_pct"])
+
+    # 9) Compute repeats within REPEAT_WINDOW_HOURS
+    events = events.sort_values("timestamp").reset_index(drop=True)
+    events["repeats_24h"] = backend.repeats(events)
 
     # 10) Collision type classification
-    events["collision_type"] = events.apply(_classify_collision_type, axis=1)
+    events["collision_type"] = backend.collision_types(events)
 
     # 11) Location from axis
     events["location"] = events["axis"].apply(_compute_location)
@@ -369,14 +541,80 @@ def build_events() -> pd.DataFrame:
     events["confidence_flag"] = conf_flags
     events["notes"] = notes
 
-    # 15) Add event_id as simple index
-    events = events.reset_index(drop=True)
-    events["event_id"] = events.index + 1
+    return events
+
+
+def _robot_shards(events: pd.DataFrame, *context: pd.DataFrame) -> list[tuple[pd.DataFrame, ...]]:
+    """
+    (events, *context) per robot, context frames being alerts, maintenance,
+    cycles and anomalies restricted to the same robot. The joins match on
+    axis only, so this holds for a single robot too (follow mode passes
+    every robot's context with one robot's events).
+    """
+    if events.empty:
+        return [(events, *(df.iloc[0:0].copy() for df in context))]
+
+    by_robot = [{rid: g for rid, g in df.groupby("robot_id", sort=False)} for df in context]
+    shards = []
+    for rid, ev in events.groupby("robot_id", sort=False):
+        others = [groups.get(rid, src.iloc[0:0]) for groups, src in zip(by_robot, context)]
+        shards.append((ev.reset_index(drop=True), *(o.copy() for o in others)))
+    return shards
+
+
+def _run_shards(shards: list[tuple[pd.DataFrame, ...]], workers: int | None) -> list[pd.DataFrame]:
+    if len(shards) <= 1 or workers == 1:
+        return [_build_robot_events(*shard) for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_build_robot_events, *shard) for shard in shards]
+        return [f.result() for f in futures]
+
+
+def interesting_mask(errors: pd.DataFrame) -> pd.Series:
+    """
+    Error log rows worth turning into events (collisions, stops, limits).
+    """
+    return MESSAGE_MATCHER.any_of(errors["message_raw"], INTERESTING_LABELS)
+
+
+def enrich_events(
+    events: pd.DataFrame,
+    alerts: pd.DataFrame,
+    maint: pd.DataFrame,
+    cycles: pd.DataFrame,
+    workers: int | None = BUILD_WORKERS,
+    anomalies: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Steps 4-14 of build_events for timestamped interesting error rows: shard
+    by robot, enrich each shard and merge back in timestamp order.
+    """
+    if anomalies is None:
+        anomalies = pd.DataFrame(columns=["timestamp", "end_timestamp", "peak_z"])
+    events = _ensure_robot_columns(events)
+    alerts = _ensure_robot_columns(alerts)
+    maint = _ensure_robot_columns(maint)
+    cycles = _ensure_robot_columns(cycles)
+    anomalies = _ensure_robot_columns(anomalies)
+
+    shards = _run_shards(_robot_shards(events, alerts, maint, cycles, anomalies), workers)
+    if len(shards) == 1:
+        return shards[0]
+    return pd.concat(shards, ignore_index=True).sort_values(
+        ["timestamp", "robot_id"], kind="stable"
+    )
 
-    # Reorder columns: event_id first and main fields up front
+
+def order_event_columns(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reorder columns: event_id first and main fields up front.
+    """
     first_cols = [
         "event_id",
         "timestamp",
+        "robot_id",
+        "cell_id",
         "location",
         "axis",
         "collision_type",
@@ -389,6 +627,8 @@ def build_events() -> pd.DataFrame:
         "peak_torque_pct",
         "alert_level",
         "alert_type",
+        "anomaly_channel",
+        "anomaly_peak_z",
         "last_maintenance_date",
         "last_maintenance_task",
         "days_since_last_maintenance",
@@ -401,7 +641,64 @@ def build_events() -> pd.DataFrame:
     cols = [c for c in first_cols if c in events.columns] + [
         c for c in events.columns if c not in first_cols
     ]
-    events = events[cols]
+    return events[cols]
+
+
+def build_events(workers: int | None = BUILD_WORKERS) -> pd.DataFrame:
+    """
+    Build the structured events table. Each robot is enriched independently
+    (optionally in a process pool of `workers`) and the shards are merged in
+    timestamp order before event ids are assigned.
+    """
+    ensure_dirs()
+    # 1) Load all inputs
+    errors = pd.read_csv(ERROR_LOGS_PARSED, parse_dates=["timestamp"])
+    alerts = pd.read_csv(SYSTEM_ALERTS_PARSED, parse_dates=["timestamp"])
+    maint = pd.read_csv(MAINT_NOTES_PARSED)
+    cycles = pd.read_csv(TORQUE_CYCLES_CLEAN)
+    anomalies = _load_csv(SENSOR_ANOMALIES_FILE)
+
+    # Ensure timestamp column exists in errors (for older parsed files)
+    if "timestamp" not in errors.columns:
+        raise SystemExit("ERROR_LOGS_PARSED must contain a 'timestamp' column.")
+
+    # 2) Filter "interesting" error events
+    events = errors[interesting_mask(errors)].copy()
+
+    total_interesting = len(events)
+    missing_ts_mask = events["timestamp"].isna()
+    dropped_missing_ts = int(missing_ts_mask.sum())
+
+    # 2b) Overloaded torque cycles that no error line reported
+    overloads = overload_events(cycles) if OVERLOAD_EVENTS else pd.DataFrame()
+
+    # Track discard stats for documentation
+    stats = {
+        "total_error_rows": int(len(errors)),
+        "interesting_error_rows": int(total_interesting),
+        "dropped_missing_timestamp": dropped_missing_ts,
+        "overload_events": int(len(overloads)),
+    }
+    
+    # Ensure directory exists before writing stats
+    if not VALIDATION_DIR.exists():
+        VALIDATION_DIR.mkdir(parents=True, exist_ok=True)
+        
+    write_text(VALIDATION_DIR / "event_build_stats.json", json.dumps(stats, indent=2))
+
+    # 3) Drop rows without timestamps (but we just logged how many)
+    events = events[~missing_ts_mask].reset_index(drop=True)
+    if not overloads.empty:
+        overloads["timestamp"] = overloads["timestamp"].astype(events["timestamp"].dtype)
+        events = pd.concat([events, overloads], ignore_index=True)
+
+    # 4-14) Per-robot enrichment, sharded across worker processes
+    events = enrich_events(events, alerts, maint, cycles, workers, anomalies)
+
+    # 15) Add event_id as simple index
+    events = events.reset_index(drop=True)
+    events["event_id"] = events.index + 1
+    events = order_event_columns(events)
 
     # Debug print of key fields
     debug_cols = [
@@ -420,10 +717,10 @@ def build_events() -> pd.DataFrame:
     existing_debug_cols = [c for c in debug_cols if c in events.columns]
     print(events[existing_debug_cols].head(10))
 
-    events.to_csv(EVENTS_FILE, index=False)
+    write_csv(events, EVENTS_FILE)
     return events
 
 
 if __name__ == "__main__":
     df = build_events()
-    print(f"Built {len(df)} events -> {EVENTS_FILE}")
\ No newline at end of file
+    print(f"Built {len(df)} events -> {EVENTS_FILE}")
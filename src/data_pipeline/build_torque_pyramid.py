@@ -0,0 +1,147 @@
+import pandas as pd
+
+from src.config import (
+    TORQUE_TIMESERIES_CLEAN,
+    TORQUE_PYRAMID_DIR,
+    TORQUE_PYRAMID_LEVELS,
+    DEFAULT_ROBOT_ID,
+    ensure_dirs,
+)
+from src.data_pipeline.storage import write_csv
+
+VALUE_COL = "Torque_pct_of_rated"
+PYRAMID_COLUMNS = ["robot_id", "axis", "bucket_start", "min", "max", "mean", "p99", "count"]
+
+# Loaded levels, keyed by file mtime so a pipeline rerun is picked up
+_cache: dict[str, tuple[float, dict]] = {}
+
+
+def _level_path(level: str):
+    return TORQUE_PYRAMID_DIR / f"level={level}.csv"
+
+
+def _aggregate(df: pd.DataFrame, seconds: int) -> pd.DataFrame:
+    bucket = df["timestamp"].dt.floor(f"{seconds}s")
+    g = df.groupby([df["robot_id"], df["Axis"], bucket], sort=True)[VALUE_COL]
+    out = g.agg(["min", "max", "mean", "count"])
+    out["p99"] = g.quantile(0.99)
+    out = out.reset_index()
+    out.columns = ["robot_id", "axis", "bucket_start", "min", "max", "mean", "count", "p99"]
+    return out[PYRAMID_COLUMNS]
+
+
+def build_torque_pyramid(tt: pd.DataFrame | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Per robot and axis, min/max/mean/p99 of Torque_pct_of_rated in the
+    TORQUE_PYRAMID_LEVELS bucket sizes (1s ... 10min), one CSV per level.
+    Every level is aggregated from the cleaned samples so p99 stays exact.
+    """
+    ensure_dirs()
+    TORQUE_PYRAMID_DIR.mkdir(parents=True, exist_ok=True)
+    if tt is None:
+        try:
+            tt = pd.read_csv(TORQUE_TIMESERIES_CLEAN)
+        except FileNotFoundError:
+            tt = pd.DataFrame()
+
+    if tt.empty or VALUE_COL not in tt.columns:
+        levels = {level: pd.DataFrame(columns=PYRAMID_COLUMNS) for level in TORQUE_PYRAMID_LEVELS}
+    else:
+        df = tt[["timestamp", "Axis", VALUE_COL]].copy()
+        df["timestamp"] = pd.to_datetime(tt["timestamp"], errors="coerce", utc=True)
+        df["robot_id"] = tt["robot_id"].astype(str) if "robot_id" in tt.columns else DEFAULT_ROBOT_ID
+        df = df.dropna(subset=["timestamp", "Axis", VALUE_COL])
+        levels = {
+            level: _aggregate(df, seconds) for level, seconds in TORQUE_PYRAMID_LEVELS.items()
+        }
+
+    for level, out in levels.items():
+        write_csv(out, _level_path(level))
+    return levels
+
+
+def _load_level(level: str) -> dict:
+    """
+    {(robot_id, axis): frame sorted by bucket_start} for one level, cached.
+    """
+    path = _level_path(level)
+    mtime = path.stat().st_mtime
+    cached = _cache.get(level)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    df = pd.read_csv(path, parse_dates=["bucket_start"])
+    if not df.empty:
+        df["bucket_start"] = pd.to_datetime(df["bucket_start"], utc=True)
+    series = {
+        (str(rid), int(axis)): g.reset_index(drop=True)
+        for (rid, axis), g in df.groupby(["robot_id", "axis"], sort=True)
+    }
+    _cache[level] = (mtime, series)
+    return series
+
+
+def torque_time_range() -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """
+    (first, last) bucket start over all series, from the coarsest level.
+    """
+    level = list(TORQUE_PYRAMID_LEVELS)[-1]
+    if not _level_path(level).exists():
+        return None
+    series = _load_level(level).values()
+    if not series:
+        return None
+    first = min(g["bucket_start"].iloc[0] for g in series)
+    last = max(g["bucket_start"].iloc[-1] for g in series)
+    return first, last + pd.Timedelta(seconds=TORQUE_PYRAMID_LEVELS[level])
+
+
+def pick_level(span_seconds: float, width_px: int) -> str:
+    """
+    Finest level that still yields at most ~width_px buckets over the span
+    (one bucket per pixel); the coarsest level if none does.
+    """
+    for level, seconds in TORQUE_PYRAMID_LEVELS.items():
+        if span_seconds / seconds <= width_px:
+            return level
+    return list(TORQUE_PYRAMID_LEVELS)[-1]
+
+
+def query_torque(
+    start,
+    end,
+    width_px: int = 800,
+    robot_id: str | None = None,
+    axes: list[int] | None = None,
+) -> tuple[str, pd.DataFrame]:
+    """
+    (level, buckets) for charting torque between start and end at width_px.
+    Work is proportional to the returned buckets, not the raw samples: the
+    level is picked from the span and each series is sliced by binary search.
+    """
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end)
+    start = start.tz_localize("UTC") if start.tzinfo is None else start
+    end = end.tz_localize("UTC") if end.tzinfo is None else end
+    level = pick_level((end - start).total_seconds(), width_px)
+
+    frames = []
+    for (rid, axis), g in _load_level(level).items():
+        if robot_id is not None and rid != robot_id:
+            continue
+        if axes is not None and axis not in axes:
+            continue
+        lo = g["bucket_start"].searchsorted(start, side="left")
+        hi = g["bucket_start"].searchsorted(end, side="right")
+        if hi > lo:
+            frames.append(g.iloc[lo:hi])
+
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PYRAMID_COLUMNS)
+    return level, out
+
+
+if __name__ == "__main__":
+    levels = build_torque_pyramid()
+    for level, df in levels.items():
+        print(f"{level:>6s}: {len(df)} buckets")
+    print(f"Torque pyramid -> {TORQUE_PYRAMID_DIR}")
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    ANOMALY_EWMA_ALPHA,
+    ANOMALY_Z_THRESHOLD,
+    ANOMALY_WARMUP_SAMPLES,
+    ANOMALY_MERGE_SECONDS,
+    ANOMALY_CHANNELS,
+    SENSOR_ANOMALIES_FILE,
+    ensure_dirs,
+)
+from src.data_pipeline.storage import write_csv
+
+ANOMALY_COLUMNS = [
+    "timestamp",
+    "end_timestamp",
+    "robot_id",
+    "cell_id",
+    "source",
+    "channel",
+    "direction",
+    "peak_z",
+    "peak_value",
+    "samples",
+]
+
+
+def ewma_zscores(
+    values: pd.Series,
+    alpha: float = ANOMALY_EWMA_ALPHA,
+    warmup: int = ANOMALY_WARMUP_SAMPLES,
+) -> np.ndarray:
+    """
+    z-score of each sample against the EWMA mean/std of the samples before it.
+
+    This is the usual O(1)-per-sample recursion (mean += a*(x-mean), same for
+    the variance) evaluated by pandas' ewm(adjust=False) in one vectorized
+    pass. The first `warmup` samples score NaN.
+    """
+    ew = values.ewm(alpha=alpha, adjust=False)
+    mean = ew.mean().shift(1).to_numpy()
+    std = ew.std(bias=True).shift(1).to_numpy()
+    x = values.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(std > 0, (x - mean) / std, np.nan)
+    z[:warmup] = np.nan
+    return z
+
+
+def _channel_intervals(ts: pd.Series, values: pd.Series, z: np.ndarray) -> pd.DataFrame:
+    """
+    Merge flagged samples of one channel into intervals: consecutive flags at
+    most ANOMALY_MERGE_SECONDS apart belong to the same interval.
+    """
+    flagged = np.abs(np.nan_to_num(z)) >= ANOMALY_Z_THRESHOLD
+    if not flagged.any():
+        return pd.DataFrame()
+
+    hits = pd.DataFrame(
+        {
+            "timestamp": ts.to_numpy()[flagged],
+            "z": z[flagged],
+            "value": values.to_numpy()[flagged],
+        }
+    )
+    gap = hits["timestamp"].diff() > pd.Timedelta(seconds=ANOMALY_MERGE_SECONDS)
+    hits["interval"] = gap.cumsum()
+
+    peak = hits.loc[hits.groupby("interval")["z"].apply(lambda s: s.abs().idxmax())]
+    bounds = hits.groupby("interval")["timestamp"].agg(["min", "max", "size"])
+    return pd.DataFrame(
+        {
+            "timestamp": bounds["min"].to_numpy(),
+            "end_timestamp": bounds["max"].to_numpy(),
+            "direction": np.where(peak["z"].to_numpy() > 0, "high", "low"),
+            "peak_z": peak["z"].round(2).to_numpy(),
+            "peak_value": peak["value"].to_numpy(),
+            "samples": bounds["size"].to_numpy(),
+        }
+    )
+
+
+def score_stream(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    Anomaly intervals for the ANOMALY_CHANNELS of a cleaned stream
+    (sensor_readings / performance_metrics), scored per robot.
+    """
+    if df.empty or "timestamp" not in df.columns:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    wanted = {c.lower() for c in ANOMALY_CHANNELS.get(source, ())}
+    channels = [c for c in df.columns if c.lower() in wanted and pd.api.types.is_numeric_dtype(df[c])]
+    if "robot_id" in df.columns:
+        groups = df.groupby("robot_id", sort=False)
+    else:
+        groups = [(None, df)]
+
+    out = []
+    for robot_id, g in groups:
+        g = g[g["timestamp"].notna()].sort_values("timestamp", kind="stable")
+        cell_id = g["cell_id"].iloc[0] if "cell_id" in g.columns and len(g) else None
+        for channel in channels:
+            z = ewma_zscores(g[channel])
+            intervals = _channel_intervals(g["timestamp"], g[channel], z)
+            if intervals.empty:
+                continue
+            intervals["robot_id"] = robot_id
+            intervals["cell_id"] = cell_id
+            intervals["source"] = source
+            intervals["channel"] = channel
+            out.append(intervals)
+
+    if not out:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    return pd.concat(out, ignore_index=True)[ANOMALY_COLUMNS]
+
+
+def detect_anomalies(sensor_readings: pd.DataFrame, perf_metrics: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score the already-cleaned sensor streams (no extra read of the data) and
+    write the anomaly intervals that build_events joins onto error events.
+    """
+    ensure_dirs()
+    frames = [
+        score_stream(sensor_readings, "sensor_readings"),
+        score_stream(perf_metrics, "performance_metrics"),
+    ]
+    frames = [f for f in frames if not f.empty]
+    if frames:
+        df = pd.concat(frames, ignore_index=True).sort_values("timestamp", kind="stable")
+    else:
+        df = pd.DataFrame(columns=ANOMALY_COLUMNS)
+    write_csv(df, SENSOR_ANOMALIES_FILE)
+    return df
+
+
+if __name__ == "__main__":
+    from src.config import SENSOR_READINGS_CLEAN, PERF_METRICS_CLEAN
+
+    def _read(path):
+        try:
+            return pd.read_csv(path, parse_dates=["timestamp"])
+        except FileNotFoundError:
+            return pd.DataFrame()
+
+    df = detect_anomalies(_read(SENSOR_READINGS_CLEAN), _read(PERF_METRICS_CLEAN))
+    print(f"Detected {len(df)} anomaly intervals -> {SENSOR_ANOMALIES_FILE}")
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    TORQUE_MEDIUM_THRESHOLD,
+    TORQUE_CRITICAL_THRESHOLD,
+    OVERLOAD_BASELINE_CYCLES,
+    OVERLOAD_BASELINE_QUANTILE,
+    OVERLOAD_MIN_HISTORY,
+    OVERLOAD_EPISODE_MINUTES,
+    DEFAULT_ROBOT_ID,
+    DEFAULT_CELL_ID,
+    ROBOT_CELLS,
+)
+
+# Error code/group of synthetic overload events, so they can be told apart
+# from logged errors downstream (build_chains, the dashboard filters)
+OVERLOAD_ERROR_CODE = "TORQ-OVL"
+OVERLOAD_ERROR_GROUP = "TORQ"
+
+OVERLOAD_COLUMNS = [
+    "timestamp",
+    "timestamp_source",
+    "error_code",
+    "error_group",
+    "message_raw",
+    "status",
+    "notes",
+    "robot_id",
+    "cell_id",
+    "axis",
+    "cycle_id",
+    "peak_torque_pct",
+    "torque_baseline_pct",
+]
+
+
+def axis_baselines(cycles: pd.DataFrame) -> np.ndarray:
+    """
+    Baseline peak torque per cycle: the OVERLOAD_BASELINE_QUANTILE of the
+    previous OVERLOAD_BASELINE_CYCLES cycles on the same robot/axis (the cycle
+    itself excluded), NaN until OVERLOAD_MIN_HISTORY cycles are seen.
+
+    `cycles` must be sorted by robot, axis and cycle_start. Each series is one
+    rolling-window pass (pandas keeps the window in a sorted skiplist), so the
+    cost stays O(n log window) over millions of cycles.
+    """
+    peak = cycles["peak_torque_pct"]
+    keys = [cycles["robot_id"], cycles["axis"]]
+    prev = peak.groupby(keys, sort=False).shift(1)
+    baseline = prev.groupby(keys, sort=False).transform(
+        lambda s: s.rolling(OVERLOAD_BASELINE_CYCLES, min_periods=OVERLOAD_MIN_HISTORY).quantile(
+            OVERLOAD_BASELINE_QUANTILE
+        )
+    )
+    return baseline.to_numpy(dtype=float)
+
+
+def overload_severity(peak: pd.Series) -> pd.Series:
+    """
+    Severity of synthetic overload events from the torque threshold crossed:
+    critical at TORQUE_CRITICAL_THRESHOLD, medium below it.
+    """
+    crit = pd.to_numeric(peak, errors="coerce") >= TORQUE_CRITICAL_THRESHOLD
+    return pd.Series(np.where(crit, "critical", "medium"), index=peak.index, dtype=object)
+
+
+def overload_events(cycles: pd.DataFrame) -> pd.DataFrame:
+    """
+    Synthetic error-log rows for overloaded torque cycles that have no
+    related error code, shaped like ERROR_LOGS_PARSED plus axis, cycle_id and
+    peak_torque_pct, so build_events enriches them like logged errors.
+
+    Cycles at TORQUE_CRITICAL_THRESHOLD or above always count; between
+    TORQUE_MEDIUM_THRESHOLD and it, only cycles above their axis baseline.
+    Overloads on one axis less than OVERLOAD_EPISODE_MINUTES apart are one
+    episode, reported once at its worst cycle.
+    """
+    if cycles.empty or "peak_torque_pct" not in cycles.columns:
+        return pd.DataFrame(columns=OVERLOAD_COLUMNS)
+
+    df = pd.DataFrame(
+        {
+            "robot_id": (
+                cycles["robot_id"].astype(object).fillna(DEFAULT_ROBOT_ID).astype(str)
+                if "robot_id" in cycles.columns
+                else DEFAULT_ROBOT_ID
+            ),
+            "axis": pd.to_numeric(cycles["axis"], errors="coerce"),
+            "cycle_id": cycles["cycle_id"],
+            "cycle_start": pd.to_datetime(cycles["cycle_start"], errors="coerce", utc=True),
+            "peak_torque_pct": pd.to_numeric(cycles["peak_torque_pct"], errors="coerce"),
+            "logged": cycles["related_error_code"].notna() if "related_error_code" in cycles.columns else False,
+        }
+    )
+    df = df.dropna(subset=["axis", "cycle_start", "peak_torque_pct"])
+    df = df[df["axis"] > 0].sort_values(["robot_id", "axis", "cycle_start"], kind="stable")
+    if df.empty:
+        return pd.DataFrame(columns=OVERLOAD_COLUMNS)
+
+    baseline = axis_baselines(df)
+    peak = df["peak_torque_pct"].to_numpy()
+    critical = peak >= TORQUE_CRITICAL_THRESHOLD
+    # No baseline yet (NaN) compares False: nothing below critical until there is one
+    above_baseline = (peak >= TORQUE_MEDIUM_THRESHOLD) & (peak > baseline)
+    hit = (critical | above_baseline) & ~df["logged"].to_numpy(dtype=bool)
+    if not hit.any():
+        return pd.DataFrame(columns=OVERLOAD_COLUMNS)
+
+    out = df[hit].assign(torque_baseline_pct=baseline[hit].round(2), critical=critical[hit])
+    new_axis = (out["robot_id"] != out["robot_id"].shift()) | (out["axis"] != out["axis"].shift())
+    gap = out["cycle_start"].diff() > pd.Timedelta(minutes=OVERLOAD_EPISODE_MINUTES)
+    episodes = out.groupby((new_axis | gap).cumsum(), sort=False)
+    out = out.assign(
+        episode_cycles=episodes["cycle_id"].transform("size"),
+        episode_start=episodes["cycle_start"].transform("min"),
+    )
+    out = out.loc[episodes["peak_torque_pct"].idxmax()]
+
+    out["axis"] = out["axis"].astype(int)
+    cells = cycles.loc[out.index, "cell_id"] if "cell_id" in cycles.columns else pd.Series(np.nan, index=out.index)
+    out["cell_id"] = cells.fillna(out["robot_id"].map(ROBOT_CELLS)).fillna(DEFAULT_CELL_ID)
+    base_text = np.where(
+        out["critical"],
+        f"critical threshold {TORQUE_CRITICAL_THRESHOLD}%",
+        "axis baseline " + out["torque_baseline_pct"].astype(str) + "%",
+    )
+    # "torque limit" keeps these in INTERESTING_LABELS and the torque_limit
+    # collision type; severity comes from overload_severity, not the message
+    out["message_raw"] = (
+        "Torque limit exceeded on J" + out["axis"].astype(str)
+        + ": peak " + out["peak_torque_pct"].astype(str) + "% of rated (" + base_text + ")"
+        + np.where(
+            out["episode_cycles"] > 1,
+            "; " + out["episode_cycles"].astype(str) + " overloaded cycles since "
+            + out["episode_start"].dt.strftime("%H:%M:%S"),
+            "",
+        )
+    )
+    out["timestamp"] = out["cycle_start"]
+    out["timestamp_source"] = "torque_cycle"
+    out["error_code"] = OVERLOAD_ERROR_CODE
+    out["error_group"] = OVERLOAD_ERROR_GROUP
+    out["status"] = "synthetic"
+    out["notes"] = "Detected from torque cycle peak; no error logged"
+    return out.sort_values(["timestamp", "robot_id", "axis"], kind="stable")[OVERLOAD_COLUMNS].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from src.config import TORQUE_CYCLES_CLEAN
+
+    df = overload_events(pd.read_csv(TORQUE_CYCLES_CLEAN))
+    print(f"{len(df)} overload events")
+    if not df.empty:
+        print(df[["timestamp", "robot_id", "axis", "peak_torque_pct", "torque_baseline_pct"]].head(20).to_string(index=False))
@@ -0,0 +1,254 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    EVENTS_FILE,
+    TORQUE_CYCLES_CLEAN,
+    MAINT_NOTES_PARSED,
+    FORECAST_STATE_FILE,
+    AXIS_FORECAST_FILE,
+    FORECAST_SEVERITIES,
+    FORECAST_RATE_HALF_LIFE_HOURS,
+    FORECAST_TREND_HALF_LIFE_HOURS,
+    FORECAST_HORIZON_HOURS,
+    TORQUE_CRITICAL_THRESHOLD,
+    ensure_dirs,
+)
+from src.data_pipeline.build_events import _ensure_robot_columns
+from src.data_pipeline.storage import write_csv, write_text
+
+FORECAST_COLUMNS = [
+    "rank",
+    "robot_id",
+    "axis",
+    "as_of",
+    "risk_score",
+    "p_high_severity",
+    "high_severity_per_h",
+    "torque_level_pct",
+    "torque_slope_pct_per_h",
+    "hours_to_critical",
+    "next_event_by",
+    "days_since_last_maintenance",
+]
+
+# Weighted least-squares sums of the torque trend, times relative to the
+# model clock: sum w, w*t, w*t^2, w*x, w*t*x
+_SUMS = ("sw", "swt", "swtt", "swx", "swtx")
+
+
+def _hours(ts: pd.Series) -> np.ndarray:
+    # Hours since the epoch as float, the model's time unit
+    ts = pd.to_datetime(ts, errors="coerce", utc=True)
+    return ts.dt.tz_convert(None).to_numpy("datetime64[ns]").astype("int64") / 3.6e12
+
+
+def _timestamp(hours: float) -> pd.Timestamp:
+    return pd.Timestamp(round(hours * 3.6e12), unit="ns", tz="UTC").floor("s")
+
+
+def _new_model(t: float) -> dict:
+    return {"t": t, "count": 0.0, "exposure": 0.0, **dict.fromkeys(_SUMS, 0.0),
+            "events_through": None, "cycles_through": None}
+
+
+def advance(model: dict, t: float) -> None:
+    """
+    Move the model clock forward to t: decay the event count and exposure
+    (so count / exposure is the decayed events-per-hour rate) and the trend
+    sums, re-expressing the sums' times relative to the new clock. O(1).
+    """
+    dt = t - model["t"]
+    if dt <= 0:
+        return
+    d = 0.5 ** (dt / FORECAST_RATE_HALF_LIFE_HOURS)
+    model["count"] *= d
+    model["exposure"] = model["exposure"] * d + (1 - d) * FORECAST_RATE_HALF_LIFE_HOURS / math.log(2)
+
+    sw, swt, swtt, swx, swtx = (model[k] for k in _SUMS)
+    swtt = swtt - 2 * dt * swt + dt * dt * sw
+    swt = swt - dt * sw
+    swtx = swtx - dt * swx
+    d = 0.5 ** (dt / FORECAST_TREND_HALF_LIFE_HOURS)
+    for k, v in zip(_SUMS, (sw, swt, swtt, swx, swtx)):
+        model[k] = v * d
+    model["t"] = t
+
+
+def add_events(model: dict, times: np.ndarray) -> None:
+    # Times at or before the model clock
+    age = model["t"] - times
+    model["count"] += float(np.sum(0.5 ** (age / FORECAST_RATE_HALF_LIFE_HOURS)))
+
+
+def add_cycles(model: dict, times: np.ndarray, peaks: np.ndarray) -> None:
+    rel = times - model["t"]
+    w = 0.5 ** (-rel / FORECAST_TREND_HALF_LIFE_HOURS)
+    model["sw"] += float(np.sum(w))
+    model["swt"] += float(np.sum(w * rel))
+    model["swtt"] += float(np.sum(w * rel * rel))
+    model["swx"] += float(np.sum(w * peaks))
+    model["swtx"] += float(np.sum(w * rel * peaks))
+
+
+def predict(model: dict) -> dict:
+    """
+    Forecast at the model clock: high-severity rate and probability within
+    FORECAST_HORIZON_HOURS, torque level/slope from the weighted trend and
+    the hours until it projects to TORQUE_CRITICAL_THRESHOLD.
+    """
+    rate = model["count"] / model["exposure"] if model["exposure"] > 0 else 0.0
+    p_event = 1 - math.exp(-rate * FORECAST_HORIZON_HOURS)
+
+    sw, swt, swtt, swx, swtx = (model[k] for k in _SUMS)
+    level = slope = to_critical = math.nan
+    if sw > 0:
+        den = sw * swtt - swt * swt
+        slope = (sw * swtx - swt * swx) / den if den > 1e-12 * sw * sw else math.nan
+        level = (swx - (0.0 if math.isnan(slope) else slope) * swt) / sw
+        if level >= TORQUE_CRITICAL_THRESHOLD:
+            to_critical = 0.0
+        elif slope > 0:
+            to_critical = (TORQUE_CRITICAL_THRESHOLD - level) / slope
+    p_torque = 0.0 if math.isnan(to_critical) else min(max(1 - to_critical / FORECAST_HORIZON_HOURS, 0.0), 1.0)
+
+    # Median wait for the next event at this rate, or sooner if the torque
+    # trend reaches critical first
+    waits = [w for w in (math.log(2) / rate if rate > 0 else math.nan, to_critical) if not math.isnan(w)]
+    return {
+        "risk_score": round(1 - (1 - p_event) * (1 - p_torque), 4),
+        "p_high_severity": round(p_event, 4),
+        "high_severity_per_h": round(rate, 4),
+        "torque_level_pct": round(level, 2),
+        "torque_slope_pct_per_h": round(slope, 3),
+        "hours_to_critical": round(to_critical, 2),
+        "next_event_by": _timestamp(model["t"] + min(waits)) if waits else pd.NaT,
+    }
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads(FORECAST_STATE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {"as_of": None, "axes": {}}
+
+
+def _new_rows(df: pd.DataFrame, models: dict, watermark: str) -> dict:
+    """
+    (robot_id, axis) -> rows of df newer than that axis' watermark.
+    """
+    out = {}
+    for (robot_id, axis), g in df.groupby(["robot_id", "axis"], sort=False):
+        key = f"{robot_id}|{int(axis)}"
+        seen = models.get(key, {}).get(watermark)
+        if seen is not None:
+            g = g[g["t"] > seen]
+        if not g.empty:
+            out[key] = g
+    return out
+
+
+def _prepare(df: pd.DataFrame, time_col: str) -> pd.DataFrame:
+    df = _ensure_robot_columns(df.copy())
+    df["axis"] = pd.to_numeric(df["axis"], errors="coerce").fillna(0).astype(int)
+    df["t"] = _hours(df[time_col])
+    return df[(df["axis"] > 0) & ~np.isnan(df["t"])].sort_values("t", kind="stable")
+
+
+def _maintenance_age(maint: pd.DataFrame, forecast: pd.DataFrame, as_of: pd.Timestamp) -> pd.Series:
+    if maint.empty or "date" not in maint.columns:
+        return pd.Series(pd.NA, index=forecast.index, dtype="Int64")
+    maint = _ensure_robot_columns(maint.copy())
+    maint["axis"] = pd.to_numeric(maint["axis"], errors="coerce")
+    maint["date"] = pd.to_datetime(maint["date"], errors="coerce")
+    maint = maint[maint["date"] <= as_of.tz_convert(None).normalize()]
+    last = maint.groupby(["robot_id", "axis"])["date"].max()
+    dates = pd.to_datetime(
+        [last.get((r, a), pd.NaT) for r, a in zip(forecast["robot_id"], forecast["axis"])]
+    )
+    days = (as_of.tz_convert(None).normalize() - dates).days
+    return pd.Series(days, index=forecast.index).astype("Int64")
+
+
+def update_forecast(
+    events: pd.DataFrame | None = None,
+    cycles: pd.DataFrame | None = None,
+    maint: pd.DataFrame | None = None,
+    reset: bool = False,
+) -> pd.DataFrame:
+    """
+    Fold events/cycles newer than each axis' watermarks into the saved
+    per-axis models, then write the ranked AXIS_FORECAST_FILE as of the
+    latest data seen. Inputs default to the pipeline's files; follow mode
+    passes just the events it appended. reset=True refits from scratch, as
+    run_pipeline does for every batch run.
+    """
+    ensure_dirs()
+    if events is None:
+        events = pd.read_csv(EVENTS_FILE)
+    if cycles is None:
+        cycles = pd.read_csv(TORQUE_CYCLES_CLEAN)
+    if maint is None:
+        maint = pd.read_csv(MAINT_NOTES_PARSED)
+
+    state = {"as_of": None, "axes": {}} if reset else _load_state()
+    models = state["axes"]
+
+    new_events = {}
+    if not events.empty and "severity" in events.columns:
+        severe = events[events["severity"].isin(FORECAST_SEVERITIES)]
+        new_events = _new_rows(_prepare(severe, "timestamp"), models, "events_through")
+    new_cycles = {}
+    if not cycles.empty:
+        peaks = cycles.assign(peak_torque_pct=pd.to_numeric(cycles["peak_torque_pct"], errors="coerce"))
+        new_cycles = _new_rows(_prepare(peaks.dropna(subset=["peak_torque_pct"]), "cycle_start"), models, "cycles_through")
+
+    for key in new_events.keys() | new_cycles.keys():
+        ev, cy = new_events.get(key), new_cycles.get(key)
+        times = [g["t"].to_numpy() for g in (ev, cy) if g is not None]
+        model = models.get(key) or _new_model(min(float(t[0]) for t in times))
+        advance(model, max(float(t[-1]) for t in times))
+        if ev is not None:
+            add_events(model, ev["t"].to_numpy())
+            model["events_through"] = float(ev["t"].iloc[-1])
+        if cy is not None:
+            add_cycles(model, cy["t"].to_numpy(), cy["peak_torque_pct"].to_numpy(dtype=float))
+            model["cycles_through"] = float(cy["t"].iloc[-1])
+        models[key] = model
+
+    if not models:
+        forecast = pd.DataFrame(columns=FORECAST_COLUMNS)
+    else:
+        # Every axis is aged to the latest data seen anywhere, so quiet axes decay
+        as_of = max([m["t"] for m in models.values()] + [state["as_of"] or -math.inf])
+        state["as_of"] = as_of
+        rows = []
+        for key, model in models.items():
+            advance(model, as_of)
+            robot_id, axis = key.rsplit("|", 1)
+            rows.append({"robot_id": robot_id, "axis": int(axis), **predict(model)})
+        forecast = pd.DataFrame(rows).sort_values(
+            ["risk_score", "robot_id", "axis"], ascending=[False, True, True], kind="stable"
+        ).reset_index(drop=True)
+        forecast["rank"] = forecast.index + 1
+        forecast["as_of"] = _timestamp(as_of)
+        forecast["days_since_last_maintenance"] = _maintenance_age(maint, forecast, _timestamp(as_of))
+        forecast = forecast[FORECAST_COLUMNS]
+
+    write_text(FORECAST_STATE_FILE, json.dumps(state, indent=2))
+    write_csv(forecast, AXIS_FORECAST_FILE)
+    return forecast
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Update per-axis forecasts from the pipeline outputs.")
+    ap.add_argument("--reset", action="store_true", help="refit from all history")
+    args = ap.parse_args()
+    df = update_forecast(reset=args.reset)
+    print(f"{len(df)} axes -> {AXIS_FORECAST_FILE}")
+    print(df.head(10).to_string(index=False))
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from src.config import (
+    RAW_DIR,
+    RAW_SOURCES,
+    UPLOAD_REGISTRY_FILE,
+    UPLOAD_CHUNK_BYTES,
+    UPLOAD_SNIFF_BYTES,
+    ensure_dirs,
+)
+from src.data_pipeline.raw_io import COMPRESSED_SUFFIXES, stream_decompressor
+from src.data_pipeline.storage import temp_path, write_text
+
+# CSV sources by header: the first signature whose columns are all present
+# (case-insensitive) wins. Extra columns such as robot_id are fine.
+CSV_SIGNATURES = [
+    ("torque_cycles", {"cycle_id", "peak_torque_pct_of_rated"}),
+    ("torque_timeseries", {"timestamp", "torque_pct_of_rated"}),
+    ("sensor_readings", {"temperature_c", "vibration_g"}),
+    ("performance_metrics", {"timestamp", "metric1"}),
+]
+
+# Text sources by line shape, mirroring what each parser expects
+# Error logs come in several layouts (see parse_error_logs) but every useful
+# line carries a controller code, e.g. SRVO-160
+_ERROR_CODE = re.compile(r"\b[A-Z]{3,4}-\d{3}\b")
+_ALERT_LINE = re.compile(r"^\d{2}:\d{2}:\d{2}\s+[A-Z]+:")  # 10:03:00 NOTICE: Vibration spike
+_MAINT_LINE = re.compile(r"^\d{4}[-/]\d{2}[-/]\d{2}\s+-\s+\S")  # 2025-11-19 - Replaced motor
+
+
+class IngestResult(NamedTuple):
+    name: str  # upload name
+    source: str | None  # RAW_SOURCES key, None if the format was not recognised
+    path: Path
+    sha256: str
+    size: int  # decompressed bytes
+    duplicate: bool
+
+
+def sniff_source(head: bytes) -> str | None:
+    """
+    RAW_SOURCES key for a file from its first (decompressed) bytes: header
+    columns for CSVs, line patterns for the text logs. The text formats are
+    decided by majority over the first few non-empty lines, since real logs
+    mix in the odd malformed line.
+    """
+    text = head.decode("utf-8", errors="replace").lstrip("\ufeff")
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()][:20]
+    if not lines:
+        return None
+
+    columns = {c.strip().strip('"').lower() for c in lines[0].split(",")}
+    for source, required in CSV_SIGNATURES:
+        if required <= columns:
+            return source
+
+    votes = {"error_logs": 0, "system_alerts": 0, "maintenance_notes": 0}
+    for line in lines:
+        if _ERROR_CODE.search(line):
+            votes["error_logs"] += 1
+        elif _ALERT_LINE.match(line):
+            votes["system_alerts"] += 1
+        elif _MAINT_LINE.match(line):
+            votes["maintenance_notes"] += 1
+    source, n = max(votes.items(), key=lambda kv: kv[1])
+    return source if n * 2 > len(lines) else None
+
+
+def _strip_codec(name: str) -> str:
+    for ext in COMPRESSED_SUFFIXES:
+        if name.lower().endswith(ext):
+            return name[: -len(ext)]
+    return name
+
+
+def _load_registry() -> dict:
+    try:
+        return json.loads(UPLOAD_REGISTRY_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _current_sha256(path: Path, registry: dict) -> str:
+    # Registry entry if the file is unchanged since it was ingested, else hash
+    # it (files dropped into data_raw/ by hand); only called on a size match
+    known = registry.get(path.name)
+    if known is not None and known.get("mtime_ns") == path.stat().st_mtime_ns:
+        return known["sha256"]
+    sha = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_BYTES), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def ingest_stream(fileobj, name: str, registry: dict | None = None) -> IngestResult:
+    """
+    Stream one upload into RAW_DIR in UPLOAD_CHUNK_BYTES chunks: decompress
+    gzip/bz2/zstd on the fly, detect the source from the first bytes, hash while
+    writing to a temp file, then either rename it into place or drop it if
+    the target already holds exactly these bytes.
+    """
+    ensure_dirs()
+    own_registry = registry is None
+    if own_registry:
+        registry = _load_registry()
+
+    first = fileobj.read(UPLOAD_CHUNK_BYTES)
+    codec = stream_decompressor(first)
+
+    # Buffer decompressed output until there is enough to sniff
+    head = [codec.decompress(first)]
+    buffered = len(head[0])
+    raw = first
+    while raw and buffered < UPLOAD_SNIFF_BYTES:
+        raw = fileobj.read(UPLOAD_CHUNK_BYTES)
+        head.append(codec.decompress(raw))
+        buffered += len(head[-1])
+    head = b"".join(head)
+
+    source = sniff_source(head)
+    dest = RAW_SOURCES[source] if source else RAW_DIR / Path(_strip_codec(name)).name
+
+    sha = hashlib.sha256()
+    size = 0
+    tmp = temp_path(dest)
+    try:
+        with tmp.open("wb") as f:
+            chunk = head
+            while True:
+                if chunk:
+                    sha.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+                if not raw:
+                    break
+                raw = fileobj.read(UPLOAD_CHUNK_BYTES)
+                chunk = codec.decompress(raw)
+
+        digest = sha.hexdigest()
+        duplicate = dest.exists() and dest.stat().st_size == size and _current_sha256(dest, registry) == digest
+        if not duplicate:
+            # Skipping the rename also keeps the raw mtime, so the pipeline's
+            # input fingerprint sees no change either
+            os.replace(tmp, dest)
+            registry[dest.name] = {
+                "sha256": digest,
+                "size": size,
+                "mtime_ns": dest.stat().st_mtime_ns,
+                "upload": name,
+                "ingested_at": time.time(),
+            }
+            if own_registry:
+                write_text(UPLOAD_REGISTRY_FILE, json.dumps(registry, indent=2))
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    return IngestResult(name, source, dest, digest, size, duplicate)
+
+
+def ingest_files(items) -> list[IngestResult]:
+    """
+    Ingest (fileobj, name) pairs, saving the registry once at the end.
+    """
+    registry = _load_registry()
+    results = [ingest_stream(fileobj, name, registry) for fileobj, name in items]
+    if any(not r.duplicate for r in results):
+        write_text(UPLOAD_REGISTRY_FILE, json.dumps(registry, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from contextlib import ExitStack
+
+    with ExitStack() as stack:
+        items = [(stack.enter_context(open(p, "rb")), Path(p).name) for p in sys.argv[1:]]
+        for r in ingest_files(items):
+            status = "duplicate, skipped" if r.duplicate else f"{r.size} bytes"
+            print(f"{r.name} -> {r.path.name} ({r.source or 'unrecognised'}; {status})")
@@ -0,0 +1,94 @@
+from collections import deque
+from functools import lru_cache
+
+import pandas as pd
+
+from src.config import MESSAGE_KEYWORDS
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a keyword -> label table.
+
+    match(text) walks the lower-cased text once and returns every label whose
+    keyword occurs in it as a substring, whatever the number of keywords.
+    Results are memoized per message since controller messages repeat a lot.
+    """
+
+    __slots__ = ("_goto", "_out", "match")
+
+    def __init__(self, table: dict[str, str], cache_size: int = 65_536):
+        goto: list[dict[str, int]] = [{}]
+        out: list[frozenset] = [frozenset()]
+
+        # Trie of the keywords
+        for keyword, label in table.items():
+            state = 0
+            for ch in keyword.lower():
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(frozenset())
+                state = nxt
+            out[state] = out[state] | {label}
+
+        # Failure links (BFS), folded into a complete transition table so
+        # matching never backtracks
+        fail = [0] * len(goto)
+        order: list[int] = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] | out[fail[nxt]]
+        for state in order:
+            for ch, nxt in goto[fail[state]].items():
+                goto[state].setdefault(ch, nxt)
+
+        self._goto = goto
+        self._out = out
+        self.match = lru_cache(maxsize=cache_size)(self._scan)
+
+    def _scan(self, text: str) -> frozenset:
+        goto, out = self._goto, self._out
+        state = 0
+        found = frozenset()
+        for ch in text.lower():
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found = found | out[state]
+        return found
+
+    def first(self, text: str, priority: list[tuple[tuple[str, ...], str]], default=None):
+        """
+        Result for the first (labels, result) entry that any label of `text`
+        hits, mirroring an if/elif chain of substring checks.
+        """
+        found = self.match(text)
+        if found:
+            for labels, result in priority:
+                if not found.isdisjoint(labels):
+                    return result
+        return default
+
+    def any_of(self, texts: pd.Series, labels) -> pd.Series:
+        """
+        Boolean mask: which texts contain a keyword with one of `labels`.
+        Each distinct text is scanned once; NaN is False.
+        """
+        labels = frozenset(labels)
+        codes, uniques = pd.factorize(texts)
+        hits = [not labels.isdisjoint(self.match(str(u))) for u in uniques]
+        hits.append(False)  # code -1 (NaN)
+        return pd.Series(pd.array(hits, dtype=bool)[codes], index=texts.index)
+
+
+MESSAGE_MATCHER = KeywordMatcher(MESSAGE_KEYWORDS)
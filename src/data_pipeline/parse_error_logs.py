@@ -1,14 +1,23 @@
 import re
-from datetime import datetime, date
-from dateutil import parser as dateparser
+from datetime import date
 
 import pandas as pd
 
 from src.config import (
-    ERROR_LOGS_FILE,
     ERROR_LOGS_PARSED,
     DEFAULT_LOG_DATE,
+    ensure_dirs,
 )
+from src.data_pipeline.partitions import (
+    SourceFile,
+    robot_and_cell,
+    source_files,
+    write_stage_partition,
+)
+from src.data_pipeline.records import RecordBuilder
+from src.data_pipeline.timestamps import parse_timestamp_ns, timestamp_cache_stats
+from src.data_pipeline.storage import write_csv
+from src.data_pipeline.raw_io import decompressed, open_raw
 
 TIMESTAMP_PATTERNS = [
     # [HH:MM:SS] SRVO-160: Torque limit reached
@@ -25,11 +34,37 @@ JUST_CODE_PATTERN = re.compile(
     r"^(?P<code>[A-Z]{3,4}-\d{3})[:\s-]+(?P<msg>.+)$"
 )
 
-
-def _parse_timestamp(raw: str, default_date: date) -> tuple[datetime | None, str, str]:
+# Column -> storage kind. Everything but the timestamp repeats heavily across
+# lines, so it is interned into categorical codes (see records.RecordBuilder).
+SCHEMA = {
+    "timestamp": "datetime",
+    "timestamp_source": "category",
+    "error_code": "category",
+    "error_group": "category",
+    "message_raw": "category",
+    "status": "category",
+    "notes": "category",
+    "robot_id": "category",
+    "cell_id": "category",
+}
+
+
+# timestamp_source of time-only lines, by where their date came from
+DATE_SOURCE_NOTES = {
+    "time_only_default_date": "Date inferred from DEFAULT_LOG_DATE",
+    "time_only_partition_date": "Date inferred from partition path",
+}
+
+
+def _parse_timestamp(
+    raw: str,
+    default_date: date,
+    date_source: str = "time_only_default_date",
+) -> tuple[int | None, str, str]:
     """
-    Returns (timestamp, timestamp_source, status_note)
-    timestamp_source: full_datetime | time_only_default_date | missing
+    Returns (timestamp as epoch ns, timestamp_source, status_note)
+    timestamp_source: full_datetime | time_only_default_date |
+    time_only_partition_date | missing
     """
     for pattern in TIMESTAMP_PATTERNS:
         m = re.search(pattern, raw)
@@ -44,15 +79,15 @@ def _parse_timestamp(raw: str, default_date: date) -> tuple[datetime | None, str
         if date_str:
             # Full date + time in the line
             try:
-                ts = dateparser.parse(f"{date_str} {time_str}")
+                ts = parse_timestamp_ns(f"{date_str} {time_str}")
                 return ts, "full_datetime", ""
             except Exception:
                 return None, "missing", "Failed to parse full datetime"
 
-        # time only, we will attach DEFAULT_LOG_DATE
+        # time only, we will attach the partition date or DEFAULT_LOG_DATE
         try:
-            ts = dateparser.parse(f"{default_date.isoformat()} {time_str}")
-            return ts, "time_only_default_date", "Date inferred from DEFAULT_LOG_DATE"
+            ts = parse_timestamp_ns(f"{default_date.isoformat()} {time_str}")
+            return ts, date_source, DATE_SOURCE_NOTES[date_source]
         except Exception:
             return None, "missing", "Failed to parse time-only timestamp"
 
@@ -60,87 +95,156 @@ def _parse_timestamp(raw: str, default_date: date) -> tuple[datetime | None, str
     return None, "missing", "No timestamp present in line"
 
 
-def parse_error_logs(default_date: date | None = None) -> pd.DataFrame:
+def _file_context(sf: SourceFile, default_date: date) -> tuple[date, str, str, str]:
     """
-    Parse error_logs.txt into a normalized CSV with explicit data hygiene metadata.
+    (default_date, date_source, robot_id, cell_id) for one raw file. Time-only
+    lines get their date from the partition path when there is one.
     """
-    if default_date is None:
-        default_date = DEFAULT_LOG_DATE
+    if sf.date is not None:
+        default_date = sf.date
+        date_source = "time_only_partition_date"
+    else:
+        date_source = "time_only_default_date"
+    robot_id, cell_id = robot_and_cell(sf)
+    return default_date, date_source, robot_id, cell_id
+
+
+def _parse_line(
+    raw: str,
+    default_date: date,
+    date_source: str,
+    robot_id: str,
+    cell_id: str,
+) -> dict:
+    """
+    Parse one non-empty, stripped error log line into a row dict.
+    """
+    # 1) Timestamp detection + source
+    ts, ts_source, ts_note = _parse_timestamp(raw, default_date, date_source)
 
-    rows: list[dict] = []
+    # Extract the "rest" (non-timestamp) portion if we matched
+    rest = raw
+    for pattern in TIMESTAMP_PATTERNS:
+        m = re.search(pattern, raw)
+        if m:
+            rest = m.groupdict().get("rest", "").strip()
+            break
+
+    error_code = None
+    message = None
+
+    m_err = ERROR_PATTERN.search(rest)
+    if m_err:
+        error_code = m_err.group("code").strip()
+        message = m_err.group("msg").strip()
+    else:
+        m_simple = JUST_CODE_PATTERN.search(rest)
+        if m_simple:
+            error_code = m_simple.group("code").strip()
+            message = m_simple.group("msg").strip()
+
+    # Group from prefix (SRVO, MOTN, etc.)
+    if error_code:
+        group = error_code.split("-")[0]
+    else:
+        group = None
+
+    # Data hygiene status + notes
+    status = "valid"
+    notes: list[str] = []
+
+    if ts_source in DATE_SOURCE_NOTES:
+        status = "estimated"
+        if ts_note:
+            notes.append(ts_note)
+    elif ts_source == "missing":
+        status = "missing_timestamp"
+        if ts_note:
+            notes.append(ts_note)
+
+    if error_code is None and message is None:
+        status = "parse_error"
+        notes.append("Could not extract error_code or message from line")
+
+    return {
+        "timestamp": ts,
+        "timestamp_source": ts_source,
+        "error_code": error_code,
+        "error_group": group,
+        "message_raw": message if message else rest,
+        "status": status,
+        "notes": "; ".join(notes) if notes else "",
+        "robot_id": robot_id,
+        "cell_id": cell_id,
+    }
+
+
+def _parse_file(sf: SourceFile, default_date: date, builder: RecordBuilder) -> None:
+    """
+    Parse one raw error log file.
+    """
+    ctx = _file_context(sf, default_date)
 
-    with ERROR_LOGS_FILE.open("r", encoding="utf-8") as f:
+    with open_raw(sf.path) as f:
         for line in f:
             raw = line.strip()
             if not raw:
                 continue
+            builder.append(_parse_line(raw, *ctx))
+
 
-            # 1) Timestamp detection + source
-            ts, ts_source, ts_note = _parse_timestamp(raw, default_date)
-
-            # Extract the "rest" (non-timestamp) portion if we matched
-            rest = raw
-            for pattern in TIMESTAMP_PATTERNS:
-                m = re.search(pattern, raw)
-                if m:
-                    rest = m.groupdict().get("rest", "").strip()
-                    break
-
-            error_code = None
-            message = None
-
-            m_err = ERROR_PATTERN.search(rest)
-            if m_err:
-                error_code = m_err.group("code").strip()
-                message = m_err.group("msg").strip()
-            else:
-                m_simple = JUST_CODE_PATTERN.search(rest)
-                if m_simple:
-                    error_code = m_simple.group("code").strip()
-                    message = m_simple.group("msg").strip()
-
-            # Group from prefix (SRVO, MOTN, etc.)
-            if error_code:
-                group = error_code.split("-")[0]
-            else:
-                group = None
-
-            # Data hygiene status + notes
-            status = "valid"
-            notes: list[str] = []
-
-            if ts_source == "time_only_default_date":
-                status = "estimated"
-                if ts_note:
-                    notes.append(ts_note)
-            elif ts_source == "missing":
-                status = "missing_timestamp"
-                if ts_note:
-                    notes.append(ts_note)
-
-            if error_code is None and message is None:
-                status = "parse_error"
-                notes.append("Could not extract error_code or message from line")
-
-            rows.append(
-                {
-                    "timestamp": ts,
-                    "timestamp_source": ts_source,
-                    "error_code": error_code,
-                    "error_group": group,
-                    "message_raw": message if message else rest,
-                    "status": status,
-                    "notes": "; ".join(notes) if notes else "",
-                }
-            )
-
-    df = pd.DataFrame(rows)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df.sort_values("timestamp", inplace=True, na_position="last")
-    df.to_csv(ERROR_LOGS_PARSED, index=False)
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("timestamp", na_position="last")
+
+
+def _to_frame(rows) -> pd.DataFrame:
+    """
+    Typed, sorted frame from an iterable of row dicts (used for small batches,
+    e.g. follow mode).
+    """
+    builder = RecordBuilder(SCHEMA)
+    builder.extend(rows)
+    return _sorted(builder.to_frame())
+
+
+def parse_error_logs(
+    default_date: date | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> pd.DataFrame:
+    """
+    Parse error logs into a normalized CSV with explicit data hygiene metadata.
+
+    Reads either the legacy error_logs.txt or the date=/controller= partitions
+    under RAW_DIR/error_logs/ that fall within [start_date, end_date].
+    """
+    if default_date is None:
+        default_date = DEFAULT_LOG_DATE
+    ensure_dirs()
+
+    builder = RecordBuilder(SCHEMA)
+    spans = []
+    files = source_files("error_logs", start_date, end_date)
+    with decompressed(sf.path for sf in files):
+        for sf in files:
+            start = len(builder)
+            _parse_file(sf, default_date, builder)
+            spans.append((sf, start, len(builder)))
+
+    df = builder.to_frame()
+    for sf, start, stop in spans:
+        if stop > start:
+            write_stage_partition(_sorted(df.iloc[start:stop]), "error_logs", sf)
+    df = _sorted(df)
+    write_csv(df, ERROR_LOGS_PARSED)
     return df
 
 
 if __name__ == "__main__":
     df = parse_error_logs()
-    print(f"Parsed {len(df)} error log rows -> {ERROR_LOGS_PARSED}")
\ No newline at end of file
+    print(f"Parsed {len(df)} error log rows -> {ERROR_LOGS_PARSED}")
+    stats = timestamp_cache_stats()
+    print(
+        f"Timestamp cache: {stats['cache_hit_rate']:.1%} hits of {stats['lookups']},"
+        f" {stats['dateutil_parses']} dateutil fallbacks"
+    )
@@ -1,17 +1,58 @@
 import re
-from dateutil import parser as dateparser
+from datetime import date
 
+import numpy as np
 import pandas as pd
 
-from src.config import MAINT_NOTES_FILE, MAINT_NOTES_PARSED
+from src.config import (
+    MAINT_NOTES_PARSED,
+    MAINT_TASK_RULES,
+    MAINT_NOTES_FAST_PATH,
+    ensure_dirs,
+)
+from src.data_pipeline.partitions import (
+    SourceFile,
+    robot_and_cell,
+    source_files,
+    write_stage_partition,
+)
+from src.data_pipeline.records import RecordBuilder
+from src.data_pipeline.timestamps import parse_datetime
+from src.data_pipeline.storage import write_csv
+from src.data_pipeline.raw_io import decompressed, open_raw
 
 
 AXIS_PATTERN = re.compile(r"(axis|joint)\s*(\d+)", re.IGNORECASE)
 
+SCHEMA = {
+    "date": "object",
+    "axis": "int",
+    "task_type": "category",
+    "note_raw": "category",
+    "status": "category",
+    "notes": "category",
+    "robot_id": "category",
+    "cell_id": "category",
+}
 
-def parse_maintenance_notes() -> pd.DataFrame:
-    rows: list[dict] = []
-    with MAINT_NOTES_FILE.open("r", encoding="utf-8") as f:
+
+def _task_type(text_lower: str) -> str:
+    """
+    First MAINT_TASK_RULES entry whose keyword groups all match.
+    """
+    for task_type, groups in MAINT_TASK_RULES:
+        if all(any(kw in text_lower for kw in group) for group in groups):
+            return task_type
+    return "other"
+
+
+def _parse_file(sf: SourceFile, builder: RecordBuilder) -> None:
+    """
+    Line-by-line reference parser (kept for MAINT_NOTES_FAST_PATH = False and
+    for equivalence checks against the vectorized path).
+    """
+    robot_id, cell_id = robot_and_cell(sf)
+    with open_raw(sf.path) as f:
         for line in f:
             raw = line.strip()
             if not raw:
@@ -29,7 +70,7 @@ def parse_maintenance_notes() -> pd.DataFrame:
                 notes.append("Missing ' - ' separator; note body may be incomplete")
 
             try:
-                dt = dateparser.parse(date_str).date()
+                dt = parse_datetime(date_str).date()
             except Exception:
                 dt = None
                 status = "partial_missing"
@@ -42,23 +83,9 @@ def parse_maintenance_notes() -> pd.DataFrame:
             else:
                 notes.append("Axis/joint not identified in note")
 
-            text_lower = rest.lower()
-            if "replace" in text_lower and "motor" in text_lower:
-                task_type = "replace_motor"
-            elif "lubricat" in text_lower:
-                task_type = "lubricate_axis"
-            elif "belt" in text_lower:
-                task_type = "check_belts"
-            elif "sensor" in text_lower and "clean" in text_lower:
-                task_type = "clean_sensors"
-            elif "wiring" in text_lower or "cable" in text_lower:
-                task_type = "inspect_wiring"
-            elif "calibrat" in text_lower or "zero" in text_lower:
-                task_type = "calibrate_joints"
-            else:
-                task_type = "other"
+            task_type = _task_type(rest.lower())
 
-            rows.append(
+            builder.append(
                 {
                     "date": dt,
                     "axis": axis,
@@ -66,15 +93,143 @@ def parse_maintenance_notes() -> pd.DataFrame:
                     "note_raw": rest,
                     "status": status,
                     "notes": "; ".join(notes) if notes else "",
+                    "robot_id": robot_id,
+                    "cell_id": cell_id,
                 }
             )
 
-    df = pd.DataFrame(rows)
+
+def _to_frame(builder: RecordBuilder) -> pd.DataFrame:
+    df = builder.to_frame()
     df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
-    df.to_csv(MAINT_NOTES_PARSED, index=False)
+    return df
+
+
+def _append_note(notes: np.ndarray, mask: np.ndarray, text: str) -> np.ndarray:
+    return np.where(mask, np.where(notes == "", text, notes + "; " + text), notes)
+
+
+def _parse_file_fast(sf: SourceFile) -> pd.DataFrame:
+    """
+    Vectorized parse of a whole notes file as a pandas string array:
+    split on " - ", fixed-format ISO dates (dateutil only for the rows that
+    don't match), str.extract for the axis and the MAINT_TASK_RULES table
+    for task_type, both over the distinct note bodies. Produces the same rows
+    as _parse_file.
+    """
+    with open_raw(sf.path) as f:
+        lines = pd.Series(f.read().split("\n"), dtype=object).str.strip()
+    lines = lines[lines != ""].reset_index(drop=True)
+    n = len(lines)
+    if n == 0:
+        return _to_frame(RecordBuilder(SCHEMA))
+
+    # Expect something like "2025-11-19 - Replaced motor on axis 3"
+    has_sep = lines.str.contains(" - ", regex=False).to_numpy(dtype=bool)
+    parts = lines.str.split(" - ", n=1, expand=True, regex=False)
+    if parts.shape[1] == 1:
+        parts[1] = None
+    date_str = parts[0].where(has_sep, lines)
+    rest = parts[1].where(has_sep, "")
+
+    dates = pd.to_datetime(date_str, format="%Y-%m-%d", errors="coerce")
+    odd = dates.isna().to_numpy()
+    if odd.any():
+        # Non-ISO dates: same dateutil parse as the line-by-line path, once
+        # per distinct string
+        parsed = {}
+        for text in date_str[odd].unique():
+            try:
+                parsed[text] = pd.Timestamp(parse_datetime(text).date())
+            except Exception:
+                parsed[text] = pd.NaT
+        dates = dates.astype("datetime64[ns]")
+        dates[odd] = pd.to_datetime(date_str[odd].map(parsed), errors="coerce").to_numpy()
+    bad_date = dates.isna().to_numpy()
+
+    # Note bodies repeat heavily: extract axis / task once per distinct body
+    codes, bodies = pd.factorize(rest)
+    bodies = pd.Series(bodies, dtype=object)
+    body_axis = pd.to_numeric(bodies.str.extract(AXIS_PATTERN, expand=True)[1], errors="coerce")
+    lower = bodies.str.lower()
+    conditions = []
+    for _, groups in MAINT_TASK_RULES:
+        cond = np.ones(len(bodies), dtype=bool)
+        for group in groups:
+            pattern = "|".join(re.escape(kw) for kw in group)
+            cond &= lower.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        conditions.append(cond)
+    body_task = np.select(conditions, [t for t, _ in MAINT_TASK_RULES], default="other")
+
+    axis = pd.Series(body_axis.to_numpy()[codes])
+    no_axis = axis.isna().to_numpy()
+    if not no_axis.any():
+        axis = axis.astype("int64")
+    task_type = body_task[codes]
+
+    notes = np.full(n, "", dtype=object)
+    notes = _append_note(notes, ~has_sep, "Missing ' - ' separator; note body may be incomplete")
+    notes = _append_note(notes, bad_date, "Could not parse date in maintenance note")
+    notes = _append_note(notes, no_axis, "Axis/joint not identified in note")
+
+    robot_id, cell_id = robot_and_cell(sf)
+    return pd.DataFrame(
+        {
+            "date": dates.dt.date,
+            "axis": axis,
+            "task_type": task_type,
+            "note_raw": rest,
+            "status": np.where(~has_sep | bad_date, "partial_missing", "valid"),
+            "notes": notes,
+            "robot_id": robot_id,
+            "cell_id": cell_id,
+        }
+    )
+
+
+def _parse_files_fast(files: list[SourceFile]) -> tuple[pd.DataFrame, list]:
+    frames = [_parse_file_fast(sf) for sf in files]
+    spans = []
+    start = 0
+    for sf, frame in zip(files, frames):
+        spans.append((sf, start, start + len(frame)))
+        start += len(frame)
+
+    if not frames:
+        return _to_frame(RecordBuilder(SCHEMA)), spans
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    for col, kind in SCHEMA.items():
+        if kind == "category":
+            df[col] = df[col].astype("category")
+    return df, spans
+
+
+def parse_maintenance_notes(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    fast: bool = MAINT_NOTES_FAST_PATH,
+) -> pd.DataFrame:
+    ensure_dirs()
+    files = source_files("maintenance_notes", start_date, end_date)
+    with decompressed(sf.path for sf in files):
+        if fast:
+            df, spans = _parse_files_fast(files)
+        else:
+            builder = RecordBuilder(SCHEMA)
+            spans = []
+            for sf in files:
+                start = len(builder)
+                _parse_file(sf, builder)
+                spans.append((sf, start, len(builder)))
+            df = _to_frame(builder)
+
+    for sf, start, stop in spans:
+        if stop > start:
+            write_stage_partition(df.iloc[start:stop], "maintenance_notes", sf)
+    write_csv(df, MAINT_NOTES_PARSED)
     return df
 
 
 if __name__ == "__main__":
     df = parse_maintenance_notes()
-    print(f"Parsed {len(df)} maintenance notes -> {MAINT_NOTES_PARSED}")
\ No newline at end of file
+    print(f"Parsed {len(df)} maintenance notes -> {MAINT_NOTES_PARSED}")
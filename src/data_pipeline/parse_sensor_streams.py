@@ -1,13 +1,21 @@
+from datetime import date
+
 import pandas as pd
 
 from src.config import (
-    SENSOR_READINGS_FILE,
-    TORQUE_TIMESERIES_FILE,
-    PERF_METRICS_FILE,
     SENSOR_READINGS_CLEAN,
     TORQUE_TIMESERIES_CLEAN,
     PERF_METRICS_CLEAN,
+    ensure_dirs,
+)
+from src.data_pipeline.detect_anomalies import detect_anomalies
+from src.data_pipeline.partitions import (
+    assign_robot_columns,
+    source_files,
+    write_stage_partition,
 )
+from src.data_pipeline.storage import write_csv
+from src.data_pipeline.raw_io import decompressed, open_raw
 
 
 def _normalize_timestamp(df: pd.DataFrame) -> pd.DataFrame:
@@ -58,7 +66,12 @@ def _clean_time_series(df: pd.DataFrame, name: str) -> pd.DataFrame:
     # Use timestamp as index for time-based interpolation
     df = df.set_index("timestamp")
 
-    numeric_cols = df.select_dtypes(include="number").columns.tolist()
+    # Entity ids (robot_id/cell_id) can be numeric in multi-robot exports; never interpolate them
+    numeric_cols = [
+        c
+        for c in df.select_dtypes(include="number").columns
+        if c.lower() not in ("robot_id", "cell_id")
+    ]
     if not numeric_cols:
         df = df.reset_index()
         return df
@@ -100,35 +113,56 @@ def _clean_time_series(df: pd.DataFrame, name: str) -> pd.DataFrame:
     return df
 
 
-def parse_sensor_streams():
+def _parse_source(
+    source: str,
+    out_path,
+    start_date: date | None,
+    end_date: date | None,
+) -> pd.DataFrame:
     """
-    Parse and clean sensor_readings, torque_timeseries, and performance_metrics
-    with proper data hygiene (timestamps normalized, interpolation + labeling).
+    Clean each raw file (one per controller/day when partitioned) on its own so
+    interpolation never bridges two controllers, then combine.
     """
-    # sensor_readings
-    try:
-        sr = pd.read_csv(SENSOR_READINGS_FILE)
-        sr = _clean_time_series(sr, "sensor_readings")
-        sr.to_csv(SENSOR_READINGS_CLEAN, index=False)
-    except FileNotFoundError:
-        sr = pd.DataFrame()
-
-    # torque_timeseries
-    try:
-        tt = pd.read_csv(TORQUE_TIMESERIES_FILE)
-        tt = _clean_time_series(tt, "torque_timeseries")
-        tt.to_csv(TORQUE_TIMESERIES_CLEAN, index=False)
-    except FileNotFoundError:
-        tt = pd.DataFrame()
-
-    # performance_metrics
-    try:
-        pm = pd.read_csv(PERF_METRICS_FILE)
-        pm = _clean_time_series(pm, "performance_metrics")
-        pm.to_csv(PERF_METRICS_CLEAN, index=False)
-    except FileNotFoundError:
-        pm = pd.DataFrame()
+    frames = []
+    files = source_files(source, start_date, end_date)
+    with decompressed(sf.path for sf in files):
+        for sf in files:
+            try:
+                with open_raw(sf.path) as f:
+                    df = pd.read_csv(f)
+            except FileNotFoundError:
+                continue
+            df = _clean_time_series(df, source)
+            if not df.empty:
+                df = assign_robot_columns(df, sf)
+            write_stage_partition(df, source, sf)
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if len(frames) > 1 and "timestamp" in df.columns:
+        df = df.sort_values("timestamp", kind="stable", na_position="last")
+    write_csv(df, out_path)
+    return df
+
 
+def parse_sensor_streams(
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    """
+    Parse and clean sensor_readings, torque_timeseries, and performance_metrics
+    with proper data hygiene (timestamps normalized, interpolation + labeling),
+    then write sensor anomaly intervals (see detect_anomalies).
+    """
+    ensure_dirs()
+    sr = _parse_source("sensor_readings", SENSOR_READINGS_CLEAN, start_date, end_date)
+    tt = _parse_source("torque_timeseries", TORQUE_TIMESERIES_CLEAN, start_date, end_date)
+    pm = _parse_source("performance_metrics", PERF_METRICS_CLEAN, start_date, end_date)
+    # Score the cleaned frames while they are in memory
+    detect_anomalies(sr, pm)
     return sr, tt, pm
 
 
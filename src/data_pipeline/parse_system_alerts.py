@@ -1,89 +1,156 @@
 from datetime import date
-from dateutil import parser as dateparser
 
 import pandas as pd
 
 from src.config import (
-    SYSTEM_ALERTS_FILE,
     SYSTEM_ALERTS_PARSED,
     DEFAULT_LOG_DATE,
+    ensure_dirs,
 )
+from src.data_pipeline.partitions import (
+    SourceFile,
+    robot_and_cell,
+    source_files,
+    write_stage_partition,
+)
+from src.data_pipeline.keyword_matcher import MESSAGE_MATCHER
+from src.data_pipeline.records import RecordBuilder
+from src.data_pipeline.timestamps import parse_timestamp_ns, timestamp_cache_stats
+from src.data_pipeline.storage import write_csv
+from src.data_pipeline.raw_io import decompressed, open_raw
 
+# Keyword labels (see MESSAGE_KEYWORDS) -> alert_type, in priority order
+_ALERT_TYPES = [
+    (("temperature",), "temperature"),
+    (("vibration",), "vibration"),
+    (("network",), "network"),
+    (("servo",), "servo"),
+    (("battery",), "battery"),
+]
 
-def parse_system_alerts(default_date: date | None = None) -> pd.DataFrame:
-    if default_date is None:
-        default_date = DEFAULT_LOG_DATE
+SCHEMA = {
+    "timestamp": "datetime",
+    "alert_level": "category",
+    "alert_message": "category",
+    "alert_type": "category",
+    "robot_id": "category",
+    "cell_id": "category",
+}
+
+
+def _file_context(sf: SourceFile, default_date: date) -> tuple[date, str, str]:
+    # Alert lines only carry a time; the date comes from the partition path if any
+    if sf.date is not None:
+        default_date = sf.date
+    robot_id, cell_id = robot_and_cell(sf)
+    return default_date, robot_id, cell_id
+
+
+def _parse_line(raw: str, default_date: date, robot_id: str, cell_id: str) -> dict:
+    """
+    Parse one non-empty, stripped alert line into a row dict.
+    """
+    # Expect something like: "10:03:00 NOTICE: Vibration spike"
+    try:
+        time_part, rest = raw.split(" ", 1)
+    except ValueError:
+        # fallback
+        return {
+            "timestamp": None,
+            "alert_level": None,
+            "alert_message": raw,
+            "alert_type": None,
+            "robot_id": robot_id,
+            "cell_id": cell_id,
+        }
+
+    dt_str = f"{default_date.isoformat()} {time_part}"
+    timestamp = None
+    try:
+        timestamp = parse_timestamp_ns(dt_str)
+    except Exception:
+        pass
+
+    level = None
+    msg = None
+    if ":" in rest:
+        # "NOTICE: Vibration spike"
+        level_part, msg = rest.split(":", 1)
+        level = level_part.strip().upper()
+        msg = msg.strip()
+    else:
+        msg = rest.strip()
+
+    # derive alert_type (temperature, vibration, network, servo, battery)
+    alert_type = MESSAGE_MATCHER.first(msg, _ALERT_TYPES) if msg else None
+
+    return {
+        "timestamp": timestamp,
+        "alert_level": level,
+        "alert_message": msg,
+        "alert_type": alert_type,
+        "robot_id": robot_id,
+        "cell_id": cell_id,
+    }
 
-    rows = []
-    with SYSTEM_ALERTS_FILE.open("r", encoding="utf-8") as f:
+
+def _parse_file(sf: SourceFile, default_date: date, builder: RecordBuilder) -> None:
+    ctx = _file_context(sf, default_date)
+
+    with open_raw(sf.path) as f:
         for line in f:
             raw = line.strip()
             if not raw:
                 continue
+            builder.append(_parse_line(raw, *ctx))
 
-            # Expect something like: "10:03:00 NOTICE: Vibration spike"
-            try:
-                time_part, rest = raw.split(" ", 1)
-            except ValueError:
-                # fallback
-                rows.append(
-                    {
-                        "timestamp": None,
-                        "alert_level": None,
-                        "alert_message": raw,
-                        "alert_type": None,
-                    }
-                )
-                continue
 
-            dt_str = f"{default_date.isoformat()} {time_part}"
-            timestamp = None
-            try:
-                timestamp = dateparser.parse(dt_str)
-            except Exception:
-                pass
-
-            level = None
-            msg = None
-            if ":" in rest:
-                # "NOTICE: Vibration spike"
-                level_part, msg = rest.split(":", 1)
-                level = level_part.strip().upper()
-                msg = msg.strip()
-            else:
-                msg = rest.strip()
-
-            # derive alert_type (temperature, vibration, network, servo, battery)
-            alert_type = None
-            if msg:
-                m = msg.lower()
-                if "temperature" in m or "temp" in m:
-                    alert_type = "temperature"
-                elif "vibration" in m:
-                    alert_type = "vibration"
-                elif "network" in m:
-                    alert_type = "network"
-                elif "servo" in m:
-                    alert_type = "servo"
-                elif "battery" in m:
-                    alert_type = "battery"
-
-            rows.append(
-                {
-                    "timestamp": timestamp,
-                    "alert_level": level,
-                    "alert_message": msg,
-                    "alert_type": alert_type,
-                }
-            )
-
-    df = pd.DataFrame(rows)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df.sort_values("timestamp", inplace=True)
-    df.to_csv(SYSTEM_ALERTS_PARSED, index=False)
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("timestamp")
+
+
+def _to_frame(rows) -> pd.DataFrame:
+    """
+    Typed, sorted frame from an iterable of row dicts (used for small batches,
+    e.g. follow mode).
+    """
+    builder = RecordBuilder(SCHEMA)
+    builder.extend(rows)
+    return _sorted(builder.to_frame())
+
+
+def parse_system_alerts(
+    default_date: date | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> pd.DataFrame:
+    if default_date is None:
+        default_date = DEFAULT_LOG_DATE
+    ensure_dirs()
+
+    builder = RecordBuilder(SCHEMA)
+    spans = []
+    files = source_files("system_alerts", start_date, end_date)
+    with decompressed(sf.path for sf in files):
+        for sf in files:
+            start = len(builder)
+            _parse_file(sf, default_date, builder)
+            spans.append((sf, start, len(builder)))
+
+    df = builder.to_frame()
+    for sf, start, stop in spans:
+        if stop > start:
+            write_stage_partition(_sorted(df.iloc[start:stop]), "system_alerts", sf)
+    df = _sorted(df)
+    write_csv(df, SYSTEM_ALERTS_PARSED)
     return df
 
 
 if __name__ == "__main__":
     df = parse_system_alerts()
     print(f"Parsed {len(df)} system alert rows -> {SYSTEM_ALERTS_PARSED}")
+    stats = timestamp_cache_stats()
+    print(
+        f"Timestamp cache: {stats['cache_hit_rate']:.1%} hits of {stats['lookups']},"
+        f" {stats['dateutil_parses']} dateutil fallbacks"
+    )
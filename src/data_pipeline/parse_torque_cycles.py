@@ -1,17 +1,24 @@
+from datetime import date
+
 import pandas as pd
 
-from src.config import TORQUE_CYCLES_FILE, TORQUE_CYCLES_CLEAN
+from src.config import TORQUE_CYCLES_CLEAN, ensure_dirs
+from src.data_pipeline.partitions import (
+    assign_robot_columns,
+    source_files,
+    write_stage_partition,
+)
+from src.data_pipeline.storage import write_csv
+from src.data_pipeline.raw_io import decompressed, open_raw
 
 
-def parse_torque_cycles() -> pd.DataFrame:
+def _clean_cycles(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Parse raw torque cycle CSV into a clean, typed table with:
+    Clean one raw torque cycle CSV into a typed table with:
       - Normalized column names
       - Numeric peak_torque_pct (percent of rated torque)
       - Data hygiene flags (status, notes)
     """
-    df = pd.read_csv(TORQUE_CYCLES_FILE)
-
     # 1) Normalize column names to what the rest of the pipeline expects
     rename_map: dict[str, str] = {}
     for col in df.columns:
@@ -71,8 +78,33 @@ def parse_torque_cycles() -> pd.DataFrame:
     df.loc[only_torque, "status"] = "partial_missing"
     df.loc[only_torque, "notes"] = "Missing peak_torque_pct"
 
-    # 5) Save cleaned cycles
-    df.to_csv(TORQUE_CYCLES_CLEAN, index=False)
+    return df
+
+
+def parse_torque_cycles(
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> pd.DataFrame:
+    """
+    Parse the raw torque cycle CSV (or its date=/controller= partitions).
+    """
+    ensure_dirs()
+    files = source_files("torque_cycles", start_date, end_date)
+    if not files:
+        raise FileNotFoundError("No torque cycle input found in RAW_DIR")
+
+    frames = []
+    with decompressed(sf.path for sf in files):
+        for sf in files:
+            with open_raw(sf.path) as f:
+                df = assign_robot_columns(_clean_cycles(pd.read_csv(f)), sf)
+            write_stage_partition(df, "torque_cycles", sf)
+            frames.append(df)
+
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    # Save cleaned cycles
+    write_csv(df, TORQUE_CYCLES_CLEAN)
     return df
 
 
@@ -0,0 +1,215 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+from src.config import (
+    RAW_DIR,
+    STAGE_DIR,
+    RAW_SOURCES,
+    PARTITION_MANIFEST_NAME,
+    DEFAULT_ROBOT_ID,
+    DEFAULT_CELL_ID,
+    ROBOT_CELLS,
+)
+from src.data_pipeline.storage import write_csv, write_text
+from src.data_pipeline.raw_io import COMPRESSED_SUFFIXES
+
+
+class SourceFile(NamedTuple):
+    """
+    One raw input file. date/controller are None for the legacy flat layout
+    (a single file per source directly under RAW_DIR).
+    """
+
+    path: Path
+    date: date | None
+    controller: str | None
+
+
+def _parse_partition_value(dir_name: str, key: str) -> str | None:
+    prefix = f"{key}="
+    if not dir_name.startswith(prefix):
+        return None
+    return dir_name[len(prefix):]
+
+
+def _parse_partition_date(dir_name: str) -> date | None:
+    value = _parse_partition_value(dir_name, "date")
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def robot_and_cell(sf: SourceFile) -> tuple[str, str]:
+    """
+    (robot_id, cell_id) for a raw file: the controller partition identifies the
+    robot, and ROBOT_CELLS maps robots onto cells.
+    """
+    robot_id = sf.controller or DEFAULT_ROBOT_ID
+    return robot_id, ROBOT_CELLS.get(robot_id, DEFAULT_CELL_ID)
+
+
+def assign_robot_columns(df: pd.DataFrame, sf: SourceFile) -> pd.DataFrame:
+    """
+    Add robot_id/cell_id to a per-file frame. A robot_id column already present
+    in the raw CSV (multi-robot exports) wins over the partition path.
+    """
+    robot_id, cell_id = robot_and_cell(sf)
+    rename = {c: c.lower() for c in df.columns if c.lower() in ("robot_id", "cell_id")}
+    if rename:
+        df = df.rename(columns=rename)
+    if "robot_id" in df.columns:
+        df["robot_id"] = df["robot_id"].fillna(robot_id).astype(str)
+    else:
+        df["robot_id"] = robot_id
+    if "cell_id" not in df.columns:
+        df["cell_id"] = df["robot_id"].map(ROBOT_CELLS).fillna(DEFAULT_CELL_ID)
+    return df
+
+
+def partition_dir(base_dir: Path, source: str, day: date, controller: str) -> Path:
+    return base_dir / source / f"date={day.isoformat()}" / f"controller={controller}"
+
+
+def scan_partitions(source: str, base_dir: Path = RAW_DIR) -> list[dict]:
+    """
+    Walk <base_dir>/<source>/date=YYYY-MM-DD/controller=X/ and return one
+    manifest entry per partition (sorted by date, controller).
+    """
+    source_dir = base_dir / source
+    if not source_dir.is_dir():
+        return []
+
+    entries: list[dict] = []
+    for date_dir in sorted(source_dir.iterdir()):
+        day = _parse_partition_date(date_dir.name) if date_dir.is_dir() else None
+        if day is None:
+            continue
+        for ctrl_dir in sorted(date_dir.iterdir()):
+            controller = _parse_partition_value(ctrl_dir.name, "controller")
+            if not ctrl_dir.is_dir() or controller is None:
+                continue
+            files = []
+            for p in sorted(ctrl_dir.iterdir()):
+                if not p.is_file() or p.name.startswith((".", "_")):
+                    continue
+                st = p.stat()
+                files.append(
+                    {
+                        "path": str(p.relative_to(source_dir)),
+                        "size": st.st_size,
+                        "mtime": st.st_mtime,
+                    }
+                )
+            if files:
+                entries.append(
+                    {
+                        "date": day.isoformat(),
+                        "controller": controller,
+                        "files": files,
+                    }
+                )
+    return entries
+
+
+def write_manifest(source: str, base_dir: Path = RAW_DIR) -> dict:
+    manifest = {
+        "source": source,
+        "partitions": scan_partitions(source, base_dir),
+    }
+    source_dir = base_dir / source
+    if source_dir.is_dir():
+        write_text(source_dir / PARTITION_MANIFEST_NAME, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _manifest_is_stale(source_dir: Path, manifest_path: Path) -> bool:
+    """
+    New partitions show up as new date=/controller= directories, which bumps
+    the parent directory mtime, so we only need to stat two directory levels.
+    """
+    built_at = manifest_path.stat().st_mtime
+    for date_dir in source_dir.iterdir():
+        if not date_dir.is_dir():
+            continue
+        if date_dir.stat().st_mtime > built_at:
+            return True
+        for ctrl_dir in date_dir.iterdir():
+            if ctrl_dir.is_dir() and ctrl_dir.stat().st_mtime > built_at:
+                return True
+    return False
+
+
+def load_manifest(source: str, base_dir: Path = RAW_DIR) -> dict:
+    """
+    Read the partition manifest for a source, rebuilding it if it is missing
+    or older than the partition directories.
+    """
+    source_dir = base_dir / source
+    manifest_path = source_dir / PARTITION_MANIFEST_NAME
+    if manifest_path.exists() and not _manifest_is_stale(source_dir, manifest_path):
+        try:
+            return json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+    return write_manifest(source, base_dir)
+
+
+def source_files(
+    source: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[SourceFile]:
+    """
+    Resolve the raw files to process for a source.
+
+    If RAW_DIR/<source>/ holds date=/controller= partitions, only partitions
+    whose date falls in [start_date, end_date] are returned (either bound may
+    be None). Otherwise fall back to the legacy single file from RAW_SOURCES,
+    or its compressed variant (e.g. error_logs.txt.gz).
+    """
+    source_dir = RAW_DIR / source
+    if source_dir.is_dir():
+        manifest = load_manifest(source)
+        selected: list[SourceFile] = []
+        for part in manifest.get("partitions", []):
+            day = date.fromisoformat(part["date"])
+            if start_date is not None and day < start_date:
+                continue
+            if end_date is not None and day > end_date:
+                continue
+            for f in part["files"]:
+                selected.append(SourceFile(source_dir / f["path"], day, part["controller"]))
+        if manifest.get("partitions"):
+            return selected
+
+    legacy = RAW_SOURCES[source]
+    for path in (legacy, *(legacy.with_name(legacy.name + ext) for ext in COMPRESSED_SUFFIXES)):
+        if path.exists():
+            return [SourceFile(path, None, None)]
+    return []
+
+
+def write_stage_partition(df: pd.DataFrame, source: str, sf: SourceFile) -> None:
+    """
+    Mirror a partitioned raw file into STAGE_DIR/<source>/date=/controller=/.
+    Legacy (unpartitioned) inputs are only written to the combined stage file.
+    """
+    if sf.date is None or sf.controller is None:
+        return
+    out_dir = partition_dir(STAGE_DIR, source, sf.date, sf.controller)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = sf.path.name.split(".")[0]
+    write_csv(df, out_dir / f"{stem}.csv")
+
+
+if __name__ == "__main__":
+    for name in RAW_SOURCES:
+        m = write_manifest(name)
+        print(f"{name}: {len(m['partitions'])} partitions")
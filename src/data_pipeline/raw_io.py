@@ -0,0 +1,279 @@
+import bz2
+import io
+import os
+import warnings
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from src.config import RAW_DECOMPRESS_WORKERS, RAW_GZIP_SPLIT_MIN_BYTES
+
+# Codecs are recognised by magic bytes, so a rotated "error_logs.txt.1" that
+# is really gzip still reads correctly
+_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".zst")
+
+_CHUNK = 1 << 20
+
+# path -> callable returning the decompressed bytes, for files handed to the
+# worker pool by `decompressed`
+_pending: dict[Path, Callable[[], bytes]] = {}
+
+
+def codec_of(head: bytes) -> str | None:
+    for magic, codec in _MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def _file_codec(path: Path) -> str | None:
+    with open(path, "rb") as f:
+        return codec_of(f.read(4))
+
+
+def _zstd_decompressor():
+    try:
+        from compression import zstd  # Python 3.14+
+
+        return zstd.ZstdDecompressor()
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd-compressed input needs the zstandard package (pip install zstandard)")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+class _MultiMember:
+    """
+    Incremental gzip/bz2 decompressor that continues into the next member
+    when one ends (rotated logs concatenated with `cat`, pigz/pbzip2 output).
+    Bytes after a member that do not start another one (zero padding from
+    tape or block devices) are ignored with a warning, as gzip does.
+    """
+
+    def __init__(self, factory, magic: bytes):
+        self._factory = factory
+        self._magic = magic
+        self._d = None  # None between members
+        self._head = b""  # start of the next member, shorter than the magic
+        self._trailing = False
+
+    def decompress(self, chunk: bytes) -> bytes:
+        out = []
+        while chunk and not self._trailing:
+            if self._d is None:
+                chunk, self._head = self._head + chunk, b""
+                if len(chunk) < len(self._magic) and self._magic.startswith(chunk):
+                    self._head = chunk
+                    break
+                if not chunk.startswith(self._magic):
+                    warnings.warn(f"{codec_of(self._magic)}: decompression OK, trailing garbage ignored")
+                    self._trailing = True
+                    break
+                self._d = self._factory()
+            out.append(self._d.decompress(chunk))
+            if not self._d.eof:
+                break
+            chunk = self._d.unused_data
+            self._d = None
+        return b"".join(out)
+
+
+class _Passthrough:
+    def decompress(self, chunk: bytes) -> bytes:
+        return chunk
+
+
+def _gzip_stream() -> _MultiMember:
+    return _MultiMember(lambda: zlib.decompressobj(16 + zlib.MAX_WBITS), b"\x1f\x8b")
+
+
+def stream_decompressor(head: bytes):
+    """
+    Object with .decompress(chunk) -> bytes for a stream starting with `head`
+    (plain streams pass through unchanged).
+    """
+    codec = codec_of(head)
+    if codec == "gzip":
+        return _gzip_stream()
+    if codec == "bz2":
+        return _MultiMember(bz2.BZ2Decompressor, b"BZh")
+    if codec == "zstd":
+        return _zstd_decompressor()
+    return _Passthrough()
+
+
+def open_raw(path: Path):
+    """
+    Open a raw input as UTF-8 text, decompressing gzip/bz2/zstd on the fly.
+    Inside `decompressed(...)` the bytes come from the worker pool instead.
+    """
+    path = Path(path)
+    pending = _pending.get(path)
+    if pending is not None:
+        return io.TextIOWrapper(io.BytesIO(pending()), encoding="utf-8")
+
+    codec = _file_codec(path)
+    if codec is None:
+        return open(path, "r", encoding="utf-8")
+    raw = open(path, "rb")
+    d = stream_decompressor(raw.read(4))
+    raw.seek(0)
+    return io.TextIOWrapper(io.BufferedReader(_DecompressingReader(raw, d), _CHUNK), encoding="utf-8")
+
+
+class _DecompressingReader(io.RawIOBase):
+    def __init__(self, raw, decompressor):
+        self._raw = raw
+        self._d = decompressor
+        self._buf = io.BytesIO()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while True:
+            n = self._buf.readinto(b)
+            if n:
+                return n
+            chunk = self._raw.read(_CHUNK)
+            if not chunk:
+                return 0
+            self._buf = io.BytesIO(self._d.decompress(chunk))
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+# ---------------------------------------------------------------------------
+# Parallel decompression (worker processes)
+# ---------------------------------------------------------------------------
+
+
+def _decompress_file(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        first = f.read(_CHUNK)
+        d = stream_decompressor(first)
+        out = [d.decompress(first)]
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            out.append(d.decompress(chunk))
+    return b"".join(out)
+
+
+def _gunzip_member(path: Path, offset: int) -> tuple[bytes, int] | None:
+    """
+    Decompress the single gzip member starting at `offset`.
+    (data, offset just past the member), or None if no valid member starts
+    there (the header bytes also occur by chance inside compressed data).
+    """
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    out = []
+    consumed = 0
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while not d.eof:
+                chunk = f.read(_CHUNK)
+                if not chunk:
+                    return None
+                out.append(d.decompress(chunk))
+                consumed += len(chunk)
+    except zlib.error:
+        return None
+    return b"".join(out), offset + consumed - len(d.unused_data)
+
+
+def _member_candidates(path: Path) -> list[int]:
+    # Offsets of plausible gzip member headers: magic, deflate, reserved flag bits clear
+    data = path.read_bytes()
+    offsets = []
+    i = data.find(b"\x1f\x8b\x08")
+    while i != -1:
+        if i + 3 < len(data) and data[i + 3] & 0xE0 == 0:
+            offsets.append(i)
+        i = data.find(b"\x1f\x8b\x08", i + 1)
+    return offsets
+
+
+def _join_members(path: Path, members: dict[int, Future]) -> bytes:
+    """
+    Chain member results back into one stream, starting at offset 0 and
+    following each member's end offset; falls back to sequential
+    decompression if the chain breaks.
+    """
+    size = path.stat().st_size
+    out = []
+    offset = 0
+    while offset < size:
+        part = members[offset].result() if offset in members else None
+        if part is None:
+            # Unexpected layout (e.g. trailing garbage): do the rest serially
+            with open(path, "rb") as f:
+                f.seek(offset)
+                rest = f.read()
+            out.append(_gzip_stream().decompress(rest))
+            break
+        data, offset = part
+        out.append(data)
+    return b"".join(out)
+
+
+@contextmanager
+def decompressed(paths, workers: int | None = RAW_DECOMPRESS_WORKERS):
+    """
+    Decompress the compressed files among `paths` in worker processes while
+    the caller parses; open_raw() inside the block returns their text as it
+    becomes ready. Large multi-member gzip files (>= RAW_GZIP_SPLIT_MIN_BYTES)
+    are split so their members decompress in parallel too.
+
+    Decompressed data is held in memory until the block exits. With fewer
+    than two units of work or a single worker, no pool is started and
+    open_raw streams instead.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2:
+        yield
+        return
+
+    jobs = []  # (path, gzip member offsets to split at, or None)
+    for p in paths:
+        p = Path(p)
+        try:
+            codec = _file_codec(p)
+        except FileNotFoundError:
+            continue
+        if codec is None:
+            continue
+        offsets = None
+        if codec == "gzip" and p.stat().st_size >= RAW_GZIP_SPLIT_MIN_BYTES:
+            offsets = _member_candidates(p)
+        jobs.append((p, offsets))
+
+    units = sum(len(offsets) if offsets else 1 for _, offsets in jobs)
+    if units < 2:
+        yield
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for p, offsets in jobs:
+                if offsets and len(offsets) > 1:
+                    members = {o: pool.submit(_gunzip_member, p, o) for o in offsets}
+                    _pending[p] = partial(_join_members, p, members)
+                else:
+                    _pending[p] = pool.submit(_decompress_file, p).result
+            yield
+        finally:
+            for p, _ in jobs:
+                _pending.pop(p, None)
@@ -0,0 +1,150 @@
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+_EPOCH = datetime(1970, 1, 1)
+_NAT = np.iinfo(np.int64).min  # numpy/pandas NaT sentinel
+
+
+def datetime_to_ns(dt: datetime | None) -> int:
+    """
+    Epoch nanoseconds for a parsed timestamp. Naive datetimes are taken as UTC
+    (the same convention as pd.to_datetime(..., utc=True)).
+    """
+    if dt is None:
+        return _NAT
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    td = dt - _EPOCH
+    return (td.days * 86_400 + td.seconds) * 1_000_000_000 + td.microseconds * 1_000
+
+
+class _CategoryColumn:
+    """
+    Interns repeated strings: one int32 code per row plus one copy of each
+    distinct value. None is stored as code -1 (NaN in the categorical).
+    """
+
+    __slots__ = ("codes", "lookup", "categories")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.lookup: dict[str, int] = {}
+        self.categories: list[str] = []
+
+    def append(self, value) -> None:
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.lookup[value] = code
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def to_series(self) -> pd.Categorical:
+        codes = np.frombuffer(self.codes, dtype=np.int32) if len(self.codes) else np.empty(0, np.int32)
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.categories, dtype=object))
+
+
+class _DatetimeColumn:
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = array("q")
+
+    def append(self, value) -> None:
+        # Parsers may hand over epoch ns already (timestamps.parse_timestamp_ns)
+        self.values.append(value if type(value) is int else datetime_to_ns(value))
+
+    def to_series(self) -> pd.DatetimeIndex:
+        ns = np.frombuffer(self.values, dtype=np.int64) if len(self.values) else np.empty(0, np.int64)
+        return pd.DatetimeIndex(ns.view("datetime64[ns]")).tz_localize("UTC")
+
+
+class _IntColumn:
+    """
+    int64 storage with a separate missing mask. Like pandas' own inference, a
+    column with gaps comes out as float64 (NaN), otherwise as int64.
+    """
+
+    __slots__ = ("values", "missing")
+
+    def __init__(self):
+        self.values = array("q")
+        self.missing = bytearray()
+
+    def append(self, value) -> None:
+        if value is None:
+            self.values.append(0)
+            self.missing.append(1)
+        else:
+            self.values.append(value)
+            self.missing.append(0)
+
+    def to_series(self) -> np.ndarray:
+        vals = np.frombuffer(self.values, dtype=np.int64) if len(self.values) else np.empty(0, np.int64)
+        mask = np.frombuffer(bytes(self.missing), dtype=np.uint8).astype(bool)
+        if not mask.any():
+            return vals.copy()
+        out = vals.astype(np.float64)
+        out[mask] = np.nan
+        return out
+
+
+class _ObjectColumn:
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values: list = []
+
+    def append(self, value) -> None:
+        self.values.append(value)
+
+    def to_series(self) -> list:
+        return self.values
+
+
+_KINDS = {
+    "category": _CategoryColumn,
+    "datetime": _DatetimeColumn,
+    "int": _IntColumn,
+    "object": _ObjectColumn,
+}
+
+
+class RecordBuilder:
+    """
+    Column-oriented accumulator for parsed log records.
+
+    Parsers append one row dict at a time; the dict is dropped immediately and
+    only compact per-column storage is kept (interned category codes, int64
+    epoch-ns timestamps, int64 values). to_frame() builds the DataFrame with
+    category/datetime/int dtypes directly instead of going through a list of
+    dicts and object columns.
+    """
+
+    __slots__ = ("columns", "_cols")
+
+    def __init__(self, schema: dict[str, str]):
+        self.columns = list(schema)
+        self._cols = {name: _KINDS[kind]() for name, kind in schema.items()}
+
+    def __len__(self) -> int:
+        first = self.columns[0]
+        col = self._cols[first]
+        return len(col.codes) if isinstance(col, _CategoryColumn) else len(col.values)
+
+    def append(self, row: dict) -> None:
+        for name in self.columns:
+            self._cols[name].append(row.get(name))
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.append(row)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: self._cols[name].to_series() for name in self.columns})
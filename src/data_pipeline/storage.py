@@ -0,0 +1,246 @@
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.config import (
+    RUNS_DIR,
+    CURRENT_RUN_FILE,
+    PIPELINE_LOCK_FILE,
+    PIPELINE_LEASE_SECONDS,
+    PIPELINE_LOCK_WAIT_SECONDS,
+    RUNS_KEEP,
+    PUBLISHED_FILES,
+)
+
+
+def temp_path(path: Path) -> Path:
+    # Same directory so the final os.replace is a same-filesystem rename
+    return path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """
+    Yield a temp path next to `path`; on success it is renamed over `path` in
+    one step, so readers see either the old file or the new one, never a
+    partial write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def write_csv(df, path: Path) -> None:
+    with atomic_path(path) as tmp:
+        df.to_csv(tmp, index=False)
+
+
+def write_text(path: Path, text: str) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_text(text, encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Pipeline lease lock
+# ---------------------------------------------------------------------------
+
+
+def _read_lease(path: Path = PIPELINE_LOCK_FILE) -> dict | None:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lease_is_stale(lease: dict | None) -> bool:
+    if lease is None:
+        # Unreadable: a holder crashed mid-write or is writing right now; only
+        # treat it as stale once it is older than a lease
+        try:
+            age = time.time() - PIPELINE_LOCK_FILE.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return age > PIPELINE_LEASE_SECONDS
+    if lease.get("host") == socket.gethostname():
+        # Same host: the pid decides, so a long run is never taken over
+        return not _pid_alive(int(lease.get("pid", 0)))
+    # Other host: only expiry tells, and a live holder keeps renewing it
+    return time.time() > lease.get("expires_at", 0)
+
+
+def _try_acquire() -> dict | None:
+    now = time.time()
+    lease = {
+        "pid": os.getpid(),
+        "host": socket.gethostname(),
+        "token": uuid.uuid4().hex,
+        "acquired_at": now,
+        "expires_at": now + PIPELINE_LEASE_SECONDS,
+    }
+    try:
+        fd = os.open(PIPELINE_LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        stale = _read_lease()
+        if _lease_is_stale(stale):
+            _take_over(stale)
+        return None
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(lease, f)
+    return lease
+
+
+def _take_over(stale: dict | None) -> None:
+    """
+    Remove the lease judged stale. Rename first, so only one waiter wins;
+    if the renamed file is not that lease (another waiter took over in
+    between and created a fresh one), put it back instead.
+    """
+    grave = PIPELINE_LOCK_FILE.with_name(f"{PIPELINE_LOCK_FILE.name}.stale.{uuid.uuid4().hex[:8]}")
+    try:
+        os.rename(PIPELINE_LOCK_FILE, grave)
+    except FileNotFoundError:
+        return
+    moved = _read_lease(grave)
+    if (moved or {}).get("token") != (stale or {}).get("token"):
+        try:
+            # link, not rename: never overwrite a lease created meanwhile
+            os.link(grave, PIPELINE_LOCK_FILE)
+        except FileExistsError:
+            pass
+    grave.unlink()
+
+
+def _heartbeat(lease: dict, stop: threading.Event) -> None:
+    # Push expires_at forward while the lease is held, for waiters on other hosts
+    while not stop.wait(PIPELINE_LEASE_SECONDS / 3):
+        held = _read_lease()
+        if held is None or held.get("token") != lease["token"]:
+            return
+        lease["expires_at"] = time.time() + PIPELINE_LEASE_SECONDS
+        write_text(PIPELINE_LOCK_FILE, json.dumps(lease))
+
+
+@contextmanager
+def pipeline_lock(wait_seconds: float = PIPELINE_LOCK_WAIT_SECONDS, poll: float = 0.5):
+    """
+    Exclusive lease for one pipeline run (O_EXCL lock file with holder pid,
+    host and expiry). Concurrent runs wait here and so run one after another.
+    A background heartbeat renews the expiry while the lease is held; leases
+    of dead holders (same host) or unrenewed ones (other hosts) are taken over.
+    Raises TimeoutError after wait_seconds.
+    """
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    deadline = time.time() + wait_seconds
+    lease = _try_acquire()
+    while lease is None:
+        if time.time() > deadline:
+            holder = _read_lease() or {}
+            raise TimeoutError(f"Pipeline lock held by pid {holder.get('pid')} on {holder.get('host')}")
+        time.sleep(poll)
+        lease = _try_acquire()
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(lease, stop), daemon=True)
+    beat.start()
+    try:
+        yield lease
+    finally:
+        stop.set()
+        beat.join()
+        held = _read_lease()
+        if held is not None and held.get("token") == lease["token"]:
+            PIPELINE_LOCK_FILE.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Versioned runs + CURRENT pointer
+# ---------------------------------------------------------------------------
+
+
+def current_run() -> dict | None:
+    """
+    Metadata of the last published run ({"run_id", "finished_at", ...}).
+    """
+    try:
+        return json.loads(CURRENT_RUN_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def published_path(path: Path) -> Path:
+    """
+    Where readers should load `path` from: its copy in the current run
+    directory if one was published, else the working file itself.
+    """
+    run = current_run()
+    if run is not None:
+        candidate = RUNS_DIR / run["run_id"] / Path(path).name
+        if candidate.exists():
+            return candidate
+    return Path(path)
+
+
+def publish_run(meta: dict) -> str:
+    """
+    Snapshot PUBLISHED_FILES into runs/<run_id>/ and atomically point
+    CURRENT at it. Old runs beyond RUNS_KEEP are removed.
+    """
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + f"-{uuid.uuid4().hex[:6]}"
+    staging = RUNS_DIR / f".{run_id}.tmp"
+    staging.mkdir(parents=True)
+    for path in PUBLISHED_FILES:
+        if path.exists():
+            # A copy, not a hard link: the snapshot must not change with the working file
+            shutil.copy2(path, staging / path.name)
+    os.replace(staging, RUNS_DIR / run_id)
+
+    meta = {**meta, "run_id": run_id, "finished_at": time.time()}
+    write_text(CURRENT_RUN_FILE, json.dumps(meta, indent=2))
+    _prune_runs(keep={run_id})
+    return run_id
+
+
+def _prune_runs(keep: set[str]) -> None:
+    runs = sorted(p for p in RUNS_DIR.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in runs[:-RUNS_KEEP]:
+        if old.name not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def input_fingerprint(paths, extra: str = "") -> str:
+    """
+    Cheap identity of the raw inputs (names, sizes, mtimes) plus run options,
+    used to recognise duplicate pipeline requests.
+    """
+    import hashlib
+
+    h = hashlib.sha256(extra.encode())
+    for p in sorted(Path(p) for p in paths):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        h.update(f"{p}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
@@ -0,0 +1,94 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+from src.config import TIMESTAMP_CACHE_SIZE
+from src.data_pipeline.records import datetime_to_ns
+
+_dateparser = None
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NS_PER_SECOND = 1_000_000_000
+
+# Cache misses by how they were resolved (hits come from the LRU cache itself)
+_counts = {"strict": 0, "dateutil": 0, "failed": 0}
+
+
+def parse_datetime(text: str) -> datetime:
+    """
+    dateutil's free-form parser, imported on first use so modules that only
+    need the config or a single stage don't pay for it at import time.
+    Raises like dateutil.parser.parse on unparseable input.
+    """
+    global _dateparser
+    if _dateparser is None:
+        from dateutil import parser as _dateparser
+    return _dateparser.parse(text)
+
+
+def _strict_ns(text: str) -> int | None:
+    """
+    Epoch ns for exactly "YYYY-MM-DD HH:MM:SS" (taken as UTC), else None.
+    """
+    if (
+        len(text) != 19
+        or text[4] != "-"
+        or text[7] != "-"
+        or text[10] != " "
+        or text[13] != ":"
+        or text[16] != ":"
+    ):
+        return None
+    digits = text[0:4] + text[5:7] + text[8:10] + text[11:13] + text[14:16] + text[17:19]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    hour, minute, second = int(text[11:13]), int(text[14:16]), int(text[17:19])
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    try:
+        days = date(int(text[0:4]), int(text[5:7]), int(text[8:10])).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return None
+    return (days * 86_400 + hour * 3_600 + minute * 60 + second) * _NS_PER_SECOND
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_timestamp_ns(text: str) -> int:
+    """
+    Epoch nanoseconds for a log timestamp string, memoized since controller
+    logs repeat second-resolution timestamps. "YYYY-MM-DD HH:MM:SS" is parsed
+    directly; anything else goes through dateutil (naive = UTC, as in
+    records.datetime_to_ns). Raises like parse_datetime on unparseable input.
+    """
+    ns = _strict_ns(text)
+    if ns is not None:
+        _counts["strict"] += 1
+        return ns
+    try:
+        dt = parse_datetime(text)
+    except Exception:
+        _counts["failed"] += 1
+        raise
+    _counts["dateutil"] += 1
+    return datetime_to_ns(dt)
+
+
+def timestamp_cache_stats() -> dict:
+    """
+    Hit-rate counters for parse_timestamp_ns since the last reset.
+    """
+    info = parse_timestamp_ns.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "lookups": lookups,
+        "cache_hits": info.hits,
+        "cache_hit_rate": info.hits / lookups if lookups else 0.0,
+        "strict_parses": _counts["strict"],
+        "dateutil_parses": _counts["dateutil"],
+        "failed_parses": _counts["failed"],
+        "cache_size": info.currsize,
+    }
+
+
+def reset_timestamp_cache() -> None:
+    parse_timestamp_ns.cache_clear()
+    for k in _counts:
+        _counts[k] = 0
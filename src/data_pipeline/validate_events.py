@@ -1,84 +1,144 @@
+import io
 import json
+import math
+from datetime import datetime, timezone
 
 import pandas as pd
 
-from src.config import EVENTS_FILE, VALIDATION_REPORT_FILE, VALIDATION_SUMMARY_FILE
+from src.config import (
+    EVENTS_FILE,
+    VALIDATION_REPORT_FILE,
+    VALIDATION_SUMMARY_FILE,
+    VALIDATION_STATE_FILE,
+    VALIDATION_DELTA_FILE,
+    VALIDATION_HISTORY_FILE,
+    ensure_dirs,
+)
+from src.data_pipeline.storage import write_text
 
+# Plain counters that merge by addition
+_SCALARS = (
+    "total_events",
+    "missing_timestamps",
+    "missing_error_code",
+    "missing_axis",
+    "force_value_out_of_range",
+    "force_value_missing",
+    "coverage_numerator",
+    "coverage_denominator",
+)
+# Categorical distributions that merge by per-key addition
+_COUNTS = (
+    "severity_counts",
+    "collision_type_counts",
+    "confidence_flag_counts",
+)
 
-def validate_events():
-    try:
-        df = pd.read_csv(EVENTS_FILE, parse_dates=["timestamp"])
-    except FileNotFoundError:
-        raise SystemExit(f"{EVENTS_FILE} not found. Run build_events.py first.")
 
-    report: dict = {}
-    report["total_events"] = int(len(df))
+def _count_key(k) -> str:
+    # Same spelling json.dumps uses for a NaN dict key, so reports don't change
+    if isinstance(k, float) and math.isnan(k):
+        return "NaN"
+    return str(k)
+
+
+def _value_counts(df: pd.DataFrame, col: str) -> dict[str, int]:
+    if col not in df.columns:
+        return {}
+    return {_count_key(k): int(v) for k, v in df[col].value_counts(dropna=False).items()}
+
+
+def _batch_aggregates(df: pd.DataFrame) -> dict:
+    """
+    Mergeable aggregates for one batch of events: counts, missing tallies and
+    coverage numerator/denominator. Cost is proportional to the batch only.
+    """
+    agg: dict = {"total_events": int(len(df))}
 
     # Timestamp quality
-    missing_ts = int(df["timestamp"].isna().sum())
-    report["missing_timestamps"] = missing_ts
+    agg["missing_timestamps"] = int(df["timestamp"].isna().sum())
 
     # Error code completeness
-    missing_err = int(df["error_code"].isna().sum()) if "error_code" in df.columns else 0
-    report["missing_error_code"] = missing_err
+    agg["missing_error_code"] = int(df["error_code"].isna().sum()) if "error_code" in df.columns else 0
 
     # Axis completeness
     if "axis" in df.columns:
-        missing_axis = int((df["axis"].isna() | (df["axis"] <= 0)).sum())
-    else:
-        missing_axis = 0
-    report["missing_axis"] = missing_axis
-
-    # Severity distribution
-    if "severity" in df.columns:
-        sev_counts = df["severity"].value_counts(dropna=False).to_dict()
+        agg["missing_axis"] = int((df["axis"].isna() | (df["axis"] <= 0)).sum())
     else:
-        sev_counts = {}
-    report["severity_counts"] = sev_counts
+        agg["missing_axis"] = 0
 
-    # Collision type distribution
-    if "collision_type" in df.columns:
-        col_counts = df["collision_type"].value_counts(dropna=False).to_dict()
-    else:
-        col_counts = {}
-    report["collision_type_counts"] = col_counts
-
-    # Confidence flags
-    if "confidence_flag" in df.columns:
-        conf_counts = df["confidence_flag"].value_counts(dropna=False).to_dict()
-    else:
-        conf_counts = {}
-    report["confidence_flag_counts"] = conf_counts
+    # Severity / collision type / confidence distributions
+    agg["severity_counts"] = _value_counts(df, "severity")
+    agg["collision_type_counts"] = _value_counts(df, "collision_type")
+    agg["confidence_flag_counts"] = _value_counts(df, "confidence_flag")
 
     # Force value quality
     if "force_value" in df.columns:
         fv = pd.to_numeric(df["force_value"], errors="coerce")
-        out_of_range = int(((fv < 0) | (fv > 10000)).sum())
-        missing_force = int(fv.isna().sum())
+        agg["force_value_out_of_range"] = int(((fv < 0) | (fv > 10000)).sum())
+        agg["force_value_missing"] = int(fv.isna().sum())
     else:
-        out_of_range = 0
-        missing_force = 0
-    report["force_value_out_of_range"] = out_of_range
-    report["force_value_missing"] = missing_force
+        agg["force_value_out_of_range"] = 0
+        agg["force_value_missing"] = 0
 
     # Simple coverage ratio similar to docs: how many have both ts + error_code
     if "error_code" in df.columns:
         good_mask = df["timestamp"].notna() & df["error_code"].notna()
-        coverage_ratio = float(good_mask.mean()) if len(df) else 0.0
+        agg["coverage_numerator"] = int(good_mask.sum())
+        agg["coverage_denominator"] = int(len(df))
     else:
-        coverage_ratio = 0.0
-    report["coverage_ratio_timestamp_and_error"] = coverage_ratio
+        agg["coverage_numerator"] = 0
+        agg["coverage_denominator"] = 0
+
+    return agg
+
+
+def _empty_aggregates() -> dict:
+    agg: dict = {k: 0 for k in _SCALARS}
+    agg.update({k: {} for k in _COUNTS})
+    return agg
+
+
+def _merge_aggregates(a: dict, b: dict) -> dict:
+    out: dict = {k: a.get(k, 0) + b.get(k, 0) for k in _SCALARS}
+    for k in _COUNTS:
+        merged = dict(a.get(k, {}))
+        for key, n in b.get(k, {}).items():
+            merged[key] = merged.get(key, 0) + n
+        # Largest first, like value_counts(); ties keep first-seen order
+        out[k] = dict(sorted(merged.items(), key=lambda kv: -kv[1]))
+    return out
+
+
+def _report(agg: dict) -> dict:
+    """
+    The events_quality_report.json layout, derived from aggregates.
+    """
+    report: dict = {}
+    report["total_events"] = agg["total_events"]
+    report["missing_timestamps"] = agg["missing_timestamps"]
+    report["missing_error_code"] = agg["missing_error_code"]
+    report["missing_axis"] = agg["missing_axis"]
+    report["severity_counts"] = agg["severity_counts"]
+    report["collision_type_counts"] = agg["collision_type_counts"]
+    report["confidence_flag_counts"] = agg["confidence_flag_counts"]
+    report["force_value_out_of_range"] = agg["force_value_out_of_range"]
+    report["force_value_missing"] = agg["force_value_missing"]
+    den = agg["coverage_denominator"]
+    report["coverage_ratio_timestamp_and_error"] = (
+        agg["coverage_numerator"] / den if den else 0.0
+    )
+    return report
 
-    # Save JSON
-    VALIDATION_REPORT_FILE.write_text(json.dumps(report, indent=2), encoding="utf-8")
 
+def _summary_lines(report: dict) -> list[str]:
     # Human-readable summary
     lines: list[str] = []
     lines.append(f"Total events: {report['total_events']}")
     lines.append(f"Missing timestamps: {report['missing_timestamps']}")
     lines.append(f"Missing error_code: {report['missing_error_code']}")
     lines.append(f"Missing/unknown axis (<=0): {report['missing_axis']}")
-    lines.append(f"Coverage (timestamp + error_code present): {coverage_ratio:.2%}")
+    lines.append(f"Coverage (timestamp + error_code present): {report['coverage_ratio_timestamp_and_error']:.2%}")
     lines.append("")
 
     lines.append("Severity counts:")
@@ -90,6 +150,7 @@ def validate_events():
     for k, v in report["collision_type_counts"].items():
         lines.append(f"  {k}: {v}")
 
+    conf_counts = report["confidence_flag_counts"]
     if conf_counts:
         lines.append("")
         lines.append("Confidence flag counts:")
@@ -97,15 +158,121 @@ def validate_events():
             lines.append(f"  {k}: {v}")
 
     lines.append("")
-    lines.append(f"Force values missing: {missing_force}")
-    lines.append(f"Force values out of [0,10000]N: {out_of_range}")
+    lines.append(f"Force values missing: {report['force_value_missing']}")
+    lines.append(f"Force values out of [0,10000]N: {report['force_value_out_of_range']}")
+    return lines
 
-    VALIDATION_SUMMARY_FILE.write_text("\n".join(lines), encoding="utf-8")
 
+def _load_state() -> dict | None:
+    try:
+        return json.loads(VALIDATION_STATE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _publish(state: dict, batch_agg: dict, mode: str) -> dict:
+    """
+    Persist running state, full report + summary, the per-run delta report and
+    one trend-history line.
+    """
+    report = _report(state["aggregates"])
+    delta = _report(batch_agg)
+    run = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": mode,
+        "batch": delta,
+        "cumulative_total_events": report["total_events"],
+        "cumulative_coverage": report["coverage_ratio_timestamp_and_error"],
+    }
+
+    write_text(VALIDATION_STATE_FILE, json.dumps(state, indent=2))
+    write_text(VALIDATION_REPORT_FILE, json.dumps(report, indent=2))
+    write_text(VALIDATION_SUMMARY_FILE, "\n".join(_summary_lines(report)))
+    write_text(VALIDATION_DELTA_FILE, json.dumps(run, indent=2))
+    with VALIDATION_HISTORY_FILE.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
     return report
 
 
+def validate_event_batch(batch: pd.DataFrame) -> dict:
+    """
+    Fold a batch of new events into the running aggregates (e.g. the events
+    follow mode just appended) and republish the report.
+    """
+    ensure_dirs()
+    state = _load_state()
+    if state is None:
+        # No baseline yet: validate the whole store once instead
+        return validate_events()
+
+    batch_agg = _batch_aggregates(batch)
+    state["aggregates"] = _merge_aggregates(state["aggregates"], batch_agg)
+    if "event_id" in batch.columns and not batch.empty:
+        state["last_event_id"] = max(state.get("last_event_id", 0), int(batch["event_id"].max()))
+    if EVENTS_FILE.exists():
+        state["events_file_offset"] = EVENTS_FILE.stat().st_size
+    return _publish(state, batch_agg, mode="batch")
+
+
+def validate_new_events() -> dict:
+    """
+    Validate only the rows appended to EVENTS_FILE since the last run, reading
+    from the byte offset recorded in the state. Falls back to a full pass if
+    the file was rewritten (e.g. by build_events) since then.
+    """
+    ensure_dirs()
+    state = _load_state()
+    if state is None or not EVENTS_FILE.exists():
+        return validate_events()
+
+    offset = state.get("events_file_offset", 0)
+    size = EVENTS_FILE.stat().st_size
+    if size < offset or not state.get("header"):
+        return validate_events()
+
+    with EVENTS_FILE.open("r", encoding="utf-8") as f:
+        header = f.readline()
+        if header.strip() != state["header"]:
+            return validate_events()
+        f.seek(offset)
+        tail = f.read()
+
+    if not tail.strip():
+        batch = pd.DataFrame(columns=state["header"].split(","))
+    else:
+        batch = pd.read_csv(io.StringIO(header + tail), parse_dates=["timestamp"])
+    return validate_event_batch(batch)
+
+
+def validate_events():
+    """
+    Full validation of EVENTS_FILE. Also resets the running aggregates that
+    validate_event_batch / validate_new_events build on.
+    """
+    ensure_dirs()
+    try:
+        df = pd.read_csv(EVENTS_FILE, parse_dates=["timestamp"])
+    except FileNotFoundError:
+        raise SystemExit(f"{EVENTS_FILE} not found. Run build_events.py first.")
+
+    batch_agg = _batch_aggregates(df)
+    with EVENTS_FILE.open("r", encoding="utf-8") as f:
+        header = f.readline().strip()
+    state = {
+        "aggregates": _merge_aggregates(_empty_aggregates(), batch_agg),
+        "last_event_id": int(df["event_id"].max()) if "event_id" in df.columns and len(df) else 0,
+        "events_file_offset": EVENTS_FILE.stat().st_size,
+        "header": header,
+    }
+    return _publish(state, batch_agg, mode="full")
+
+
 if __name__ == "__main__":
-    rep = validate_events()
+    import sys
+
+    if "--incremental" in sys.argv:
+        rep = validate_new_events()
+    else:
+        rep = validate_events()
     print(f"Validation report saved to {VALIDATION_REPORT_FILE}")
-    print(f"Summary saved to {VALIDATION_SUMMARY_FILE}")
\ No newline at end of file
+    print(f"Summary saved to {VALIDATION_SUMMARY_FILE}")
@@ -1,37 +1,98 @@
-from src.config import DEFAULT_LOG_DATE
-from src.data_pipeline.parse_error_logs import parse_error_logs
-from src.data_pipeline.parse_system_alerts import parse_system_alerts
-from src.data_pipeline.parse_maintenance_notes import parse_maintenance_notes
-from src.data_pipeline.parse_sensor_streams import parse_sensor_streams
-from src.data_pipeline.parse_torque_cycles import parse_torque_cycles
-from src.data_pipeline.build_events import build_events
-from src.data_pipeline.validate_events import validate_events
+import argparse
+from datetime import date
 
 
-def main():
+def main(start_date: date | None = None, end_date: date | None = None) -> dict:
+    """
+    Run every stage. start_date/end_date prune date= partitions of the raw
+    sources; they have no effect on the legacy single-file layout.
+
+    Runs are serialized by a lease lock. A run whose inputs and options match
+    a run that finished while it was waiting is skipped (e.g. two users
+    clicking "Run Full Pipeline" together). Returns the published run's
+    metadata (see storage.current_run).
+    """
+    import time
+
+    from src.config import RAW_DIR
+    from src.data_pipeline.storage import current_run, input_fingerprint, pipeline_lock, publish_run
+
+    requested_at = time.time()
+    with pipeline_lock():
+        fingerprint = input_fingerprint(
+            (p for p in RAW_DIR.rglob("*") if p.is_file()), extra=f"{start_date}|{end_date}"
+        )
+        last = current_run()
+        if last and last.get("fingerprint") == fingerprint and last.get("finished_at", 0) >= requested_at:
+            print(f"Identical run {last['run_id']} finished while waiting; skipping.")
+            return last
+        _run_stages(start_date, end_date)
+        run_id = publish_run({"fingerprint": fingerprint, "start_date": str(start_date), "end_date": str(end_date)})
+        print(f"Published run {run_id}.")
+        return current_run()
+
+
+def _run_stages(start_date: date | None, end_date: date | None) -> None:
+    # Stages (and pandas) are imported here, not at module load, so importing
+    # this module - e.g. from the Streamlit app - stays cheap.
+    from src.data_pipeline.parse_error_logs import parse_error_logs
+    from src.data_pipeline.parse_system_alerts import parse_system_alerts
+    from src.data_pipeline.parse_maintenance_notes import parse_maintenance_notes
+    from src.data_pipeline.parse_sensor_streams import parse_sensor_streams
+    from src.data_pipeline.build_torque_pyramid import build_torque_pyramid
+    from src.data_pipeline.parse_torque_cycles import parse_torque_cycles
+    from src.data_pipeline.build_events import build_events
+    from src.data_pipeline.build_chains import build_chains
+    from src.data_pipeline.forecast import update_forecast
+    from src.data_pipeline.build_event_context import build_event_context
+    from src.data_pipeline.validate_events import validate_events
+
     print("Parsing error logs...")
-    parse_error_logs(DEFAULT_LOG_DATE)
+    parse_error_logs(start_date=start_date, end_date=end_date)
 
     print("Parsing system alerts...")
-    parse_system_alerts(DEFAULT_LOG_DATE)
+    parse_system_alerts(start_date=start_date, end_date=end_date)
 
+    # Maintenance history before the window is still needed for last-maintenance lookups
     print("Parsing maintenance notes...")
-    parse_maintenance_notes()
+    parse_maintenance_notes(end_date=end_date)
 
     print("Parsing sensor streams (optional)...")
-    parse_sensor_streams()
+    _, torque_timeseries, _ = parse_sensor_streams(start_date, end_date)
+
+    print("Building torque chart pyramid...")
+    build_torque_pyramid(torque_timeseries)
 
     print("Parsing torque cycles...")
-    parse_torque_cycles()
+    parse_torque_cycles(start_date, end_date)
 
     print("Building events...")
     build_events()
 
+    print("Linking root-cause chains...")
+    build_chains()
+
+    print("Updating axis forecasts...")
+    # Refit from this run's inputs: the saved state belongs to whatever ran
+    # before (another input set, or follow mode), not to these files
+    update_forecast(reset=True)
+
+    print("Precomputing event context windows...")
+    build_event_context()
+
     print("Validating events...")
     validate_events()
 
     print("Pipeline complete.")
 
 
+def _parse_args():
+    ap = argparse.ArgumentParser(description="Run the robot event pipeline.")
+    ap.add_argument("--start", type=date.fromisoformat, help="first partition date (YYYY-MM-DD)")
+    ap.add_argument("--end", type=date.fromisoformat, help="last partition date (YYYY-MM-DD)")
+    return ap.parse_args()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = _parse_args()
+    main(args.start, args.end)
@@ -1,10 +1,8 @@
 import sys
 from pathlib import Path
-import json
 import os
 import streamlit as st
 import pandas as pd
-from dotenv import load_dotenv
 
 # messy path fix to make imports work on everyone's laptop
 ROOT = Path(__file__).resolve().parents[2]
@@ -12,71 +10,65 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.config import (
-    RAW_DIR,
     EVENTS_FILE,
     AI_RECOMMENDATIONS_FILE,
+    AI_PLAN_HISTORY_FILE,
+    EVENT_CONTEXT_FILE,
+    EVENT_CHAINS_FILE,
+    AXIS_FORECAST_FILE,
+    DASHBOARD_REFRESH_SECONDS,
+    FORECAST_HORIZON_HOURS,
+    AI_MAX_COMPLETION_TOKENS,
+    ensure_dirs,
 )
-from src.run_pipeline import main as run_pipeline_main
+from src.data_pipeline.storage import published_path, write_csv
 
-load_dotenv()
+# openai, dotenv and the pipeline stages are imported on first use (see
+# _openai_client, _load_env and the pipeline button) to keep cold start fast.
 
-# Hopefully this doesn't break on the demo machine
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
-    print("WARNING: openai not installed, AI features won't work")
+
+def _load_env():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def _openai_client(endpoint, api_key):
+    # Hopefully this doesn't break on the demo machine
+    try:
+        from openai import OpenAI
+    except ImportError:
+        print("WARNING: openai not installed, AI features won't work")
+        return None
+    return OpenAI(base_url=endpoint, api_key=api_key)
 
 # ------------------------------
 # Mappings & Helpers
 # ------------------------------
 
-EXPECTED_FILES = {
-    "error_logs": "error_logs.txt",
-    "system_alerts": "system_alerts.txt",
-    "maintenance_notes": "maintenance_notes.txt",
-    "sensor_readings": "sensor_readings.csv",
-    "torque_timeseries": "Torque Timeseries.csv",
-    "torque_cycles": "Torque Events by Cycle.csv",
-    "performance_metrics": "performance_metrics.csv",
-}
-
 def save_uploaded_files(uploaded_files):
+    """
+    Stream uploads into data_raw/ (see ingest.py). Files are matched to a
+    source by content, not name; gzip/zstd uploads are decompressed and
+    uploads already ingested are skipped.
+    """
     if not uploaded_files:
         return []
 
-    saved = []
-    for uf in uploaded_files:
-        name_lower = uf.name.lower()
-        mapped_name = None
-        
-        if "error" in name_lower and "log" in name_lower:
-            mapped_name = EXPECTED_FILES["error_logs"]
-        elif "alert" in name_lower:
-            mapped_name = EXPECTED_FILES["system_alerts"]
-        elif "maint" in name_lower or "note" in name_lower:
-            mapped_name = EXPECTED_FILES["maintenance_notes"]
-        elif "sensor" in name_lower:
-            mapped_name = EXPECTED_FILES["sensor_readings"]
-        elif "timeseries" in name_lower or "time series" in name_lower:
-            mapped_name = EXPECTED_FILES["torque_timeseries"]
-        elif "event" in name_lower and "cycle" in name_lower:
-            mapped_name = EXPECTED_FILES["torque_cycles"]
-        elif "perf" in name_lower:
-            mapped_name = EXPECTED_FILES["performance_metrics"]
-
-        final_name = mapped_name if mapped_name else uf.name
-        out_path = RAW_DIR / final_name
-        
-        with out_path.open("wb") as f:
-            f.write(uf.getbuffer())
-        saved.append(out_path)
+    from src.data_pipeline.ingest import ingest_files
 
-    return saved
+    return ingest_files((uf, uf.name) for uf in uploaded_files)
 
-def load_data():
+def load_data(live=False):
+    """
+    Events of the last published pipeline run; in live mode the working
+    events file instead, which follow mode appends to.
+    """
+    events_path = EVENTS_FILE if live else published_path(EVENTS_FILE)
     try:
-        events = pd.read_csv(EVENTS_FILE)
+        events = pd.read_csv(events_path)
     except FileNotFoundError:
         events = pd.DataFrame()
 
@@ -89,95 +81,231 @@ def load_data():
 
     return events, recs
 
+@st.cache_data
+def load_event_context(mtime):
+    """
+    Precomputed, decimated context windows (see build_event_context). Cached
+    per file version, so picking an event is a dictionary lookup.
+    """
+    try:
+        ctx = pd.read_csv(published_path(EVENT_CONTEXT_FILE), parse_dates=["timestamp"])
+    except FileNotFoundError:
+        return {}
+    return {int(e_id): g.drop(columns="event_id") for e_id, g in ctx.groupby("event_id")}
+
+
+def event_context(event_id):
+    path = published_path(EVENT_CONTEXT_FILE)
+    mtime = path.stat().st_mtime if path.exists() else None
+    return load_event_context(mtime).get(int(event_id), pd.DataFrame())
+
+@st.cache_data
+def load_event_chains(mtime):
+    """
+    Root-cause chains (see build_chains) keyed by chain_id.
+    """
+    try:
+        chains = pd.read_csv(published_path(EVENT_CHAINS_FILE))
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return {}
+    return {int(row["chain_id"]): row for _, row in chains.iterrows()}
+
+
+def event_chain(row):
+    """
+    Chain row for an event, or None if it is not part of a chain.
+    """
+    chain_id = row.get("chain_id")
+    if chain_id is None or pd.isna(chain_id):
+        return None
+    path = published_path(EVENT_CHAINS_FILE)
+    mtime = path.stat().st_mtime if path.exists() else None
+    return load_event_chains(mtime).get(int(chain_id))
+
+def render_at_risk(events, live=False):
+    """
+    Ranked per-axis forecast (see forecast.py), limited to the robots shown.
+    """
+    path = AXIS_FORECAST_FILE if live else published_path(AXIS_FORECAST_FILE)
+    try:
+        forecast = pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return
+    if "robot_id" in events.columns:
+        forecast = forecast[forecast["robot_id"].astype(str).isin(events["robot_id"].astype(str))]
+    if forecast.empty:
+        return
+
+    st.subheader("At-Risk Axes")
+    st.caption(
+        f"Chance of a high-severity event within {FORECAST_HORIZON_HOURS:g} h and the torque "
+        f"trend, as of {forecast['as_of'].iloc[0]}"
+    )
+    st.dataframe(
+        forecast.drop(columns=["as_of"]).head(10),
+        width="stretch",
+        hide_index=True,
+    )
+
+def render_torque_timeline(events):
+    """
+    Torque over any time range from the pre-aggregated pyramid: the slider
+    picks the range and query_torque returns ~one bucket per pixel.
+    """
+    from src.data_pipeline.build_torque_pyramid import query_torque, torque_time_range
+
+    span = torque_time_range()
+    if span is None:
+        return
+
+    st.subheader("Torque Timeline")
+    first, last = (t.to_pydatetime() for t in span)
+    start, end = st.slider(
+        "Time range",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="MM-DD HH:mm:ss",
+    )
+    robot_id = None
+    if "robot_id" in events.columns and events["robot_id"].nunique() == 1:
+        robot_id = str(events["robot_id"].iloc[0])
+
+    level, buckets = query_torque(start, end, width_px=800, robot_id=robot_id)
+    if buckets.empty:
+        st.info("No torque samples in this range.")
+        return
+    # Several robots share a bucket when none is selected: keep the highest peak
+    wide = buckets.pivot_table(index="bucket_start", columns="axis", values="max", aggfunc="max")
+    wide.columns = [f"J{a} max %" for a in wide.columns]
+    scope = "" if robot_id else ", highest across robots"
+    st.caption(f"Peak torque (% of rated) per axis, {level} buckets{scope}")
+    st.line_chart(wide)
+
 # make prompt for gpt 5.1
-def build_prompt(row):
-    fields = {
-        "event_id": int(row.get("event_id", -1)),
-        "timestamp": str(row.get("timestamp", "")),
-        "axis": int(row.get("axis", 0)),
-        "location": str(row.get("location", "")),
-        "collision_type": str(row.get("collision_type", "")),
-        "severity": str(row.get("severity", "")),
-        "peak_torque": float(row.get("peak_torque_pct", 0.0)),
-        "alert_msg": str(row.get("alert_message", "")),
-        "last_maint": str(row.get("last_maintenance_task", "")),
-        "raw_msg": str(row.get("message_raw", "")),
-    }
-
-    return f"""
-You are a senior robotics reliability engineer. 
-Analyze this collision event and provide a maintenance plan in JSON ONLY.
-
-Context:
-- ID: {fields['event_id']}
-- Time: {fields['timestamp']}
-- Joint: {fields['axis']} ({fields['location']})
-- Type: {fields['collision_type']} (Severity: {fields['severity']})
-- Peak Torque: {fields['peak_torque']}% of rated
-- Alert: {fields['alert_msg']}
-- Last Maintenance: {fields['last_maint']}
-- Raw Log: {fields['raw_msg']}
-
-Response Format (JSON):
-{{
-    "event_id": {fields['event_id']},
-    "diagnosis": "brief technical explanation",
-    "inspection_steps": "bullet points with line breaks",
-    "maintenance_actions": "bullet points with line breaks",
-    "safety_clearance": "bullet points",
-    "return_to_service": "steps to restart"
-}}
-Keep it concise.
-"""
+def prompt_fields(row):
+    """
+    Prompt fields of an event (see src/ai/prompt_budget.py), with its chain.
+    """
+    from src.ai.prompt_budget import prompt_fields as fields
 
-def run_ai_analysis(events, endpoint, api_key, deployment):
-    if OpenAI is None:
-        st.error("OpenAI lib missing! pip install openai")
-        return pd.DataFrame()
+    return fields(row, event_chain(row))
 
-    client = OpenAI(base_url=endpoint, api_key=api_key)
 
+@st.cache_resource
+def _local_engine(mtime):
+    # Rebuilt only when the LLM plan history changes (its TF-IDF index)
+    from src.ai.local_engine import LocalDiagnosisEngine
+
+    return LocalDiagnosisEngine()
+
+
+def local_engine():
+    mtime = AI_PLAN_HISTORY_FILE.stat().st_mtime if AI_PLAN_HISTORY_FILE.exists() else None
+    return _local_engine(mtime)
+
+
+def _plan_subset(events):
     if "severity" in events.columns:
         subset = events[events["severity"].str.lower().isin(["high", "critical"])].copy()
         if subset.empty:
             subset = events.head(5) 
     else:
         subset = events.head(5)
+    return subset
+
+
+def run_local_analysis(events):
+    """
+    Offline plans from the rule/retrieval engine, no endpoint needed.
+    """
+    from src.ai.local_engine import local_plans
+
+    rec_df = local_plans(_plan_subset(events), local_engine())
+    ensure_dirs()
+    write_csv(rec_df, AI_RECOMMENDATIONS_FILE)
+    return rec_df
+
+
+def run_ai_analysis(events, endpoint, api_key, deployment):
+    from src.ai.llm_plans import request_plan
+    from src.ai.local_engine import local_plans
+    from src.ai.prompt_budget import RunLedger, plan_run
+    from src.ai.similarity import PlanHistory
+
+    client = _openai_client(endpoint, api_key)
+    if client is None:
+        st.warning("OpenAI lib missing (pip install openai); using the offline diagnosis engine.")
+        return run_local_analysis(events)
+
+    subset = _plan_subset(events)
+    engine = local_engine()
+    history = PlanHistory.load()
+
+    # Most urgent first, within the per-event and per-run token budgets
+    budget = plan_run(subset, prompt_fields, lambda row: history.lookup(row) is not None)
+    st.info(f"AI run: {budget.summary()}")
 
     rec_rows = []
+    skipped = list(budget.skipped)
+    ledger = RunLedger(budget)
     progress_bar = st.progress(0)
-    total = len(subset)
+    preview = st.empty()
+    total = len(budget.calls)
 
-    for i, (_, row) in enumerate(subset.iterrows()):
+    for i, call in enumerate(budget.calls):
+        row = call.row
         ev_id = int(row["event_id"])
-        prompt = build_prompt(row)
 
+        # Near-duplicate of an event we already have an LLM plan for: no remote call
+        reused = history.lookup(row)
+        if reused is not None:
+            rec_rows.append(
+                {
+                    "event_id": ev_id,
+                    "robot_id": row.get("robot_id"),
+                    "axis": row.get("axis"),
+                    "severity": row.get("severity"),
+                    "collision_type": row.get("collision_type"),
+                    **{k: v for k, v in reused.items() if k != "event_id"},
+                    "source": "reused",
+                }
+            )
+            progress_bar.progress((i + 1) / total)
+            continue
+        if not ledger.admit(call):
+            # Earlier repairs used up the room for this call
+            skipped.append(row)
+            progress_bar.progress((i + 1) / total)
+            continue
+
+        repaired = []
         try:
-            resp = client.chat.completions.create(
-                model=deployment,
-                messages=[
-                    {"role": "system", "content": "You are a robotics engineer. JSON output only."},
-                    {"role": "user", "content": prompt},
-                ]
+            # Show the diagnosis as it streams in
+            on_partial = lambda p, ev_id=ev_id: preview.caption(
+                f"Event {ev_id}: {str(p.get('diagnosis', ''))[:200]}"
             )
-            content = resp.choices[0].message.content.strip()
-            
-            if content.startswith("```"):
-                content = content.replace("```json", "").replace("```", "")
-            
-            data = json.loads(content)
+            data = request_plan(
+                client,
+                deployment,
+                call.prompt,
+                ev_id,
+                on_partial,
+                max_tokens=AI_MAX_COMPLETION_TOKENS,
+                on_repair=lambda: repaired.append(True),
+            ).model_dump()
+            source = "llm"
+            history.add(row, data)
         except Exception as e:
-            data = {
-                "event_id": ev_id,
-                "diagnosis": f"AI Error: {str(e)}",
-                "inspection_steps": "N/A", 
-                "maintenance_actions": "N/A",
-                "safety_clearance": "N/A",
-                "return_to_service": "N/A"
-            }
+            # Endpoint down/slow or unusable output: fall back to the local plan
+            data = engine.plan(row).model_dump()
+            data["diagnosis"] = f"[Offline plan, AI error: {str(e)[:200]}] {data['diagnosis']}"
+            source = "local"
+        ledger.charge(call, bool(repaired))
 
         output = {
             "event_id": int(data.get("event_id", ev_id)),
+            "robot_id": row.get("robot_id"),
             "axis": row.get("axis"),
             "severity": row.get("severity"),
             "collision_type": row.get("collision_type"),
@@ -186,23 +314,69 @@ def run_ai_analysis(events, endpoint, api_key, deployment):
             "maintenance_actions": data.get("maintenance_actions", ""),
             "safety_clearance": data.get("safety_clearance", ""),
             "return_to_service": data.get("return_to_service", ""),
+            "source": source,
         }
         rec_rows.append(output)
         progress_bar.progress((i + 1) / total)
 
+    preview.empty()
     rec_df = pd.DataFrame(rec_rows)
-    rec_df.to_csv(AI_RECOMMENDATIONS_FILE, index=False)
+    if skipped:
+        # Over the run budget: offline plans rather than an unbounded bill
+        rec_df = pd.concat([rec_df, local_plans(pd.DataFrame(skipped), engine)], ignore_index=True)
+    ensure_dirs()
+    write_csv(rec_df, AI_RECOMMENDATIONS_FILE)
     return rec_df
 
 # ------------------------------
 # Streamlit UI
 # ------------------------------
 
+def _scope_robot(events, robot_choice):
+    if robot_choice == "All robots" or "robot_id" not in events.columns:
+        return events
+    return events[events["robot_id"].astype(str) == robot_choice]
+
+
+def _wait_for_events():
+    # Live mode with an empty store: rerun the whole page once events arrive
+    events, _ = load_data(live=True)
+    if not events.empty:
+        st.rerun(scope="app")
+
+
+def render_overview(live, robot_choice):
+    """
+    Metrics, event log and at-risk axes; the part of the page live mode
+    refreshes (as a fragment) while the rest waits for user input.
+    """
+    events, recs = load_data(live)
+    events = _scope_robot(events, robot_choice)
+
+    # Metrics
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Events", len(events))
+    
+    if "severity" in events.columns:
+        critical_count = len(events[events['severity'].str.lower().isin(['critical', 'high'])])
+    else:
+        critical_count = 0
+    col2.metric("Critical / High Errors", critical_count)
+    
+    col3.metric("AI Recommendations", len(recs) if not recs.empty else 0)
+
+    st.subheader("Event Log")
+    st.dataframe(events, width="stretch")
+
+    render_at_risk(events, live)
+
+
 def main():
     st.set_page_config(page_title="CSI Bot Diagnostic", layout="wide")
     st.title("CSI Hackathon: Robot Diagnostic Tool")
 
     # Load Env Vars
+    _load_env()
     default_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "")
     default_api_key = os.getenv("AZURE_OPENAI_API_KEY", "")
     default_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
@@ -211,47 +385,62 @@ def main():
     st.sidebar.header("1. Data Ingestion")
     uploaded_files = st.sidebar.file_uploader(
         "Upload Logs/CSVs",
-        type=["txt", "csv"],
+        type=["txt", "csv", "log", "gz", "bz2", "zst"],
         accept_multiple_files=True,
     )
 
     if uploaded_files:
-        saved_paths = save_uploaded_files(uploaded_files)
-        st.sidebar.success(f"Loaded {len(saved_paths)} files.")
+        results = save_uploaded_files(uploaded_files)
+        new_files = [r for r in results if not r.duplicate]
+        st.sidebar.success(f"Loaded {len(new_files)} files ({len(results) - len(new_files)} already ingested).")
+        for r in results:
+            if r.source is None:
+                st.sidebar.warning(f"{r.name}: format not recognised, saved as {r.path.name}")
+
+    live_mode = st.sidebar.toggle(
+        "Live mode (auto-refresh)",
+        help="Pair with `python -m src.data_pipeline.follow` to see new events within seconds.",
+    )
 
     if st.sidebar.button("Run Full Pipeline (ETL + AI)"):
         with st.spinner("Parsing logs and building event history..."):
-            run_pipeline_main()
-        
+            from src.run_pipeline import main as run_pipeline_main
+
+            run = run_pipeline_main()
+        fresh_events = pd.read_csv(published_path(EVENTS_FILE))
+        st.sidebar.caption(f"Run {run['run_id']}")
+
         if default_api_key:
             with st.spinner("Pipeline finished. Now generating AI maintenance plans..."):
-                fresh_events = pd.read_csv(EVENTS_FILE)
                 run_ai_analysis(fresh_events, default_endpoint, default_api_key, default_deployment)
             st.sidebar.success("Done! Events & AI Plans generated.")
         else:
-            st.sidebar.warning("ETL finished, but skipped AI (Missing API Key).")
+            run_local_analysis(fresh_events)
+            st.sidebar.warning("ETL finished. No API key, so plans come from the offline engine.")
+
+    # Live mode re-runs only the fragments below on a timer, not the whole
+    # script, and without blocking the session thread
+    run_every = DASHBOARD_REFRESH_SECONDS if live_mode else None
 
     # Load Data
-    events, recs = load_data()
+    events, recs = load_data(live_mode)
 
     if events.empty:
         st.warning("⚠️ No event data found. Please upload files and run the pipeline.")
+        if live_mode:
+            st.fragment(_wait_for_events, run_every=run_every)()
         return
 
-    # Metrics
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Total Events", len(events))
-    
-    if "severity" in events.columns:
-        critical_count = len(events[events['severity'].str.lower().isin(['critical', 'high'])])
-    else:
-        critical_count = 0
-    col2.metric("Critical / High Errors", critical_count)
-    
-    col3.metric("AI Recommendations", len(recs) if not recs.empty else 0)
+    # Multi-robot plants: scope the dashboard to one robot at a time
+    robot_choice = "All robots"
+    if "robot_id" in events.columns and events["robot_id"].nunique() > 1:
+        robot_ids = ["All robots"] + sorted(events["robot_id"].astype(str).unique())
+        robot_choice = st.sidebar.selectbox("Robot", robot_ids)
+    events = _scope_robot(events, robot_choice)
 
-    st.subheader("Event Log")
-    st.dataframe(events, width="stretch")
+    st.fragment(render_overview, run_every=run_every)(live_mode, robot_choice)
+
+    render_torque_timeline(events)
 
     st.divider()
     st.subheader("Deep Dive & AI Analysis")
@@ -317,6 +506,30 @@ def main():
                 st.write(f"**Alert:** {ev.get('alert_message')}")
                 st.code(ev.get('message_raw'), language="text")
 
+                chain = event_chain(ev)
+                if chain is not None:
+                    st.markdown(f"#### 🔗 Root-cause chain #{int(chain['chain_id'])}")
+                    st.write(chain["summary"])
+                    st.caption(
+                        f"Root cause: {chain['root_cause']} · {int(chain['n_events'])} events over "
+                        f"{chain['duration_s']:.0f}s · event IDs {chain['event_ids']}"
+                    )
+                    if isinstance(chain.get("prior_maintenance"), str):
+                        st.caption(f"Prior maintenance: {chain['prior_maintenance']}")
+
+                ctx = event_context(selected_id)
+                if not ctx.empty:
+                    st.markdown("#### 📈 Context around the event")
+                    wide = ctx.pivot_table(index="timestamp", columns="series", values="value")
+                    torque_cols = [c for c in wide.columns if c.startswith("torque_")]
+                    sensor_cols = [c for c in wide.columns if not c.startswith("torque_")]
+                    if torque_cols:
+                        st.caption("Torque (% of rated) per axis")
+                        st.line_chart(wide[torque_cols])
+                    if sensor_cols:
+                        st.caption("Sensor channels")
+                        st.line_chart(wide[sensor_cols])
+
         with col_right:
             st.markdown(f"#### 🧠 AI Maintenance Plan")
             
@@ -333,8 +546,17 @@ def main():
                     st.text(r.get("inspection_steps"))
                     st.write("**Fix:**")
                     st.text(r.get("maintenance_actions"))
-            else:
-                st.info("No AI analysis generated for this event yet.")
+            elif not ev_subset.empty:
+                # No stored plan: the local engine answers instantly, offline
+                plan = local_engine().plan(ev_subset.iloc[0])
+                st.caption("Offline rule-based plan (no AI analysis stored for this event)")
+                with st.expander("Diagnosis", expanded=True):
+                    st.info(plan.diagnosis)
+                with st.expander("Action Plan"):
+                    st.write("**Inspection:**")
+                    st.text(plan.inspection_steps)
+                    st.write("**Fix:**")
+                    st.text(plan.maintenance_actions)
     
     # Azure Config Section
     st.divider()